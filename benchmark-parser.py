@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+"""
+Scaling benchmark voor de WORKOUTS_DB parser
+Parset synthetische databases tot 10k workouts en controleert dat de tijd lineair groeit
+"""
+
+from velo.commands.parser_benchmark import main
+
+if __name__ == '__main__':
+    exit(main())
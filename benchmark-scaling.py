@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+Scaling Benchmark - Every validator and simulator against synthetic databases
+of 1×, 10×, 100× and 1000× the shipped size; records wall time and peak
+memory per run, flags super-linear growth and, with --baseline, regressions
+"""
+
+from velo.commands.scaling import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+
+"""
+Static Server Benchmark - `python -m http.server` against `python -m velo serve`
+Loads each page with its scripts and stylesheets cold (empty cache) and
+again as a reload (conditional requests, immutable files skipped) from both
+servers, checks that every compressed response decodes to the file, and
+compares requests, bytes and load time
+"""
+
+from velo.commands.static_benchmark import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+
+"""
+Sync Benchmark - StorageModule.saveState / syncFromSupabase under load
+Replays the save sequences of simulated users against a local PostgREST
+stand-in (or --url) and compares the current full-state sync with
+debounced and delta sync modes
+"""
+
+from velo.commands.sync import main
+
+if __name__ == '__main__':
+    exit(main())
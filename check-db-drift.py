@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+WORKOUTS_DB Drift Check - compares copies of workouts-db.js
+Builds a hash tree (goal → intensity → workout → variant) per file and
+reports exactly which workouts and variants differ from the first file
+"""
+
+from velo.commands.drift import main
+
+if __name__ == '__main__':
+    exit(main())
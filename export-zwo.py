@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+Zwift Export Catalogue - Writes a .zwo file for every workout variant
+Same segments as the browser download, streamed to a directory or a zip
+archive and checked for well-formedness and segment durations on the way
+"""
+
+from velo.commands.export import main
+
+if __name__ == '__main__':
+    exit(main())
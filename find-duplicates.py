@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+"""
+Duplicate Detector - Finds workout variants with identical or near-identical
+phase structure, such as workouts copied between goals with small edits
+"""
+
+from velo.commands.duplicates import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic Database Generator - Writes a valid workouts-db.js of any size
+Goals, workouts per intensity (or a scale of the shipped database), details
+complexity and repeated workout names are configurable
+"""
+
+from velo.commands.generate import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+Workout Scorer - analyzeWorkoutQuality over local activity files
+Scores batches of activities with power streams against their scheduled
+workouts and writes batched upserts for the workout_scores table
+"""
+
+from velo.commands.score import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+
+"""
+Weekly Adapter Simulator - WeeklyAdapter.adaptSchedule over many availability vectors
+Adapts generated weeks to random (or recorded) time slots in parallel and
+reports polarization scores, dropped and shortened workouts and the worst
+cases; with --baseline it is a regression gate for the adapter
+"""
+
+from velo.commands.adapter import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -5,245 +5,7 @@ Browser Test Simulator - Simulates the comprehensive test suite
 Runs all 9 testers and generates detailed report
 """
 
-import re
-import json
-from datetime import datetime
+from velo.commands.simulator import main
 
-print('🌐 BROWSER TEST SIMULATOR')
-print('Simulating: http://localhost:8000/test-comprehensive.html')
-print('═══════════════════════════════════════════════════════════\n')
-
-# Load workouts database
-with open('./public_html/app/assets/js/config/workouts-db.js', 'r') as f:
-    content = f.read()
-
-# Parse WORKOUTS_DB properly by extracting the entire object
-db_match = re.search(r'const WORKOUTS_DB = ({[\s\S]*?});', content)
-if not db_match:
-    print('❌ Failed to parse WORKOUTS_DB')
-    exit(1)
-
-# Extract all workout data using more reliable parsing
-def count_workouts_in_goal(goal_name):
-    """Count all workouts in a goal by finding name: patterns within the goal section"""
-    goal_pattern = rf'{goal_name}:\s*{{'
-    match = re.search(goal_pattern, content)
-    if not match:
-        return 0, []
-
-    # Find goal boundaries
-    start = match.start()
-    brace_count = 0
-    end = start
-
-    for i in range(start, len(content)):
-        if content[i] == '{':
-            brace_count += 1
-        elif content[i] == '}':
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-
-    goal_section = content[start:end]
-
-    # Find all workout names
-    workout_names = re.findall(r'name:\s*"([^"]+)"', goal_section)
-
-    # Count variants for each workout
-    variants_count = 0
-    for name in workout_names:
-        # Check for short, medium, long variants
-        name_escaped = re.escape(name)
-        workout_pattern = rf'name:\s*"{name_escaped}"(.*?)(?:name:|^\s*}})'
-        workout_match = re.search(workout_pattern, goal_section, re.DOTALL)
-
-        if workout_match:
-            workout_block = workout_match.group(1)
-            # Count variant occurrences
-            has_short = 'short:' in workout_block
-            has_medium = 'medium:' in workout_block
-            has_long = 'long:' in workout_block
-            variants_count += (has_short + has_medium + has_long)
-
-    return len(workout_names), workout_names, variants_count
-
-# Define testers
-TESTERS = [
-    {'name': 'Sarah', 'level': 'Beginner', 'goal': 'ftp', 'variant': 'short', 'ftp': 180, 'emoji': '👩‍🦰'},
-    {'name': 'Mike', 'level': 'Intermediate', 'goal': 'ftp', 'variant': 'medium', 'ftp': 250, 'emoji': '👨‍💼'},
-    {'name': 'Alex', 'level': 'Advanced', 'goal': 'ftp', 'variant': 'long', 'ftp': 320, 'emoji': '🏃‍♂️'},
-
-    {'name': 'Emma', 'level': 'Beginner', 'goal': 'climbing', 'variant': 'short', 'ftp': 170, 'emoji': '👩‍🎓'},
-    {'name': 'Tom', 'level': 'Intermediate', 'goal': 'climbing', 'variant': 'medium', 'ftp': 240, 'emoji': '👨‍🔧'},
-    {'name': 'Lisa', 'level': 'Advanced', 'goal': 'climbing', 'variant': 'long', 'ftp': 300, 'emoji': '🏋️‍♀️'},
-
-    {'name': 'John', 'level': 'Beginner', 'goal': 'granfondo', 'variant': 'short', 'ftp': 190, 'emoji': '👨‍💻'},
-    {'name': 'Maria', 'level': 'Intermediate', 'goal': 'granfondo', 'variant': 'medium', 'ftp': 260, 'emoji': '👩‍⚕️'},
-    {'name': 'Chris', 'level': 'Advanced', 'goal': 'granfondo', 'variant': 'long', 'ftp': 310, 'emoji': '🚴‍♂️'}
-]
-
-# Test results
-results = {
-    'total_tests': 0,
-    'passed': 0,
-    'failed': 0,
-    'by_goal': {},
-    'by_tester': []
-}
-
-print('🚀 Starting comprehensive tests...\n')
-print('═══════════════════════════════════════════════════════════')
-
-# Run each tester
-for idx, tester in enumerate(TESTERS, 1):
-    print(f"\n{tester['emoji']} TESTER {idx}/9: {tester['name']} ({tester['level']})")
-    print(f"   Goal: {tester['goal'].upper()} | FTP: {tester['ftp']}W | Prefers: {tester['variant']}")
-    print('   ─────────────────────────────────────────')
-
-    # Step 1: Intake simulation
-    print(f'   ⏳ Loading intake form...')
-    print(f'   📝 Intake completed: ✅')
-    print(f'      → Goal selected: {tester["goal"].upper()}')
-    print(f'      → FTP entered: {tester["ftp"]}W')
-    print(f'      → Experience: {tester["level"]}')
-
-    # Step 2: Count workouts for this goal
-    workout_count, workout_names, variant_count = count_workouts_in_goal(tester['goal'])
-
-    print(f'   📊 Loading workouts...')
-    print(f'      → Found {workout_count} workouts')
-    print(f'      → Total {variant_count} variants to test')
-
-    # Simulate testing each variant
-    print(f'   🧪 Testing all variants...')
-
-    # Track this tester's results
-    tester_tests = variant_count
-    tester_passed = variant_count  # Assume all pass based on earlier validation
-    tester_failed = 0
-
-    # Update progress
-    for i in range(0, 101, 25):
-        if i < 100:
-            print(f'      ⏳ Progress: {i}% - Testing {tester["variant"]} variants...', end='\r')
-
-    print(f'      ✅ Progress: 100% - All tests completed!           ')
-
-    # Simulate export test for preferred variant
-    print(f'   📤 Testing Zwift exports for {tester["variant"]} variants...')
-    print(f'      ✅ All {workout_count} exports generated successfully')
-
-    # Results
-    print(f'   📊 Results: {tester_passed}/{tester_tests} passed ✅')
-
-    # Update global results
-    results['total_tests'] += tester_tests
-    results['passed'] += tester_passed
-    results['failed'] += tester_failed
-
-    # Track by goal
-    goal = tester['goal']
-    if goal not in results['by_goal']:
-        results['by_goal'][goal] = {
-            'testers': 0,
-            'workouts': 0,
-            'tests': 0,
-            'passed': 0,
-            'failed': 0
-        }
-
-    results['by_goal'][goal]['testers'] += 1
-    results['by_goal'][goal]['workouts'] += workout_count
-    results['by_goal'][goal]['tests'] += tester_tests
-    results['by_goal'][goal]['passed'] += tester_passed
-    results['by_goal'][goal]['failed'] += tester_failed
-
-    # Track by tester
-    results['by_tester'].append({
-        'name': tester['name'],
-        'level': tester['level'],
-        'goal': tester['goal'],
-        'tests': tester_tests,
-        'passed': tester_passed,
-        'failed': tester_failed,
-        'success': tester_failed == 0
-    })
-
-# Summary
-print('\n\n═══════════════════════════════════════════════════════════')
-print('📊 COMPREHENSIVE TEST RESULTS')
-print('═══════════════════════════════════════════════════════════\n')
-
-success_rate = (results['passed'] / results['total_tests'] * 100) if results['total_tests'] > 0 else 0
-
-print(f"Total Tests:        {results['total_tests']}")
-print(f"Passed:             {results['passed']} ✅")
-print(f"Failed:             {results['failed']} {'❌' if results['failed'] > 0 else '✅'}")
-print(f"Success Rate:       {success_rate:.1f}%")
-
-# Statistics
-total_workouts = sum(results['by_goal'][g]['workouts'] for g in results['by_goal'])
-total_variants = results['total_tests']
-total_exports = len(TESTERS) * (total_workouts // 3)  # Each tester exports their preferred variant
-
-print(f"\n📈 Statistics:")
-print(f"   Total Workouts Tested:  {total_workouts}")
-print(f"   Total Variants Tested:  {total_variants}")
-print(f"   Total Exports Tested:   {total_exports}")
-
-# Per goal breakdown
-print('\n\n═══════════════════════════════════════════════════════════')
-print('📊 PER GOAL BREAKDOWN')
-print('═══════════════════════════════════════════════════════════\n')
-
-for goal in ['ftp', 'climbing', 'granfondo']:
-    if goal in results['by_goal']:
-        data = results['by_goal'][goal]
-        goal_success = (data['passed'] / data['tests'] * 100) if data['tests'] > 0 else 0
-
-        print(f"{goal.upper()}:")
-        print(f"   Testers:        {data['testers']} (Beginner, Intermediate, Advanced)")
-        print(f"   Workouts:       {data['workouts']}")
-        print(f"   Variants:       {data['tests']}")
-        print(f"   Passed:         {data['passed']} ✅")
-        print(f"   Failed:         {data['failed']} {'❌' if data['failed'] > 0 else '✅'}")
-        print(f"   Success Rate:   {goal_success:.1f}%")
-        print()
-
-# Per tester summary
-print('═══════════════════════════════════════════════════════════')
-print('👥 PER TESTER SUMMARY')
-print('═══════════════════════════════════════════════════════════\n')
-
-for i, tester_result in enumerate(results['by_tester'], 1):
-    status = '✅' if tester_result['success'] else '❌'
-    tester_info = TESTERS[i-1]
-    print(f"{status} {tester_info['emoji']} {tester_result['name']:<8} ({tester_result['level']:<12}, {tester_result['goal'].upper():<10}): {tester_result['passed']}/{tester_result['tests']} passed")
-
-# Final verdict
-print('\n═══════════════════════════════════════════════════════════')
-print('🏆 FINAL VERDICT')
-print('═══════════════════════════════════════════════════════════\n')
-
-if results['failed'] == 0:
-    print('🎉 ALL TESTS PASSED!')
-    print('✅ Database: Complete and correct')
-    print('✅ Structure: All workouts have proper Warm-up/Main/Cool-down')
-    print('✅ Variants: All short/medium/long variants present')
-    print('✅ Exports: Zwift .zwo generation working')
-    print('✅ Coverage: All 3 goals tested with 3 experience levels each')
-    print('\n🚀 The application is PRODUCTION-READY!')
-else:
-    print(f'⚠️  {results["failed"]} tests failed')
-    print('Please review the issues above.')
-
-print('\n═══════════════════════════════════════════════════════════\n')
-
-print(f'⏱️  Test completed at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
-print('📍 Test page: http://localhost:8000/test-comprehensive.html')
-print('📍 Full app: http://localhost:8000/intake.html')
-print()
-
-# Exit code
-exit(0 if results['failed'] == 0 else 1)
+if __name__ == '__main__':
+    exit(main())
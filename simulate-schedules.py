@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+Schedule Simulator - Monte Carlo over ScheduleModule.generateSchedule
+Draws many 6-week schedules per goal and time commitment and reports the
+spread of weekly minutes, intensity mix, repeated workouts and placement
+"""
+
+from velo.commands.schedules import main
+
+if __name__ == '__main__':
+    exit(main())
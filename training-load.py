@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+"""
+Training Load - NP, IF and TSS per variant from the parsed phases, and
+CTL / ATL / TSB over generated 6-week schedules
+"""
+
+from velo.commands.load import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+"""
+Phase Validator - Parses every workout variant like the browser does
+Reports variants whose main set cannot be parsed and variants whose
+phases do not add up to their duration
+"""
+
+from velo.commands.phases import main
+
+if __name__ == '__main__':
+    exit(main())
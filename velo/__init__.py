@@ -0,0 +1 @@
+"""Python tooling for the Polarized Cycling app: validators and simulators for WORKOUTS_DB"""
@@ -0,0 +1,569 @@
+"""
+Weekly adapter
+
+Python port of modules/weekly-adapter.js (adaptSchedule,
+findBestDayForWorkout, adjustWorkoutToTime, calculatePolarizationScore and
+the summary helpers), without the console logging, plus a bulk evaluator
+that runs the adapter over many availability vectors.
+
+Where adaptSchedule puts a workout depends only on the intensities of the
+week and on the time slot category of every day, not on the exact minutes.
+The bulk evaluator therefore caches placements per (intensities, category
+vector) and only redoes the duration adjustment for each vector.
+"""
+
+import heapq
+import json
+import math
+import random
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .schedule import ALL_DAYS, POOL_ORDER, uniform_picks
+
+TIME_SLOTS = {
+    'NONE': {'min': 0, 'max': 0, 'label': 'No time'},
+    'SHORT': {'min': 30, 'max': 45, 'label': '30-45 min'},
+    'MEDIUM': {'min': 45, 'max': 90, 'label': '45-90 min'},
+    'LONG': {'min': 90, 'max': 120, 'label': '90-120 min'},
+    'EXTRA': {'min': 120, 'max': 999, 'label': '2+ hours'}
+}
+CATEGORIES = tuple(TIME_SLOTS)
+
+WORKOUT_PRIORITY = {'hard': 3, 'moderate': 2, 'easy': 1}
+
+# findBestDayForWorkout: score of a slot category per intensity, by category code
+_CATEGORY_SCORES = {
+    'hard': (0, 7, 10, 5, 0),
+    'moderate': (0, 4, 8, 7, 0),
+    'easy': (0, 2, 5, 9, 10)
+}
+
+# Minutes per day offered by the adapter modal, and its quick templates
+UI_MINUTES = (0, 30, 60, 90, 120)
+WEEK_TEMPLATES = {
+    'minimal': {'Mon': 0, 'Tue': 45, 'Wed': 0, 'Thu': 60, 'Fri': 0, 'Sat': 90, 'Sun': 0},
+    'moderate': {'Mon': 0, 'Tue': 60, 'Wed': 45, 'Thu': 60, 'Fri': 0, 'Sat': 90, 'Sun': 60},
+    'full': {'Mon': 60, 'Tue': 75, 'Wed': 45, 'Thu': 75, 'Fri': 0, 'Sat': 120, 'Sun': 90},
+    'weekend': {'Mon': 0, 'Tue': 30, 'Wed': 0, 'Thu': 30, 'Fri': 0, 'Sat': 150, 'Sun': 120}
+}
+
+# Minutes drawn per day for random availability: the modal buttons plus the template values
+DEFAULT_MINUTES = (0, 30, 45, 60, 75, 90, 120, 150)
+
+
+def _js_round(value):
+    """Math.round: halves go up"""
+    return math.floor(value + 0.5)
+
+
+def _category_code(minutes):
+    if minutes == 0:
+        return 0
+    if minutes <= 45:
+        return 1
+    if minutes <= 90:
+        return 2
+    if minutes <= 120:
+        return 3
+    return 4
+
+
+def time_slot_category(minutes):
+    """getTimeSlotCategory"""
+    return CATEGORIES[_category_code(minutes)]
+
+
+def analyze_week_availability(time_slots):
+    total_minutes = available_days = long_slots = medium_slots = short_slots = 0
+    for day in ALL_DAYS:
+        minutes = time_slots.get(day) or 0
+        total_minutes += minutes
+        if minutes > 0:
+            available_days += 1
+            category = time_slot_category(minutes)
+            if category in ('LONG', 'EXTRA'):
+                long_slots += 1
+            elif category == 'MEDIUM':
+                medium_slots += 1
+            elif category == 'SHORT':
+                short_slots += 1
+
+    return {
+        'totalMinutes': total_minutes,
+        'totalHours': _js_round(total_minutes / 60 * 10) / 10,
+        'availableDays': available_days,
+        'longSlots': long_slots,
+        'mediumSlots': medium_slots,
+        'shortSlots': short_slots,
+        'averageMinutesPerDay': _js_round(total_minutes / available_days) if available_days else 0
+    }
+
+
+def calculate_required_distribution(original_schedule, week_num):
+    required = {intensity: [] for intensity in POOL_ORDER}
+    total_planned_minutes = 0
+
+    week = original_schedule.get(week_num) or {}
+    for day in ALL_DAYS:
+        workout = week.get(day)
+        if workout and workout.get('intensity'):
+            item = {
+                'day': day,
+                'workout': workout,
+                'duration': workout.get('duration') or 60,
+                'priority': WORKOUT_PRIORITY.get(workout['intensity'])
+            }
+            total_planned_minutes += item['duration']
+            if workout['intensity'] in required:
+                required[workout['intensity']].append(item)
+
+    return {
+        'hardWorkouts': required['hard'],
+        'moderateWorkouts': required['moderate'],
+        'easyWorkouts': required['easy'],
+        'totalWorkouts': sum(len(items) for items in required.values()),
+        'totalPlannedMinutes': total_planned_minutes,
+        'distribution': {intensity: len(items) for intensity, items in required.items()}
+    }
+
+
+def _best_day(intensity, categories, assigned, preferred_days):
+    """Day index findBestDayForWorkout picks, or None
+
+    categories holds the slot category code of each day, assigned the
+    intensity already placed on each day ('' for a workout without one,
+    None when the day is free).
+    """
+    scores = _CATEGORY_SCORES.get(intensity, (0, 0, 0, 0, 0))
+    best = None
+    best_score = 0
+    for index, category in enumerate(categories):
+        if category == 0 or assigned[index] is not None:
+            continue
+        score = scores[category]
+        if ALL_DAYS[index] in preferred_days:
+            score += 2
+        # Avoid back-to-back hard days
+        if index > 0 and assigned[index - 1] == 'hard':
+            score -= 3
+        if index < 6 and assigned[index + 1] == 'hard':
+            score -= 3
+        # Weekend bonus for long workouts
+        if index >= 5 and intensity == 'easy':
+            score += 2
+        # The browser sorts candidates by score with a stable sort: the first best day wins
+        if best is None or score > best_score:
+            best, best_score = index, score
+    return best if best is not None and best_score > 0 else None
+
+
+def find_best_day_for_workout(workout, time_slots, current_schedule, intensity, preferred_days=()):
+    """findBestDayForWorkout: the day name, or None when no day scores above 0"""
+    categories = [_category_code(time_slots.get(day) or 0) for day in ALL_DAYS]
+    assigned = [(w.get('intensity') or '') if w else None for w in map(current_schedule.get, ALL_DAYS)]
+    index = _best_day(intensity, categories, assigned, preferred_days or ())
+    return ALL_DAYS[index] if index is not None else None
+
+
+def _adjust(original_duration, available_minutes, intensity):
+    """(duration, 'compressed' | 'extended' | 'maintained') of adjustWorkoutToTime"""
+    ratio = available_minutes / original_duration
+    if ratio < 0.8:
+        return available_minutes, 'compressed'
+    if ratio > 1.3 and intensity == 'easy':
+        return min(available_minutes, original_duration * 1.5), 'extended'
+    return original_duration, 'maintained'
+
+
+def adjust_workout_to_time(workout, available_minutes):
+    adapted = dict(workout)
+    original_duration = workout.get('originalDuration') or workout.get('duration') or 60
+    duration, kind = _adjust(original_duration, available_minutes, workout.get('intensity'))
+    adapted['duration'] = duration
+
+    if kind == 'compressed':
+        adapted['adapted'] = True
+        adapted['adaptationType'] = 'compressed'
+        compression_ratio = _js_round(available_minutes / original_duration * 100)
+        adapted['description'] = f"{workout.get('description')} (⏱️ {compression_ratio}% duration)"
+        if workout.get('intensity') == 'hard':
+            adapted['tips'] = (adapted.get('tips') or '') + ' Focus on quality over quantity in this compressed session.'
+    elif kind == 'extended':
+        adapted['adapted'] = True
+        adapted['adaptationType'] = 'extended'
+        adapted['description'] = f"{workout.get('description')} (⏱️ Extended endurance)"
+    return adapted
+
+
+def calculate_polarization_score(distribution):
+    """How close hard + moderate are to 20% of the workouts, 0-100"""
+    total = distribution['hard'] + distribution['moderate'] + distribution['easy']
+    if total == 0:
+        return 0
+    hard_percentage = (distribution['hard'] + distribution['moderate']) / total * 100
+    return _js_round(max(0, 100 - abs(20 - hard_percentage) * 2))
+
+
+def get_recommendation(polarization_score, analysis):
+    if analysis['totalHours'] < 3:
+        return '⚠️ Very limited time. Focus on quality over quantity. Prioritize hard intervals.'
+    if polarization_score < 60:
+        return '⚠️ Polarization compromised. Try to add more easy volume or reduce hard sessions.'
+    if polarization_score < 80:
+        return '⚡ Good adaptation! Close to ideal 80/20 distribution.'
+    return '✅ Excellent! Maintaining proper polarized distribution.'
+
+
+def generate_adaptation_summary(original, adapted, analysis):
+    original_workouts = adapted_workouts = original_minutes = adapted_minutes = 0
+    distribution = {intensity: 0 for intensity in POOL_ORDER}
+    for day in ALL_DAYS:
+        if original.get(day):
+            original_workouts += 1
+            original_minutes += original[day].get('duration') or 60
+        if adapted.get(day):
+            adapted_workouts += 1
+            adapted_minutes += adapted[day].get('duration') or 60
+            if adapted[day].get('intensity') in distribution:
+                distribution[adapted[day]['intensity']] += 1
+
+    polarization_score = calculate_polarization_score(distribution)
+    return {
+        'originalWorkouts': original_workouts,
+        'adaptedWorkouts': adapted_workouts,
+        'workoutRetention': _js_round(adapted_workouts / original_workouts * 100) if original_workouts else 0,
+        'originalMinutes': original_minutes,
+        'adaptedMinutes': adapted_minutes,
+        'volumeRetention': _js_round(adapted_minutes / original_minutes * 100) if original_minutes else 0,
+        'polarizationScore': polarization_score,
+        'distribution': distribution,
+        'recommendation': get_recommendation(polarization_score, analysis)
+    }
+
+
+def get_applied_strategies(original, adapted):
+    counts = {'compressed': 0, 'extended': 0, 'unchanged': 0, 'skipped': 0}
+    for day in ALL_DAYS:
+        orig, adap = original.get(day), adapted.get(day)
+        if orig and not adap:
+            counts['skipped'] += 1
+        elif adap and adap.get('adaptationType') in ('compressed', 'extended'):
+            counts[adap['adaptationType']] += 1
+        elif adap:
+            counts['unchanged'] += 1
+    return [f'{count} workouts {kind}' for kind, count in counts.items() if count]
+
+
+def adapt_schedule(original_schedule, week_num, time_slots, preferences=None):
+    """adaptSchedule: place hard, then moderate, then easy workouts on the days with time"""
+    preferences = preferences or {}
+    analysis = analyze_week_availability(time_slots)
+    required = calculate_required_distribution(original_schedule, week_num)
+
+    adapted = {day: None for day in ALL_DAYS}
+    for intensity in POOL_ORDER:
+        for item in required[f'{intensity}Workouts']:
+            day = find_best_day_for_workout(item['workout'], time_slots, adapted, intensity,
+                                            preferences.get('preferredDays'))
+            if day:
+                adapted[day] = adjust_workout_to_time(item['workout'], time_slots[day])
+
+    original = original_schedule.get(week_num) or {}
+    return {
+        'schedule': adapted,
+        'analysis': analysis,
+        'summary': generate_adaptation_summary(original, adapted, analysis),
+        'strategies': get_applied_strategies(original, adapted)
+    }
+
+
+@dataclass(frozen=True)
+class WeekPlan:
+    """A scheduled week reduced to what adaptSchedule looks at"""
+    # Intensity, duration adjustWorkoutToTime starts from, and original day of each workout, in placement order
+    intensities: tuple
+    durations: tuple
+    days: tuple
+    # Days that had a workout, and their minutes as the summary counts them
+    workout_days: int
+    minutes: int
+    score: int
+
+
+def week_plan(week):
+    """WeekPlan of one week {day: resolved workout dict or None} of a generated schedule"""
+    required = calculate_required_distribution({1: week}, 1)
+    items = [item for intensity in POOL_ORDER for item in required[f'{intensity}Workouts']]
+    distribution = required['distribution']
+    return WeekPlan(
+        intensities=tuple(item['workout']['intensity'] for item in items),
+        durations=tuple(item['workout'].get('originalDuration') or item['duration'] for item in items),
+        days=tuple(ALL_DAYS.index(item['day']) for item in items),
+        workout_days=sum(1 << i for i, day in enumerate(ALL_DAYS) if week.get(day)),
+        minutes=sum(week[day].get('duration') or 60 for day in ALL_DAYS if week.get(day)),
+        score=calculate_polarization_score(distribution)
+    )
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """Everything about an adapted week that follows from the placement alone"""
+    days: tuple
+    dropped: tuple
+    score: int
+    # Dropped workouts while a day with time stayed free
+    free_drops: int
+    # Bitmask of the days that got a workout
+    adapted_days: int
+
+
+@lru_cache(maxsize=1 << 18)
+def placement(intensities, categories, preferred_days):
+    """Outcome of placing workouts of these intensities (in adaptSchedule order) on days of these categories"""
+    assigned = [None] * 7
+    days = []
+    for intensity in intensities:
+        index = _best_day(intensity, categories, assigned, preferred_days)
+        if index is not None:
+            assigned[index] = intensity
+        days.append(index)
+
+    placed = {intensity: assigned.count(intensity) for intensity in POOL_ORDER}
+    dropped = tuple(intensities.count(intensity) - placed[intensity] for intensity in POOL_ORDER)
+    free_day = any(c and a is None for c, a in zip(categories, assigned))
+    return Outcome(
+        days=tuple(days),
+        dropped=dropped,
+        score=calculate_polarization_score(placed),
+        free_drops=sum(dropped) if free_day else 0,
+        adapted_days=sum(1 << i for i, a in enumerate(assigned) if a is not None)
+    )
+
+
+def evaluate(plan, minutes, preferred_days):
+    """(Outcome, durations, kinds, volume retention %) of adapting a WeekPlan to minutes per day"""
+    outcome = placement(plan.intensities, tuple(map(_category_code, minutes)), tuple(preferred_days))
+
+    durations, kinds = [], []
+    adapted_minutes = 0
+    for intensity, original, day in zip(plan.intensities, plan.durations, outcome.days):
+        if day is None:
+            durations.append(None)
+            kinds.append(None)
+            continue
+        duration, kind = _adjust(original, minutes[day], intensity)
+        durations.append(duration)
+        kinds.append(kind)
+        adapted_minutes += duration or 60
+    volume = _js_round(adapted_minutes / plan.minutes * 100) if plan.minutes else 0
+    return outcome, durations, kinds, volume
+
+
+@dataclass
+class AdapterStats:
+    """Aggregated results of many adapted weeks; merge() combines worker results"""
+    weeks: int = 0
+    workouts: int = 0
+    dropped: dict = field(default_factory=lambda: dict.fromkeys(POOL_ORDER, 0))
+    weeks_with_drop: int = 0
+    weeks_with_hard_drop: int = 0
+    free_drops: int = 0
+    compressed: int = 0
+    extended: int = 0
+    maintained: int = 0
+    # Maintained workouts that last longer than the time of their day
+    overrun: int = 0
+    # Weeks where getAppliedStrategies' skipped count is not the number of dropped workouts
+    skipped_mismatch: int = 0
+    # Histograms: polarization score, score change against the original week, volume retention %
+    scores: dict = field(default_factory=dict)
+    score_changes: dict = field(default_factory=dict)
+    volume: dict = field(default_factory=dict)
+    # Worst weeks: (sort key, plan index, minutes per day); most dropped, then least volume, then lowest score
+    worst: list = field(default_factory=list)
+    worst_size: int = 10
+
+    def add(self, index, plan, minutes, result):
+        outcome, _, kinds, volume = result
+        dropped = sum(outcome.dropped)
+        self.weeks += 1
+        self.workouts += len(plan.intensities)
+        for intensity, count in zip(POOL_ORDER, outcome.dropped):
+            self.dropped[intensity] += count
+        if dropped:
+            self.weeks_with_drop += 1
+            self.weeks_with_hard_drop += outcome.dropped[0] > 0
+        self.free_drops += outcome.free_drops
+        # getAppliedStrategies counts days that lost their workout, not workouts that were dropped
+        self.skipped_mismatch += (plan.workout_days & ~outcome.adapted_days).bit_count() != dropped
+        for duration, kind, day in zip(result[1], kinds, outcome.days):
+            if kind == 'compressed':
+                self.compressed += 1
+            elif kind == 'extended':
+                self.extended += 1
+            elif kind == 'maintained':
+                self.maintained += 1
+                self.overrun += duration > minutes[day]
+        self.scores[outcome.score] = self.scores.get(outcome.score, 0) + 1
+        change = outcome.score - plan.score
+        self.score_changes[change] = self.score_changes.get(change, 0) + 1
+        self.volume[volume] = self.volume.get(volume, 0) + 1
+
+        key = (-dropped, volume, outcome.score)
+        if self.worst_size and (len(self.worst) < self.worst_size or key < self._threshold()):
+            self._push(key, index, tuple(minutes))
+
+    def _threshold(self):
+        return tuple(-k for k in self.worst[0][0])
+
+    def _push(self, key, index, minutes):
+        entry = (tuple(-k for k in key), index, minutes)
+        if any(e[1] == index and e[2] == minutes for e in self.worst):
+            return
+        if len(self.worst) < self.worst_size:
+            heapq.heappush(self.worst, entry)
+        else:
+            heapq.heapreplace(self.worst, entry)
+
+    def merge(self, other):
+        for name in ('weeks', 'workouts', 'weeks_with_drop', 'weeks_with_hard_drop', 'free_drops', 'compressed',
+                     'extended', 'maintained', 'overrun', 'skipped_mismatch'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in ('dropped', 'scores', 'score_changes', 'volume'):
+            mine = getattr(self, name)
+            for value, count in getattr(other, name).items():
+                mine[value] = mine.get(value, 0) + count
+        for entry in other.worst:
+            key = tuple(-k for k in entry[0])
+            if self.worst_size and (len(self.worst) < self.worst_size or key < self._threshold()):
+                self._push(key, entry[1], entry[2])
+        return self
+
+    def worst_cases(self):
+        """[(plan index, minutes per day)], worst first"""
+        return [(index, minutes) for _, index, minutes in sorted(self.worst, reverse=True)]
+
+    def rates(self):
+        """Fractions the regression gate compares"""
+        workouts = self.workouts or 1
+        weeks = self.weeks or 1
+        return {
+            'dropRate': sum(self.dropped.values()) / workouts,
+            'hardDropRate': self.dropped['hard'] / workouts,
+            'weeksWithDrop': self.weeks_with_drop / weeks,
+            'freeDropRate': self.free_drops / workouts,
+            'compressRate': self.compressed / workouts,
+            'overrunRate': self.overrun / workouts,
+            'skippedMismatch': self.skipped_mismatch / weeks
+        }
+
+    def as_dict(self):
+        return {
+            'weeks': self.weeks,
+            'workouts': self.workouts,
+            'dropped': self.dropped,
+            'weeksWithDrop': self.weeks_with_drop,
+            'weeksWithHardDrop': self.weeks_with_hard_drop,
+            'freeDrops': self.free_drops,
+            'compressed': self.compressed,
+            'extended': self.extended,
+            'maintained': self.maintained,
+            'overrun': self.overrun,
+            'skippedMismatch': self.skipped_mismatch,
+            'polarizationScore': histogram_summary(self.scores),
+            'scoreChange': histogram_summary(self.score_changes),
+            'volumeRetention': histogram_summary(self.volume),
+            'rates': {name: round(rate, 6) for name, rate in self.rates().items()}
+        }
+
+
+def histogram_summary(histogram):
+    """mean / min / p5 / p50 / p95 / max of a {value: count} histogram"""
+    total = sum(histogram.values())
+    if not total:
+        return {}
+    values = sorted(histogram)
+    summary = {'mean': round(sum(v * c for v, c in histogram.items()) / total, 3), 'min': values[0]}
+    seen = 0
+    marks = iter((('p5', 0.05), ('p50', 0.5), ('p95', 0.95)))
+    name, share = next(marks)
+    for value in values:
+        seen += histogram[value]
+        while name and seen >= share * total:
+            summary[name] = value
+            name, share = next(marks, (None, None))
+    summary['max'] = values[-1]
+    return summary
+
+
+def random_batch(plans, minutes_table, preferred_days, seed, chunk, count, worst_size=10):
+    """AdapterStats of count random (week, availability) pairs; chunk selects the random stream"""
+    rng = random.Random(f'{seed}:adapter:{chunk}')
+    stats = AdapterStats(worst_size=worst_size)
+    if len(plans) <= 256:
+        plan_picks = uniform_picks(rng, len(plans), count)
+    else:
+        plan_picks = rng.choices(range(len(plans)), k=count)
+    minute_picks = uniform_picks(rng, len(minutes_table), 7 * count)
+    for i, index in enumerate(plan_picks):
+        minutes = [minutes_table[p] for p in minute_picks[7 * i:7 * i + 7]]
+        plan = plans[index]
+        stats.add(index, plan, minutes, evaluate(plan, minutes, preferred_days))
+    return stats
+
+
+def vector_batch(plans, vectors, preferred_days, worst_size=10):
+    """AdapterStats of every availability vector (minutes per day) against every week"""
+    stats = AdapterStats(worst_size=worst_size)
+    for minutes in vectors:
+        for index, plan in enumerate(plans):
+            stats.add(index, plan, minutes, evaluate(plan, minutes, preferred_days))
+    return stats
+
+
+def load_time_slots(path):
+    """Availability vectors (minutes per day) from a JSON array or JSON lines file
+
+    Entries are {day: minutes} objects, or objects with a timeSlots key as
+    the app stores them in weeklyAdaptations.
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    try:
+        entries = json.loads(text)
+    except json.JSONDecodeError:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(entries, dict):
+        entries = list(entries.values())
+    vectors = []
+    for entry in entries:
+        slots = entry.get('timeSlots', entry)
+        vectors.append([int(slots.get(day) or 0) for day in ALL_DAYS])
+    return vectors
+
+
+def verify(weeks, pairs, preferred_days):
+    """Compare evaluate() with the full adapt_schedule() port on (week index, minutes) pairs
+
+    Returns a list of mismatch descriptions.
+    """
+    problems = []
+    for index, minutes in pairs:
+        week = weeks[index]
+        plan = week_plan(week)
+        time_slots = dict(zip(ALL_DAYS, minutes))
+        full = adapt_schedule({1: week}, 1, time_slots, {'preferredDays': list(preferred_days)})
+        outcome, durations, _, volume = evaluate(plan, minutes, preferred_days)
+
+        expected = {day: None for day in ALL_DAYS}
+        for original_day, day, duration in zip(plan.days, outcome.days, durations):
+            if day is not None:
+                expected[ALL_DAYS[day]] = (week[ALL_DAYS[original_day]]['name'], duration)
+        actual = {day: (w['name'], w['duration']) if w else None for day, w in full['schedule'].items()}
+        summary = full['summary']
+        if (actual != expected or summary['polarizationScore'] != outcome.score
+                or summary['volumeRetention'] != volume):
+            problems.append(f'week {index} with {time_slots}: adaptSchedule gives {actual}, '
+                            f"score {summary['polarizationScore']}, volume {summary['volumeRetention']}%")
+    return problems
@@ -0,0 +1,432 @@
+"""
+Script bundles
+
+Dependency graph of the classic <script> modules of a page and a bundler
+that turns a page's local scripts into one critical-path bundle plus lazily
+loaded chunks.
+
+Every module defines globals (top-level const/let/var/function/class and
+window.X = ...) and references the globals of other modules. A reference
+is eager when it runs while the script loads (top level, or inside an
+immediately invoked function) and deferred when it sits in a function that
+runs later. It is guarded when the module checks `typeof X` or `window.X`
+before using it. The scan is lexical: comments and string literals are
+blanked and braces are counted, there is no JavaScript parser.
+
+Lazy chunks are appended after the window load event, in order, once the
+browser is idle. A module can only be lazy when no critical module
+references it eagerly; deferred and inline-handler references are reported
+as warnings, since they fail when used before the chunk arrives.
+"""
+
+import gzip
+import hashlib
+import posixpath
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .workouts_db import REPO_ROOT
+
+DEFAULT_ROOT = REPO_ROOT / 'public_html' / 'app'
+DEFAULT_PAGES = ('index.html', 'intake.html')
+DEFAULT_OUT_DIR = 'assets/js/bundles'
+
+# The rarely used features: Strava, the Zwift export and the cycling club
+DEFAULT_LAZY = ('assets/js/modules/strava-config.js', 'assets/js/modules/zwift-export.js',
+                'assets/js/modules/cyclingclub.js')
+
+# Estimated parse + compile throughput of a mid-range phone (KB of source per ms)
+PARSE_KB_PER_MS = 1.0
+
+_SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.I | re.S)
+_SRC_RE = re.compile(r'''\bsrc\s*=\s*["']([^"']+)["']''', re.I)
+_BODY_RE = re.compile(r'<body\b', re.I)
+_HANDLER_RE = re.compile(r'''\son[a-z]+\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.I)
+
+_DECLARATION_RE = re.compile(r'\b(?:const|let|var|function|class)\s+([A-Za-z_$][\w$]*)')
+_WINDOW_ASSIGN_RE = re.compile(r'\bwindow\.([A-Za-z_$][\w$]*)\s*=(?!=)')
+_IDENTIFIER_RE = re.compile(r'(?<![\w$.])(?:window\.)?([A-Za-z_$][\w$]*)')
+_KEY_RE = re.compile(r'\s*:(?!:)')
+_CONTROL_RE = re.compile(r'\b(?:if|for|while|switch|catch|with)\s*$')
+
+
+def strip_js(source):
+    """source with comments, string and regex-free literal text blanked; offsets and newlines are kept"""
+    out = list(source)
+    i, n = 0, len(source)
+    templates = []
+    while i < n:
+        c = source[i]
+        if c == '/' and source.startswith('//', i):
+            end = source.find('\n', i)
+            end = n if end < 0 else end
+        elif c == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+        elif c in '\'"' or (c == '`') or (c == '}' and templates and templates[-1] == 0):
+            if c == '}':
+                templates.pop()
+            quote = '`' if c in '`}' else c
+            j = i + 1
+            while j < n and source[j] != quote:
+                if source[j] == '\\':
+                    j += 1
+                elif quote == '`' and source.startswith('${', j):
+                    templates.append(0)
+                    break
+                elif quote != '`' and source[j] == '\n':
+                    break
+                j += 1
+            if j < n and quote == '`' and source.startswith('${', j):
+                for k in range(i + 1, j):
+                    if out[k] != '\n':
+                        out[k] = ' '
+                i = j + 2
+                continue
+            for k in range(i + 1, min(j, n)):
+                if out[k] != '\n':
+                    out[k] = ' '
+            i = j + 1
+            continue
+        else:
+            if templates:
+                if c == '{':
+                    templates[-1] += 1
+                elif c == '}':
+                    templates[-1] -= 1
+            i += 1
+            continue
+        for k in range(i, end):
+            if out[k] != '\n':
+                out[k] = ' '
+        i = end
+    return ''.join(out)
+
+
+def _function_head(head):
+    """(is function body, immediately invoked) for the code before a {"""
+    arrow = re.search(r'(\(\s*)?(?:async\s*)?(?:\([^()]*\)|[A-Za-z_$][\w$]*)\s*=>$', head)
+    if arrow:
+        return True, bool(arrow.group(1))
+    if not head.endswith(')'):
+        return False, False
+    opener = _matching_paren(head)
+    if opener is None:
+        return False, False
+    before = head[:opener].rstrip()
+    keyword = re.search(r'\bfunction\s*\*?\s*[A-Za-z_$]?[\w$]*$', before)
+    if keyword:
+        return True, before[:keyword.start()].rstrip().endswith('(')
+    if _CONTROL_RE.search(before):
+        return False, False
+    # Method shorthand: name(args) {
+    return bool(re.search(r'[A-Za-z_$][\w$]*$', before)), False
+
+
+def _matching_paren(head):
+    """Offset of the ( that opens the ) head ends with, or None"""
+    level = 0
+    for i in range(len(head) - 1, -1, -1):
+        if head[i] == ')':
+            level += 1
+        elif head[i] == '(':
+            level -= 1
+            if level == 0:
+                return i
+    return None
+
+
+def _scopes(code):
+    """Per character: (brace depth, deferred), deferred meaning inside a function that runs later"""
+    depth = []
+    state = []
+    stack = []
+    deferred = 0
+    for i, c in enumerate(code):
+        if c == '{':
+            is_function, immediate = _function_head(code[max(0, i - 300):i].rstrip())
+            lazy = is_function and not immediate
+            stack.append(lazy)
+            deferred += lazy
+        elif c == '}' and stack:
+            deferred -= stack.pop()
+        depth.append(len(stack))
+        state.append(deferred > 0)
+    return depth, state
+
+
+@dataclass
+class Reference:
+    name: str
+    eager: bool
+    guarded: bool
+    line: int
+
+
+@dataclass
+class Module:
+    """One script of a page"""
+    src: str
+    path: Path
+    defer: bool = False
+    size: int = 0
+    gzip_size: int = 0
+    defines: list = field(default_factory=list)
+    identifiers: dict = field(default_factory=dict)
+    # Globals called from on*="..." handlers in markup the module renders: {name: line}
+    handlers: dict = field(default_factory=dict)
+    has_load_handlers: bool = False
+
+
+def analyze_module(src, path):
+    source = path.read_text(encoding='utf-8')
+    data = source.encode('utf-8')
+    code = strip_js(source)
+    depth, deferred = _scopes(code)
+    module = Module(src=src, path=path, size=len(data), gzip_size=len(gzip.compress(data, 9, mtime=0)))
+
+    defines = [m.group(1) for m in _DECLARATION_RE.finditer(code) if depth[m.start()] == 0]
+    defines += [m.group(1) for m in _WINDOW_ASSIGN_RE.finditer(code)]
+    module.defines = list(dict.fromkeys(defines))
+    module.has_load_handlers = bool(re.search(r'''DOMContentLoaded|addEventListener\(\s*['"]load['"]|window\.onload''', source))
+
+    guards = set(re.findall(r'\btypeof\s+([A-Za-z_$][\w$]*)', code))
+    guards |= {m.group(1) for m in re.finditer(r'\bwindow\.([A-Za-z_$][\w$]*)\b(?!\s*=[^=])', code)}
+    line_starts = [0] + [m.end() for m in re.finditer('\n', code)]
+    for m in _HANDLER_RE.finditer(source):
+        for name in _IDENTIFIER_RE.findall(strip_js(m.group(1) or m.group(2))):
+            module.handlers.setdefault(name, bisect_right(line_starts, m.start()))
+    for m in _IDENTIFIER_RE.finditer(code):
+        name = m.group(1)
+        if _KEY_RE.match(code, m.end()) and code[:m.start()].rstrip()[-1:] in ('{', ','):
+            # An object key, not a reference
+            continue
+        entry = module.identifiers.setdefault(name, {'eager': False, 'guarded': name in guards, 'line': 0})
+        if not deferred[m.start()] and not entry['eager']:
+            entry['eager'] = True
+            entry['line'] = bisect_right(line_starts, m.start())
+        elif not entry['line']:
+            entry['line'] = bisect_right(line_starts, m.start())
+    return module
+
+
+@dataclass
+class Page:
+    path: Path
+    html: str
+    modules: list = field(default_factory=list)
+    # Inline scripts and on*= handlers: identifiers the markup itself uses
+    inline_identifiers: set = field(default_factory=set)
+    external: list = field(default_factory=list)
+    # Local scripts loaded before <body>, left out of bundles
+    head: list = field(default_factory=list)
+
+
+def analyze_page(root, page):
+    root = Path(root)
+    path = root / page
+    html = path.read_text(encoding='utf-8')
+    body = _BODY_RE.search(html)
+    result = Page(path=path, html=html)
+    inline = []
+    for m in _SCRIPT_RE.finditer(html):
+        attrs, text = m.group(1), m.group(2)
+        src = _SRC_RE.search(attrs)
+        if not src:
+            inline.append(text)
+            continue
+        url = src.group(1)
+        if '://' in url or url.startswith('//'):
+            result.external.append(url)
+            continue
+        local = posixpath.normpath(posixpath.join(posixpath.dirname(page), url))
+        if body and m.start() < body.start():
+            result.head.append(local)
+            continue
+        module = analyze_module(url, root / local)
+        module.defer = bool(re.search(r'\bdefer\b', attrs, re.I))
+        result.modules.append(module)
+    for m in _HANDLER_RE.finditer(html):
+        inline.append(m.group(1) or m.group(2))
+    for text in inline:
+        result.inline_identifiers |= set(_IDENTIFIER_RE.findall(strip_js(text)))
+    return result
+
+
+def execution_order(modules):
+    """Classic scripts run in document order, deferred ones after all of them"""
+    return [m for m in modules if not m.defer] + [m for m in modules if m.defer]
+
+
+def dependency_graph(modules):
+    """{module src: {dependency src: Reference}} over the globals the modules define"""
+    owners = {}
+    for module in modules:
+        for name in module.defines:
+            owners.setdefault(name, module.src)
+    graph = {}
+    for module in modules:
+        edges = graph.setdefault(module.src, {})
+        for name, use in module.identifiers.items():
+            owner = owners.get(name)
+            if owner is None or owner == module.src or name in module.defines:
+                continue
+            known = edges.get(owner)
+            reference = Reference(name, use['eager'], use['guarded'], use['line'])
+            # One edge per dependency: the strongest reference wins
+            if known is None or (reference.eager, not reference.guarded) > (known.eager, not known.guarded):
+                edges[owner] = reference
+    return graph, owners
+
+
+def lazy_candidates(page, graph, owners):
+    """Modules that no other module needs at load time and the markup does not call"""
+    candidates = []
+    for module in page.modules:
+        incoming = [edges[module.src] for edges in graph.values() if module.src in edges]
+        if any(ref.eager or not ref.guarded for ref in incoming):
+            continue
+        rendered = {name for other in page.modules for name in other.handlers}
+        if (page.inline_identifiers | rendered) & set(module.defines) or module.has_load_handlers:
+            continue
+        candidates.append(module.src)
+    return candidates
+
+
+def plan_page(page, lazy):
+    """(critical modules, lazy modules, errors, warnings) for a set of lazy script srcs / paths"""
+    graph, owners = dependency_graph(page.modules)
+    by_src = {m.src: m for m in page.modules}
+    wanted = {src for src in by_src if src in lazy or posixpath.normpath(src) in lazy}
+    errors, warnings = [], []
+
+    for module in page.modules:
+        if module.src in wanted:
+            continue
+        for src, ref in graph[module.src].items():
+            if src not in wanted:
+                continue
+            if ref.eager:
+                errors.append(f'{module.src}:{ref.line} uses {ref.name} while loading; {src} cannot be lazy')
+            elif not ref.guarded:
+                warnings.append(f'{module.src}:{ref.line} calls {ref.name} without a typeof guard; '
+                                f'it fails if used before {src} has loaded')
+            else:
+                warnings.append(f'{module.src}:{ref.line} skips {ref.name} while {src} has not loaded')
+        for name, line in module.handlers.items():
+            if owners.get(name) in wanted:
+                warnings.append(f'{module.src}:{line} renders handlers calling {name}; '
+                                f'clicks fail before {owners[name]} has loaded')
+
+    for src in sorted(wanted):
+        module = by_src[src]
+        handlers = sorted(page.inline_identifiers & set(module.defines))
+        if handlers:
+            warnings.append(f"{page.path.name} markup calls {', '.join(handlers)} of lazy {src}")
+        if module.has_load_handlers:
+            warnings.append(f'{src} registers DOMContentLoaded/load handlers, which do not fire after a lazy load')
+        for dep, ref in graph[src].items():
+            if ref.eager and dep in wanted and page.modules.index(by_src[dep]) > page.modules.index(module):
+                errors.append(f'{src} needs {dep} at load time but comes before it')
+
+    blocked = {e.rsplit('; ', 1)[-1].split(' ', 1)[0] for e in errors if e.endswith('cannot be lazy')}
+    lazy_modules = [m for m in page.modules if m.src in wanted and m.src not in blocked]
+    critical = [m for m in execution_order(page.modules) if m not in lazy_modules]
+    return critical, lazy_modules, errors, warnings
+
+
+def content_name(stem, data):
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}.js'
+
+
+# Names content_name() gives: <stem>.<12 hex digits>.js
+_CONTENT_NAME_RE = re.compile(r'(.+)\.[0-9a-f]{12}\.js')
+
+
+def prune_bundles(out_dir, stems, current):
+    """Remove bundle and chunk files of earlier builds; returns their names
+
+    Only names of the form <stem>.<12 hex digits>.js for the given stems
+    (pages and lazy modules) are candidates, and the files in current stay,
+    so other scripts in out_dir are never touched.
+    """
+    removed = []
+    for path in sorted(Path(out_dir).glob('*.js')):
+        match = _CONTENT_NAME_RE.fullmatch(path.name)
+        if match and match.group(1) in stems and path.name not in current:
+            path.unlink()
+            removed.append(path.name)
+    return removed
+
+
+def _loader(urls):
+    chunks = ', '.join(f"'{url}'" for url in urls)
+    return ('\n/* Lazy chunks: appended in order once the page has loaded and the browser is idle */\n'
+            '(function () {\n'
+            f'    var chunks = [{chunks}];\n'
+            '    function load() {\n'
+            '        chunks.forEach(function (src) {\n'
+            "            var script = document.createElement('script');\n"
+            '            script.src = src;\n'
+            '            script.async = false;\n'
+            '            document.head.appendChild(script);\n'
+            '        });\n'
+            '    }\n'
+            "    function idle() { (window.requestIdleCallback || setTimeout)(load); }\n"
+            "    if (document.readyState === 'complete') idle(); else window.addEventListener('load', idle);\n"
+            '})();\n')
+
+
+def _concat(modules):
+    parts = []
+    for module in modules:
+        text = module.path.read_text(encoding='utf-8')
+        parts.append(f'/* {module.src} */\n{text.rstrip()}\n;\n')
+    return ''.join(parts)
+
+
+@dataclass
+class Bundle:
+    """Output files of one page"""
+    page: str
+    critical_file: str = ''
+    critical: bytes = b''
+    chunks: dict = field(default_factory=dict)
+    html: str = ''
+
+
+def build_bundle(page, critical, lazy_modules, out_dir=DEFAULT_OUT_DIR):
+    """The critical bundle (with the chunk loader), the chunks and the rewritten page"""
+    page_dir = posixpath.dirname(page.path.name)
+    bundle = Bundle(page=page.path.name)
+    urls = []
+    for module in lazy_modules:
+        data = _concat([module]).encode('utf-8')
+        name = content_name(Path(module.src).stem, data)
+        bundle.chunks[name] = data
+        urls.append(posixpath.join(page_dir, out_dir, name))
+
+    data = (_concat(critical) + (_loader(urls) if urls else '')).encode('utf-8')
+    bundle.critical = data
+    bundle.critical_file = content_name(page.path.stem, data)
+
+    # One deferred tag where the first bundled script was; the other local body scripts go
+    bundled = {m.src for m in page.modules}
+    tag = f'<script defer src="{posixpath.join(out_dir, bundle.critical_file)}"></script>'
+    placed = False
+    pieces = []
+    last = 0
+    for m in _SCRIPT_RE.finditer(page.html):
+        src = _SRC_RE.search(m.group(1))
+        if not src or src.group(1) not in bundled:
+            continue
+        pieces.append(page.html[last:m.start()])
+        if not placed:
+            pieces.append(tag)
+            placed = True
+        last = m.end()
+    pieces.append(page.html[last:])
+    bundle.html = re.sub(r'\n(?:[ \t]*\n){2,}', '\n\n', ''.join(pieces))
+    return bundle
@@ -0,0 +1,399 @@
+"""
+Catalogue index
+
+An inverted index over the (workout, variant) rows of WORKOUTS_DB, so
+questions like "hard ftp workouts 60-75 min with 4x8 intervals above 105%
+FTP" are answered without scanning the database.
+
+Every row has a number (its position in db.variants()) and every term a
+posting set of rows, stored as a Python int used as a bitmap:
+
+    goal, intensity, variant    keyword terms
+    minutes                     declared duration
+    power                       highest main-set power (% FTP, parsed phases)
+    reps, length                work intervals and minutes per interval
+    word                        tokens of the name, description, tips and details
+
+Numeric fields keep their distinct values sorted, so a range is a bisect
+plus the union of the bitmaps in it; a compound query is a few big-int ANDs.
+The index is built once per database content hash and pickled next to the
+parse cache, so a query does not need to parse workouts-db.js at all.
+"""
+
+import os
+import pickle
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from .workout_parser import parse_workout, resolved_workout
+from .workouts_db import WorkoutsDB, content_hash, parse_cached
+
+# Bump when the row or term layout changes so stale on-disk indexes are ignored
+INDEX_VERSION = 2
+
+KEYWORD_FIELDS = ('goal', 'intensity', 'variant', 'word')
+NUMERIC_FIELDS = ('minutes', 'power', 'reps', 'length')
+
+# Alternative names of fields in queries
+FIELD_ALIASES = {
+    'min': 'minutes', 'duration': 'minutes', 'ftp': 'power', 'pct': 'power',
+    'intervals': 'reps', 'text': 'word'
+}
+
+# Display fields of a row; reps is 0 and length None without work intervals
+Row = namedtuple('Row', 'goal intensity name variant display_name minutes power reps length')
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+class QueryError(ValueError):
+    """Raised for a query the index cannot answer"""
+
+
+def words(text):
+    """Lower-case tokens of a text as the word field indexes them"""
+    return _WORD_RE.findall(text.lower())
+
+
+def _row(workout, variant):
+    parsed = parse_workout(resolved_workout(workout, variant))
+    main = parsed['phases']['main']
+    work = [phase for phase in main if phase['type'] == 'work']
+    power = round(max((phase['intensity'] for phase in main), default=parsed['intensity']['value']) * 100)
+    length = round(work[0]['duration'], 2) if work and 'intervalNumber' in work[0] else None
+    return Row(workout.goal, workout.intensity, workout.name, variant.key, variant.display_name,
+               variant.duration, power, len(work), length)
+
+
+@dataclass
+class Clause:
+    """One condition of a query; numeric clauses have a (low, high) range, None for open ends"""
+    field: str
+    value: object = None
+    low: float = None
+    high: float = None
+    low_open: bool = False
+    high_open: bool = False
+    negate: bool = False
+    prefix: bool = False
+
+    def __str__(self):
+        if self.field in KEYWORD_FIELDS:
+            text = f"{self.field}:{self.value}{'*' if self.prefix else ''}"
+        elif self.low == self.high:
+            text = f'{self.field}:{self.low:g}'
+        elif self.high is None:
+            text = f"{self.field}:{'>' if self.low_open else '>='}{self.low:g}"
+        elif self.low is None:
+            text = f"{self.field}:{'<' if self.high_open else '<='}{self.high:g}"
+        else:
+            text = f'{self.field}:{self.low:g}-{self.high:g}'
+        return f"-{text}" if self.negate else text
+
+
+class CatalogueIndex:
+    """Posting bitmaps of every term over the rows of one database"""
+
+    def __init__(self, source, rows, keywords, numeric):
+        self.source = source
+        self.rows = rows
+        self.all = (1 << len(rows)) - 1
+        # field -> {value: bitmap}
+        self.keywords = keywords
+        # field -> (sorted distinct values, bitmaps in the same order)
+        self.numeric = numeric
+        # field -> sorted values, for prefix clauses
+        self._vocabulary = {name: sorted(values) for name, values in keywords.items()}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def terms(self):
+        """Distinct values per field"""
+        counts = {name: len(values) for name, values in self.keywords.items()}
+        counts.update({name: len(values) for name, (values, _) in self.numeric.items()})
+        return counts
+
+    def clause_bitmap(self, clause):
+        """Rows matching a clause, ignoring its negation"""
+        if clause.field in self.keywords:
+            postings = self.keywords[clause.field]
+            if not clause.prefix:
+                return postings.get(clause.value, 0)
+            vocabulary = self._vocabulary[clause.field]
+            bits = 0
+            for value in vocabulary[bisect_left(vocabulary, clause.value):]:
+                if not value.startswith(clause.value):
+                    break
+                bits |= postings[value]
+            return bits
+
+        if clause.field not in self.numeric:
+            raise QueryError(f'unknown field {clause.field!r} (fields: {", ".join(KEYWORD_FIELDS + NUMERIC_FIELDS)})')
+        values, bitmaps = self.numeric[clause.field]
+        start = 0
+        if clause.low is not None:
+            start = (bisect_right if clause.low_open else bisect_left)(values, clause.low)
+        stop = len(values)
+        if clause.high is not None:
+            stop = (bisect_left if clause.high_open else bisect_right)(values, clause.high)
+        bits = 0
+        for bitmap in bitmaps[start:stop]:
+            bits |= bitmap
+        return bits
+
+    def bitmap(self, clauses):
+        """Rows matching every clause"""
+        bits = self.all
+        for clause in clauses:
+            matched = self.clause_bitmap(clause)
+            bits = bits & ~matched if clause.negate else bits & matched
+            if not bits:
+                break
+        return bits
+
+    def search(self, query):
+        """Bitmap of the rows matching a query string or a list of clauses"""
+        return self.bitmap(parse_query(query, self) if isinstance(query, str) else query)
+
+    def row_ids(self, bits, limit=None):
+        """Row numbers set in a bitmap, ascending, at most limit of them"""
+        flags = bin(bits)[:1:-1]
+        ids = []
+        position = flags.find('1')
+        while position >= 0 and (limit is None or len(ids) < limit):
+            ids.append(position)
+            position = flags.find('1', position + 1)
+        return ids
+
+    def check_db(self, db):
+        """Raise QueryError unless db is the database this index was built from"""
+        if content_hash(db.content) != self.source:
+            raise QueryError('the index was built from a different workouts-db.js')
+
+    def select(self, db, query):
+        """(workout, variant) pairs of db matching a query, in file order"""
+        self.check_db(db)
+        variants = db.variants()
+        return [variants[i] for i in self.row_ids(self.search(query))]
+
+    def restrict(self, db, query):
+        """A copy of db keeping only the variants matching a query
+
+        Workouts left without variants are dropped, so code that walks
+        db.goals (like the schedule simulator) only sees matching rows.
+        """
+        self.check_db(db)
+        keep = set(self.row_ids(self.search(query)))
+        row = 0
+        goals = {}
+        for key, goal in db.goals.items():
+            intensities = {}
+            for intensity, workouts in goal.intensities.items():
+                kept = []
+                for workout in workouts:
+                    variants = {}
+                    for name, variant in workout.variants.items():
+                        if row in keep:
+                            variants[name] = variant
+                        row += 1
+                    if variants:
+                        kept.append(replace(workout, variants=variants))
+                intensities[intensity] = kept
+            goals[key] = replace(goal, intensities=intensities)
+        return WorkoutsDB(goals, db.duplicate_goals, db.content, db.path)
+
+
+def build_index(db):
+    """CatalogueIndex of a parsed database"""
+    rows = []
+    keywords = {name: {} for name in KEYWORD_FIELDS}
+    numeric = {name: {} for name in NUMERIC_FIELDS}
+
+    for i, (workout, variant) in enumerate(db.variants()):
+        row = _row(workout, variant)
+        rows.append(row)
+        bit = 1 << i
+        for name, value in (('goal', row.goal), ('intensity', row.intensity), ('variant', row.variant)):
+            keywords[name][value] = keywords[name].get(value, 0) | bit
+        text = ' '.join((workout.name, workout.description, workout.tips, workout.power_zone, variant.details))
+        postings = keywords['word']
+        for word in set(words(text)):
+            postings[word] = postings.get(word, 0) | bit
+        for name in NUMERIC_FIELDS:
+            value = getattr(row, name)
+            if value is not None:
+                numeric[name][value] = numeric[name].get(value, 0) | bit
+
+    sorted_numeric = {}
+    for name, postings in numeric.items():
+        values = sorted(postings)
+        sorted_numeric[name] = (values, [postings[value] for value in values])
+    return CatalogueIndex(content_hash(db.content), rows, keywords, sorted_numeric)
+
+
+def load_index(content, path='', cache_dir=None, db=None):
+    """CatalogueIndex of a workouts-db.js source with an optional on-disk cache
+
+    With a cache_dir the index is pickled under the content hash of the
+    source; on a hit the database is not parsed. db is the already parsed
+    source, if the caller has it, for a miss. Returns (index, cached).
+    """
+    if cache_dir is None:
+        return build_index(db or parse_cached(content, path)), False
+
+    source = content_hash(content)
+    cache_file = Path(cache_dir) / f'catalogue-{INDEX_VERSION}-{source}.pickle'
+    try:
+        with open(cache_file, 'rb') as f:
+            index = pickle.load(f)
+        if index.source == source:
+            return index, True
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    index = build_index(db or parse_cached(content, path, cache_dir))
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return index, False
+
+
+# Words of a free-text query that carry no condition
+_STOPWORDS = frozenset((
+    'a', 'an', 'and', 'at', 'for', 'in', 'of', 'or', 'than', 'the', 'to', 'with', 'x',
+    'workout', 'workouts', 'variant', 'variants', 'session', 'sessions'
+))
+_COMPARATORS = {
+    'above': '>', 'over': '>', 'more': '>', 'below': '<', 'under': '<', 'less': '<',
+    'least': '>=', 'most': '<=', 'max': '<='
+}
+_UNITS = {
+    'min': 'minutes', 'mins': 'minutes', 'minute': 'minutes', 'minutes': 'minutes', 'm': 'minutes',
+    '%': 'power', 'ftp': 'power',
+    'reps': 'reps', 'rep': 'reps', 'intervals': 'reps', 'interval': 'reps', 'efforts': 'reps'
+}
+_NUMBER_RE = re.compile(r'^(>=|<=|>|<)?(\d+(?:\.\d+)?)(?:-(\d+(?:\.\d+)?))?(\+)?(%|mins?|m|reps?)?$')
+_SETS_RE = re.compile(r'^(\d+)x(\d+(?:\.\d+)?)(s|sec|secs|m|min|mins)?$')
+_FIELD_RE = re.compile(r'^(-)?([a-z]+):(.+)$')
+
+
+def _range_clause(field, spec, negate=False):
+    """Clause of a numeric value spec: 60, 60-75, >105, >=105, <60, <=60 or 105+"""
+    match = _NUMBER_RE.match(spec)
+    if not match:
+        raise QueryError(f'{field}: expected a number or range, got {spec!r}')
+    comparator, low, high, plus, _ = match.groups()
+    low = float(low)
+    clause = Clause(field, low=low, high=low, negate=negate)
+    if high is not None:
+        clause.high = float(high)
+        if clause.high < low:
+            raise QueryError(f'{field}: empty range {spec!r}')
+    elif plus or comparator in ('>', '>='):
+        clause.high = None
+        clause.low_open = comparator == '>'
+    elif comparator in ('<', '<='):
+        clause.low = None
+        clause.high_open = comparator == '<'
+    return clause
+
+
+def _keyword_clause(field, value, negate=False):
+    prefix = value.endswith('*')
+    value = value.rstrip('*')
+    if field != 'word':
+        return [Clause(field, value, negate=negate, prefix=prefix)]
+    tokens = words(value)
+    if not tokens:
+        raise QueryError(f'word: nothing to search for in {value!r}')
+    # A phrase is every one of its words; a trailing * applies to the last
+    return [Clause('word', token, negate=negate, prefix=prefix and i == len(tokens) - 1)
+            for i, token in enumerate(tokens)]
+
+
+def parse_query(text, index):
+    """Clauses of a query
+
+    Understands field:value terms (goal:ftp, minutes:60-75, power:>105,
+    reps:4, length:8, word:cadence, word:pyram*, -word:steady) and the loose
+    form coaches type: "hard ftp 60-75 min 4x8 above 105% FTP". Bare goal,
+    intensity and variant names are keyword terms, numbers take their field
+    from a unit (min, %, FTP, reps), and other words must occur in the text.
+    """
+    normalized = (text.lower().replace('–', '-').replace('—', '-').replace('×', 'x')
+                  .replace('≥', '>=').replace('≤', '<='))
+    tokens = normalized.split()
+    known = {name: index.keywords[name] for name in ('goal', 'intensity', 'variant')}
+    clauses = []
+    pending = None
+    after_percent = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        following = tokens[i + 1] if i + 1 < len(tokens) else ''
+        i += 1
+
+        field_match = _FIELD_RE.match(token)
+        if field_match:
+            negate, name, value = field_match.groups()
+            name = FIELD_ALIASES.get(name, name)
+            if name in NUMERIC_FIELDS:
+                clauses.append(_range_clause(name, value, bool(negate)))
+            elif name in KEYWORD_FIELDS:
+                clauses.extend(_keyword_clause(name, value, bool(negate)))
+            else:
+                raise QueryError(f'unknown field {name!r} (fields: {", ".join(KEYWORD_FIELDS + NUMERIC_FIELDS)})')
+            continue
+
+        sets = _SETS_RE.match(token)
+        if sets:
+            reps, length, unit = sets.groups()
+            minutes = float(length) / 60 if unit and unit.startswith('s') else float(length)
+            clauses.append(Clause('reps', low=float(reps), high=float(reps)))
+            clauses.append(Clause('length', low=round(minutes, 2), high=round(minutes, 2)))
+            continue
+
+        number = _NUMBER_RE.match(token)
+        if number:
+            unit = number.group(5)
+            field = _UNITS.get(unit or '') or _UNITS.get(following)
+            if field is None:
+                raise QueryError(f'{token!r} needs a unit (min, %, FTP or reps) or a field, e.g. minutes:{token}')
+            if not unit and following in _UNITS:
+                i += 1
+            spec = token if not pending or number.group(1) else pending + token
+            clauses.append(_range_clause(field, re.sub(r'(%|mins?|m|reps?)$', '', spec)))
+            pending = None
+            after_percent = field == 'power'
+            continue
+
+        if token in _COMPARATORS:
+            pending = _COMPARATORS[token]
+            continue
+        if token == 'ftp' and after_percent:
+            after_percent = False
+            continue
+        after_percent = False
+
+        negate = token.startswith('-') and len(token) > 1
+        word = token[1:] if negate else token
+        field = next((name for name, values in known.items() if word in values), None)
+        if field:
+            clauses.append(Clause(field, word, negate=negate))
+        elif word in _STOPWORDS or word in _UNITS:
+            continue
+        else:
+            clauses.extend(_keyword_clause('word', word, negate))
+
+    if pending:
+        raise QueryError(f'a comparison word needs a number after it: {text!r}')
+    return clauses
@@ -0,0 +1,117 @@
+"""
+Command line
+
+Single entry point for the WORKOUTS_DB tools:
+
+    python -m velo validate [--suites workouts,phases,...]
+    python -m velo simulate [-n COUNT] ...
+    python -m velo browser
+    python -m velo adapt [-n COUNT] [--jobs N] ...
+    python -m velo stats
+    python -m velo load [--count N] [--table FILE] [--ftp 200,250] ...
+    python -m velo export [--zip FILE] ...
+    python -m velo build [--check] ...
+    python -m velo serve [--port 8000] [--log timing]
+    python -m velo static-benchmark [--pages index.html] [--repeat 20] ...
+    python -m velo bundle [--pages index.html] [--lazy auto] ...
+    python -m velo score [FILE ...] [--simulate USERS] [--jobs N] ...
+    python -m velo sync [--users N] [--modes full,...] [--url URL] ...
+    python -m velo drift [FILE FILE ...] [--values]
+    python -m velo parser-benchmark
+    python -m velo generate FILE [--scale 10] [--complexity mixed] ...
+    python -m velo scaling [--scales 1,10,100] [--commands stats,...] ...
+    python -m velo query "hard ftp 60-75 min 4x8 above 105% FTP" ...
+    python -m velo duplicates [--threshold 0.7] [--fail-on-exact]
+
+`simulate` is the Monte Carlo schedule simulator of simulate-schedules.py;
+the browser test simulator of simulate-browser-tests.py is `browser` (and
+the simulator suite of `validate`).
+
+Commands chained with '+' run in one process on one parsed database, e.g.
+`python -m velo validate + stats + export --zip out.zip`. A command module is
+imported only once it is named, so startup is the interpreter and argparse.
+"""
+
+import argparse
+import importlib
+import sys
+
+# Command -> (module, one-line help); the modules are imported on use
+COMMANDS = {
+    'validate': ('velo.commands.validate', 'run the database validators on one parsed database'),
+    'simulate': ('velo.commands.schedules', "Monte Carlo statistics of generated training schedules "
+                                            "(the browser test simulator is 'browser')"),
+    'browser': ('velo.commands.simulator', 'simulate the browser test suite (simulate-browser-tests.py)'),
+    'adapt': ('velo.commands.adapter', 'run the weekly adapter over many availability vectors'),
+    'stats': ('velo.commands.stats', 'counts, durations and training load of the database'),
+    'load': ('velo.commands.load', 'NP, IF and TSS per variant and CTL / ATL / TSB of generated schedules'),
+    'export': ('velo.commands.export', 'export every variant as a Zwift .zwo file'),
+    'build': ('velo.commands.build', 'compile per-goal JSON shards with parsed phases and TSS'),
+    'serve': ('velo.commands.serve', 'serve public_html/app with precompression, ETags and cache headers'),
+    'static-benchmark': ('velo.commands.static_benchmark', 'compare page loads from http.server and velo serve'),
+    'bundle': ('velo.commands.bundle', 'per-page script bundles and lazy chunks from the module graph'),
+    'score': ('velo.commands.score', 'score activity files against their scheduled workouts for workout_scores'),
+    'sync': ('velo.commands.sync', 'load benchmark of the Supabase state sync against a PostgREST stand-in'),
+    'drift': ('velo.commands.drift', 'structural differences between copies of workouts-db.js'),
+    'parser-benchmark': ('velo.commands.parser_benchmark', 'check that the parser scales linearly and rejects bad input fast'),
+    'generate': ('velo.commands.generate', 'write a synthetic workouts-db.js of any size'),
+    'scaling': ('velo.commands.scaling', 'time every validator and simulator against growing synthetic databases'),
+    'query': ('velo.commands.query', 'find workouts by goal, duration, power, intervals or words'),
+    'duplicates': ('velo.commands.duplicates', 'find exact and near-duplicate variants by phase structure')
+}
+
+SEPARATOR = '+'
+
+
+def _segments(argv):
+    segments = [[]]
+    for arg in argv:
+        if arg == SEPARATOR:
+            segments.append([])
+        else:
+            segments[-1].append(arg)
+    return segments
+
+
+def _parser():
+    commands = '\n'.join(f'  {name:<10}{text}' for name, (_, text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog='velo', description=f'Validators and simulators for WORKOUTS_DB\n\ncommands:\n{commands}',
+        epilog=f"chain commands with '{SEPARATOR}' to run them on one parsed database; "
+               "'velo <command> --help' shows the options of a command",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='one of the commands above')
+    return parser
+
+
+def _command_parser(name):
+    from .profiling import add_profile_arguments
+    from .report import add_report_arguments
+
+    module = importlib.import_module(COMMANDS[name][0])
+    parser = argparse.ArgumentParser(prog=f'velo {name}', description=module.DESCRIPTION)
+    module.add_arguments(parser)
+    add_report_arguments(parser)
+    add_profile_arguments(parser)
+    return module, parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Parse every command before running any, so a typo in the last one fails fast
+    runs = []
+    for segment in _segments(argv):
+        if not segment or segment[0].startswith('-') or segment[0] not in COMMANDS:
+            _parser().parse_args(segment[:1])
+        module, parser = _command_parser(segment[0])
+        runs.append((module, parser.parse_args(segment[1:])))
+
+    from .commands import run_command
+
+    code = 0
+    stdout = sys.stdout
+    for module, args in runs:
+        code = max(code, run_command(module, args) or 0)
+        sys.stdout = stdout
+    return code
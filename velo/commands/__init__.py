@@ -0,0 +1,80 @@
+"""
+Commands
+
+One module per command of the validator scripts and of python -m velo.
+Every command module has:
+
+    DESCRIPTION          one line for --help
+    add_arguments(p)     registers its options on an argparse parser
+    run(args)            does the work and returns the exit code
+    main(argv=None)      parses argv and runs, for the root scripts
+
+Every command takes --profile (see velo.profiling); run_command() wraps
+run() in the profile.
+
+Command modules import only argparse at the top; the modules that do the
+work are imported inside run(), so listing or parsing commands stays cheap.
+"""
+
+import os
+
+# Parsed databases of this process by path, with the (mtime, size) they were parsed at
+_parsed = {}
+
+
+def load_db(timings, cached=False):
+    """The parsed WORKOUTS_DB, or None after printing why it could not be parsed
+
+    The first command of a process reads and parses the file (recording the
+    'load' and 'parse' stages); later commands get the same database as long
+    as the file has not changed. cached=True goes through the on-disk parse
+    cache of workouts_db.parse_cached.
+    """
+    from .. import workouts_db
+
+    path = workouts_db.DEFAULT_DB_PATH
+    try:
+        stat = os.stat(path)
+    except OSError:
+        stat = None
+    version = (stat.st_mtime_ns, stat.st_size) if stat else None
+    if path in _parsed and _parsed[path][0] == version:
+        return _parsed[path][1]
+
+    try:
+        with timings.stage('load'):
+            content = workouts_db.read_source(path)
+        with timings.stage('parse'):
+            if cached:
+                db = workouts_db.parse_cached(content, path, workouts_db.DEFAULT_CACHE_DIR)
+            else:
+                db = workouts_db.parse(content, path)
+    except (OSError, workouts_db.WorkoutsDBError) as e:
+        print(f'❌ Failed to parse WORKOUTS_DB: {e}')
+        return None
+    _parsed[path] = (version, db)
+    return db
+
+
+def run_command(module, args):
+    """module.run(args), profiled with --profile"""
+    if not getattr(args, 'profile', False):
+        return module.run(args)
+
+    from ..profiling import profiled
+
+    with profiled(args):
+        return module.run(args)
+
+
+def command_main(module, argv=None):
+    """main() of a command module: its own parser with the report and profile options, then run()"""
+    import argparse
+    from ..profiling import add_profile_arguments
+    from ..report import add_report_arguments
+
+    parser = argparse.ArgumentParser(description=module.DESCRIPTION)
+    module.add_arguments(parser)
+    add_report_arguments(parser)
+    add_profile_arguments(parser)
+    return run_command(module, parser.parse_args(argv))
@@ -0,0 +1,264 @@
+"""
+Weekly adapter simulator
+
+Runs WeeklyAdapter.adaptSchedule over many availability vectors: adapts
+generated weeks to random (or recorded) time slots in parallel and reports
+polarization scores, dropped and shortened workouts and the worst cases;
+with --baseline it is a regression gate for the adapter.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Run the weekly adapter over many availability vectors'
+
+# Pairs per worker task; fixed so results do not depend on --jobs
+CHUNK = 50000
+
+
+def add_arguments(parser):
+    from ..adapter import DEFAULT_MINUTES
+    from ..schedule import COMMITMENTS, DEFAULT_PREFERRED_DAYS
+
+    parser.add_argument('--count', '-n', type=int, default=1000000,
+                        help='random (week, availability) pairs to adapt (default: 1000000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--goals', default=None, help='comma-separated goals (default: all in the database)')
+    parser.add_argument('--commitments', default=','.join(COMMITMENTS),
+                        help='comma-separated time commitments (default: starter,regular,serious)')
+    parser.add_argument('--days', default=','.join(DEFAULT_PREFERRED_DAYS),
+                        help='comma-separated preferred days (default: Tue,Thu,Sat)')
+    parser.add_argument('--schedules', type=int, default=10,
+                        help='generated 6-week schedules per goal and commitment to adapt (default: 10)')
+    parser.add_argument('--minutes', default=','.join(map(str, DEFAULT_MINUTES)),
+                        help='minutes a random day can have, repeat a value to weight it '
+                             f"(default: {','.join(map(str, DEFAULT_MINUTES))})")
+    parser.add_argument('--vectors', metavar='FILE',
+                        help='recorded time slots (JSON array or JSON lines) to run against every week '
+                             '(default: the adapter modal templates)')
+    parser.add_argument('--worst', type=int, default=5, help='worst cases to show (default: 5)')
+    parser.add_argument('--verify', type=int, default=1000,
+                        help='random pairs to re-run through the full adaptSchedule port (default: 1000)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='number of worker processes (0 = one per CPU core, default: 1)')
+    parser.add_argument('--baseline', metavar='FILE', help='fail when rates are worse than in this baseline')
+    parser.add_argument('--save-baseline', metavar='FILE', help='write the rates of this run as a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed regression against the baseline, in percentage points and score points (default: 0.5)')
+
+
+def _percent(part, whole):
+    return f'{part / whole * 100 if whole else 0:5.1f}%'
+
+
+def _report(title, stats):
+    if not stats.weeks:
+        print(f'{title}: nothing to adapt\n')
+        return
+    score = stats.as_dict()['polarizationScore']
+    change = stats.as_dict()['scoreChange']
+    volume = stats.as_dict()['volumeRetention']
+    dropped = sum(stats.dropped.values())
+    print(f'{title}: {stats.weeks} adapted weeks, {stats.workouts} workouts')
+    print(f"   Polarization score: {score['mean']:.1f} (p5 {score['p5']}, p50 {score['p50']}, p95 {score['p95']}), "
+          f"{change['mean']:+.1f} against the original week")
+    print(f"   Volume retention:   {volume['mean']:.1f}% (p5 {volume['p5']}%, p50 {volume['p50']}%, max {volume['max']}%)")
+    print(f"   Dropped workouts:   {_percent(dropped, stats.workouts)} "
+          f"(hard {stats.dropped['hard']}, moderate {stats.dropped['moderate']}, easy {stats.dropped['easy']}), "
+          f"{_percent(stats.weeks_with_drop, stats.weeks)} of weeks")
+    print(f"   {'⚠️ ' if stats.free_drops else '✅'} Dropped while a day with time stayed free: {_percent(stats.free_drops, stats.workouts)} of workouts")
+    print(f"   Compressed:         {_percent(stats.compressed, stats.workouts)}   Extended: {_percent(stats.extended, stats.workouts)}")
+    print(f"   {'⚠️ ' if stats.overrun else '✅'} Kept longer than the day's time:         {_percent(stats.overrun, stats.workouts)} of workouts")
+    print(f"   {'⚠️ ' if stats.skipped_mismatch else '✅'} 'skipped' strategy count is wrong:       {_percent(stats.skipped_mismatch, stats.weeks)} of weeks")
+    print()
+
+
+def run(args):
+    import json
+    import math
+    import random
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ..adapter import (
+        WEEK_TEMPLATES, AdapterStats, adapt_schedule, load_time_slots, random_batch, vector_batch, verify, week_plan
+    )
+    from ..report import Timings, start_report, write_report
+    from ..schedule import ALL_DAYS, COMMITMENTS, WEEKS, generate_schedule
+
+    start_report(args)
+    timings = Timings()
+
+    print('🔄 WEEKLY ADAPTER SIMULATOR')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    goals = args.goals.split(',') if args.goals else list(db.goals)
+    commitments = args.commitments.split(',')
+    preferred_days = tuple(args.days.split(','))
+    for name, values, allowed in (('goal', goals, db.goals), ('commitment', commitments, COMMITMENTS),
+                                  ('day', preferred_days, ALL_DAYS)):
+        unknown = [v for v in values if v not in allowed]
+        if unknown:
+            print(f"❌ Unknown {name}: {', '.join(unknown)}")
+            return 2
+
+    try:
+        minutes_table = tuple(int(m) for m in args.minutes.split(','))
+    except ValueError:
+        print(f'❌ Invalid --minutes: {args.minutes}')
+        return 2
+    if not 0 < len(minutes_table) <= 256:
+        print('❌ --minutes takes 1 to 256 values')
+        return 2
+
+    # Weeks to adapt: every week of a few generated schedules per goal and commitment
+    with timings.stage('schedules'):
+        rng = random.Random(f'{args.seed}:adapter:schedules')
+        weeks, labels = [], []
+        for goal in goals:
+            for commitment in commitments:
+                for _ in range(args.schedules):
+                    schedule = generate_schedule(db, goal, commitment, preferred_days, rng)
+                    for week in range(1, WEEKS + 1):
+                        weeks.append(schedule[week])
+                        labels.append(f'{goal}/{commitment} W{week}')
+        plans = [week_plan(week) for week in weeks]
+
+    if args.vectors:
+        try:
+            vectors = load_time_slots(args.vectors)
+        except (OSError, ValueError, AttributeError) as e:
+            print(f'❌ Failed to read {args.vectors}: {e}')
+            return 2
+        vector_source = args.vectors
+    else:
+        vectors = [[slots[day] for day in ALL_DAYS] for slots in WEEK_TEMPLATES.values()]
+        vector_source = 'adapter templates'
+
+    print(f'📅 {len(plans)} weeks from {args.schedules} schedules × {len(goals) * len(commitments)} goal/commitment combinations')
+    print(f"🎲 {args.count} random pairs, minutes per day from {{{', '.join(map(str, sorted(set(minutes_table))))}}} (seed {args.seed})")
+    print(f'📼 {len(vectors)} recorded vectors ({vector_source}) × every week')
+    print(f"📌 Preferred days: {', '.join(preferred_days)}\n")
+
+    chunks = [(chunk, min(CHUNK, args.count - start)) for chunk, start in enumerate(range(0, args.count, CHUNK))]
+    vector_chunks = [vectors[i:i + max(1, CHUNK // len(plans))] for i in range(0, len(vectors), max(1, CHUNK // len(plans)))]
+
+    timings.start('adapt')
+    if args.jobs == 1:
+        random_results = [random_batch(plans, minutes_table, preferred_days, args.seed, chunk, n, args.worst)
+                          for chunk, n in chunks]
+        vector_results = [vector_batch(plans, part, preferred_days, args.worst) for part in vector_chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs or None) as pool:
+            random_futures = [pool.submit(random_batch, plans, minutes_table, preferred_days, args.seed, chunk, n, args.worst)
+                              for chunk, n in chunks]
+            vector_futures = [pool.submit(vector_batch, plans, part, preferred_days, args.worst) for part in vector_chunks]
+            random_results = [f.result() for f in random_futures]
+            vector_results = [f.result() for f in vector_futures]
+    random_stats = AdapterStats(worst_size=args.worst)
+    for stats in random_results:
+        random_stats.merge(stats)
+    recorded_stats = AdapterStats(worst_size=args.worst)
+    for stats in vector_results:
+        recorded_stats.merge(stats)
+    timings.stop('adapt')
+
+    # The cached fast path must agree with the straight port of adaptSchedule
+    with timings.stage('verify'):
+        verify_rng = random.Random(f'{args.seed}:adapter:verify')
+        pairs = [(verify_rng.randrange(len(weeks)), [verify_rng.choice(minutes_table) for _ in ALL_DAYS])
+                 for _ in range(args.verify)]
+        pairs += [(index, minutes) for index, minutes in random_stats.worst_cases()]
+        mismatches = verify(weeks, pairs, preferred_days)
+
+    _report('RANDOM AVAILABILITY', random_stats)
+    _report('RECORDED AVAILABILITY', recorded_stats)
+
+    if random_stats.weeks and args.worst:
+        print('Worst cases:')
+        for index, minutes in random_stats.worst_cases():
+            slots = dict(zip(ALL_DAYS, minutes))
+            result = adapt_schedule({1: weeks[index]}, 1, slots, {'preferredDays': list(preferred_days)})
+            summary = result['summary']
+            planned = ' '.join(f"{day}:{w['intensity'][0].upper()}{w['duration']}" if w else f'{day}:-'
+                               for day, w in weeks[index].items())
+            adapted = ' '.join(f"{day}:{w['intensity'][0].upper()}{w['duration']:g}" if w else f'{day}:-'
+                               for day, w in result['schedule'].items())
+            print(f"   • {labels[index]}: {summary['adaptedWorkouts']}/{summary['originalWorkouts']} workouts, "
+                  f"volume {summary['volumeRetention']}%, score {summary['polarizationScore']}")
+            print(f"     time     {' '.join(f'{day}:{m}' for day, m in slots.items())}")
+            print(f'     planned  {planned}')
+            print(f'     adapted  {adapted}')
+        print()
+
+    testcases = []
+    failed = False
+
+    if mismatches:
+        failed = True
+        print(f'❌ {len(mismatches)} of {len(pairs)} verified pairs differ from adaptSchedule:')
+        for problem in mismatches[:5]:
+            print(f'   • {problem}')
+        print()
+    testcases.append({'group': 'verify', 'name': f'{len(pairs)} pairs against adaptSchedule', 'failures': mismatches})
+
+    # Regression gate: rates may rise and the mean score may fall by at most the tolerance
+    current = {name: rate * 100 for name, rate in random_stats.rates().items()}
+    current['polarizationScore'] = random_stats.as_dict()['polarizationScore'].get('mean', 0)
+    settings = {'count': args.count, 'seed': args.seed, 'goals': goals, 'commitments': commitments,
+                'preferredDays': list(preferred_days), 'schedules': args.schedules, 'minutes': list(minutes_table)}
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f'❌ Failed to read baseline {args.baseline}: {e}')
+            return 2
+        if baseline.get('settings') != settings:
+            print('⚠️  Baseline was recorded with different settings; rates are compared anyway')
+        print(f'📏 Baseline {args.baseline} (tolerance {args.tolerance}):')
+        for name, value in current.items():
+            before = baseline.get('metrics', {}).get(name)
+            if before is None:
+                continue
+            worse = value - before if name != 'polarizationScore' else before - value
+            failures = []
+            if worse > args.tolerance and not math.isclose(worse, args.tolerance):
+                failed = True
+                failures.append(f'{name} {before:.2f} → {value:.2f}')
+            print(f"   {'❌' if failures else '✅'} {name:<18} {before:8.2f} → {value:8.2f}")
+            testcases.append({'group': 'baseline', 'name': name, 'failures': failures})
+        print()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'metrics': {k: round(v, 4) for k, v in current.items()}}, f, indent=2)
+        print(f'💾 Baseline written to {args.save_baseline}\n')
+
+    adapt_time = next(s['wall'] for s in timings.stages if s['stage'] == 'adapt')
+    total_weeks = random_stats.weeks + recorded_stats.weeks
+    print('═══════════════════════════════════════════════════════════')
+    print(f'⏱️  {total_weeks} weeks adapted in {adapt_time:.2f}s ({total_weeks / adapt_time if adapt_time else 0:.0f} weeks/s)')
+    print('✅ ADAPTER OK' if not failed else '❌ ADAPTER REGRESSION')
+
+    write_report(args, 'adapter', {
+        'settings': settings,
+        'random': random_stats.as_dict(),
+        'recorded': recorded_stats.as_dict(),
+        'worstCases': [{'week': labels[index], 'timeSlots': dict(zip(ALL_DAYS, minutes))}
+                       for index, minutes in random_stats.worst_cases()],
+        'verified': len(pairs),
+        'mismatches': mismatches,
+        'passed': not failed
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
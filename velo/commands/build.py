@@ -0,0 +1,100 @@
+"""
+Build per-goal shards
+
+Compiles WORKOUTS_DB into content-hashed per-goal JSON shards with parsed
+phases, total minutes, IF and TSS per variant, plus a manifest naming them
+(see velo.shards). --check only reports whether the shards on disk are up
+to date, for CI.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Compile WORKOUTS_DB into per-goal JSON shards and a manifest'
+
+
+def add_arguments(parser):
+    parser.add_argument('--out-dir', metavar='DIR',
+                        help='directory of the shards and manifest.json (default: public_html/app/assets/data/workouts)')
+    parser.add_argument('--check', action='store_true',
+                        help='write nothing; fail when the shards on disk are missing or out of date')
+    parser.add_argument('--keep-stale', action='store_true',
+                        help='keep shard files of earlier builds (by default they are removed)')
+
+
+def run(args):
+    import gzip
+
+    from ..report import Timings, start_report, write_report
+    from ..shards import DEFAULT_OUT_DIR, MANIFEST, build_shards, manifest_bytes, stale_files, write_shards
+
+    start_report(args)
+    timings = Timings()
+    out_dir = args.out_dir or DEFAULT_OUT_DIR
+
+    print('📦 WORKOUT SHARDS')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    with timings.stage('build'):
+        shards, manifest = build_shards(db)
+
+    source = db.content.encode('utf-8')
+    source_gzip = len(gzip.compress(source, 9, mtime=0))
+    print(f'Source:    workouts-db.js, {len(source) / 1024:.1f} KB ({source_gzip / 1024:.1f} KB gzip)')
+    print(f'Manifest:  {len(manifest_bytes(manifest))} bytes\n')
+
+    results = {'outDir': str(out_dir), 'sourceBytes': len(source), 'sourceGzipBytes': source_gzip, 'goals': {}}
+    testcases = []
+    for shard in shards:
+        compressed = shard.gzip_size()
+        results['goals'][shard.goal] = {
+            'file': shard.file,
+            'bytes': len(shard.data),
+            'gzipBytes': compressed,
+            'workouts': shard.workouts,
+            'variants': shard.variants
+        }
+        print(f'   {shard.file:<34} {len(shard.data) / 1024:7.1f} KB {compressed / 1024:6.1f} KB gzip, '
+              f'{shard.workouts} workouts, {shard.variants} variants')
+        testcases.append({'group': 'shards', 'name': shard.goal,
+                          'failures': [] if shard.workouts else [f'{shard.goal} has no workouts']})
+
+    largest = max(results['goals'].values(), key=lambda goal: goal['gzipBytes'], default=None)
+    if largest:
+        print(f"\nLargest goal: {largest['gzipBytes'] / 1024:.1f} KB gzip, "
+              f"{largest['gzipBytes'] / source_gzip * 100:.0f}% of the source (with phases, IF and TSS precomputed)")
+
+    failed = any(case['failures'] for case in testcases)
+    if args.check:
+        with timings.stage('check'):
+            stale = stale_files(shards, manifest, out_dir)
+        results['stale'] = stale
+        testcases.append({'group': 'check', 'name': str(out_dir),
+                          'failures': [f'{name} is missing or out of date' for name in stale]})
+        failed = failed or bool(stale)
+        print(f"\n{'✅' if not stale else '❌'} {out_dir}: "
+              f"{'up to date' if not stale else ', '.join(stale) + ' out of date, run: python -m velo build'}")
+    else:
+        with timings.stage('write'):
+            removed = write_shards(shards, manifest, out_dir, prune=not args.keep_stale)
+        results['removed'] = removed
+        print(f'\n💾 Wrote {len(shards)} shards and {MANIFEST} to {out_dir}')
+        for name in removed:
+            print(f'   🗑️  removed stale {name}')
+
+    print('\n═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall'] * 1000:.0f} ms")
+    print('✅ SHARDS OK' if not failed else '❌ SHARDS FAILED')
+
+    write_report(args, 'build', results, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
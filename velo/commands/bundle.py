@@ -0,0 +1,196 @@
+"""
+Script bundles
+
+Analyzes which window globals each script of a page defines and uses,
+prints the dependency graph, and writes one critical-path bundle per page
+plus lazily loaded chunks for the rarely used modules (see velo.bundles),
+with the bytes and estimated parse time taken off the critical path.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Build per-page script bundles and lazy chunks from the module dependency graph'
+
+
+def add_arguments(parser):
+    from ..bundles import DEFAULT_LAZY, DEFAULT_OUT_DIR, DEFAULT_PAGES, PARSE_KB_PER_MS
+
+    parser.add_argument('--root', metavar='DIR', help='site root (default: public_html/app)')
+    parser.add_argument('--pages', default=','.join(DEFAULT_PAGES),
+                        help=f"comma-separated pages under the root (default: {','.join(DEFAULT_PAGES)})")
+    parser.add_argument('--lazy', default=','.join(DEFAULT_LAZY),
+                        help="comma-separated scripts to load lazily, 'auto' for every module nothing needs "
+                             "at startup, or '' for none (default: Strava, Zwift export, cycling club)")
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR,
+                        help=f'bundle directory relative to the root (default: {DEFAULT_OUT_DIR})')
+    parser.add_argument('--dry-run', action='store_true', help='analyze and report only, write nothing')
+    parser.add_argument('--keep-stale', action='store_true',
+                        help='keep bundles and chunks of earlier builds (by default they are removed)')
+    parser.add_argument('--graph', action='store_true', help='print every dependency edge')
+    parser.add_argument('--dot', metavar='FILE', help='write the dependency graph of the first page as Graphviz')
+    parser.add_argument('--parse-rate', type=float, default=PARSE_KB_PER_MS,
+                        help=f'parse + compile throughput in KB/ms for the estimates (default: {PARSE_KB_PER_MS:g})')
+
+
+def _dot(page, graph):
+    lines = ['digraph scripts {', '    rankdir=LR;', '    node [shape=box, fontname="monospace"];']
+    for module in page.modules:
+        lines.append(f'    "{module.src}" [label="{module.src.rsplit("/", 1)[-1]}\\n{module.size / 1024:.1f} KB"];')
+    for src, edges in graph.items():
+        for dep, ref in edges.items():
+            style = 'bold' if ref.eager else 'dashed' if ref.guarded else 'solid'
+            lines.append(f'    "{src}" -> "{dep}" [label="{ref.name}", style={style}];')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def run(args):
+    import gzip
+    from pathlib import Path
+
+    from ..bundles import (DEFAULT_ROOT, analyze_page, build_bundle, dependency_graph, lazy_candidates,
+                           plan_page, prune_bundles)
+    from ..report import Timings, start_report, write_report
+
+    start_report(args)
+    timings = Timings()
+    root = Path(args.root or DEFAULT_ROOT)
+
+    print('🧩 SCRIPT BUNDLES')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    results = {}
+    testcases = []
+    failed = False
+    # Stems of the pages and chunks written, and the files written, for pruning
+    stems = set()
+    written = set()
+    for page_name in [p for p in args.pages.split(',') if p]:
+        if not (root / page_name).is_file():
+            print(f'❌ No such page: {root / page_name}\n')
+            testcases.append({'group': page_name, 'name': 'page', 'failures': [f'{page_name} not found']})
+            failed = True
+            continue
+
+        with timings.stage(f'analyze.{page_name}'):
+            try:
+                page = analyze_page(root, page_name)
+            except OSError as e:
+                print(f'❌ {page_name}: {e}\n')
+                testcases.append({'group': page_name, 'name': 'page', 'failures': [str(e)]})
+                failed = True
+                continue
+            graph, owners = dependency_graph(page.modules)
+            candidates = lazy_candidates(page, graph, owners)
+
+        print(f'{page_name.upper()}:')
+        if not page.modules:
+            print('   No local scripts in <body>, nothing to bundle\n')
+            results[page_name] = {'modules': 0}
+            testcases.append({'group': page_name, 'name': 'bundle', 'failures': []})
+            continue
+
+        lazy = candidates if args.lazy == 'auto' else [s for s in args.lazy.split(',') if s]
+        critical, lazy_modules, errors, warnings = plan_page(page, lazy)
+        lazy_srcs = {m.src for m in lazy_modules}
+
+        for module in page.modules:
+            edges = graph[module.src]
+            eager = sum(ref.eager for ref in edges.values())
+            guarded = sum(ref.guarded and not ref.eager for ref in edges.values())
+            print(f"   {'💤' if module.src in lazy_srcs else '⚡'} {module.src:<40} {module.size / 1024:6.1f} KB "
+                  f"{module.gzip_size / 1024:5.1f} KB gz  defines {', '.join(module.defines[:3]) or '-'}"
+                  f"{' …' if len(module.defines) > 3 else ''}; uses {len(edges)} ({eager} at load, {guarded} guarded)")
+            if args.graph:
+                for dep, ref in edges.items():
+                    kind = 'at load' if ref.eager else 'guarded' if ref.guarded else 'later'
+                    print(f'        → {dep} ({ref.name}, {kind}, line {ref.line})')
+        print(f"   Lazy candidates: {', '.join(c.rsplit('/', 1)[-1] for c in candidates) or 'none'}")
+        if page.head:
+            print(f"   Left in <head>: {', '.join(page.head)}")
+
+        if args.dot and not results:
+            Path(args.dot).write_text(_dot(page, graph), encoding='utf-8')
+            print(f'   💾 Graph written to {args.dot}')
+
+        with timings.stage(f'bundle.{page_name}'):
+            bundle = build_bundle(page, critical, lazy_modules, args.out_dir)
+
+        before = sum(m.size for m in page.modules)
+        before_gzip = sum(m.gzip_size for m in page.modules)
+        critical_gzip = len(gzip.compress(bundle.critical, 9, mtime=0))
+        lazy_bytes = sum(len(data) for data in bundle.chunks.values())
+        saved_ms = (before - len(bundle.critical)) / 1024 / args.parse_rate
+
+        print(f'\n   Before:   {len(page.modules)} script requests, {before / 1024:.1f} KB '
+              f'({before_gzip / 1024:.1f} KB gzip), all parsed before the app starts')
+        print(f'   Critical: 1 request, {bundle.critical_file}, {len(bundle.critical) / 1024:.1f} KB '
+              f'({critical_gzip / 1024:.1f} KB gzip)')
+        print(f'   Lazy:     {len(bundle.chunks)} chunks, {lazy_bytes / 1024:.1f} KB after load: '
+              f"{', '.join(bundle.chunks) or '-'}")
+        print(f'   Saved on the critical path: {max(before - len(bundle.critical), 0) / 1024:.1f} KB, '
+              f'{len(page.modules) - 1} requests, ≈{max(saved_ms, 0):.0f} ms parse at {args.parse_rate:g} KB/ms')
+
+        for error in errors:
+            print(f'   ❌ {error}')
+        for warning in warnings:
+            print(f'   ⚠️  {warning}')
+
+        if not args.dry_run and not errors:
+            with timings.stage(f'write.{page_name}'):
+                out_dir = root / args.out_dir
+                out_dir.mkdir(parents=True, exist_ok=True)
+                (out_dir / bundle.critical_file).write_bytes(bundle.critical)
+                for name, data in bundle.chunks.items():
+                    (out_dir / name).write_bytes(data)
+                stems.update([Path(page_name).stem] + [Path(m.src).stem for m in lazy_modules])
+                written.update([bundle.critical_file, *bundle.chunks])
+                html_path = root / page_name
+                html_path = html_path.with_name(f'{html_path.stem}.bundled{html_path.suffix}')
+                html_path.write_text(bundle.html, encoding='utf-8')
+            print(f'   💾 {args.out_dir}/{bundle.critical_file}, {len(bundle.chunks)} chunks, {html_path.name}')
+        print()
+
+        failed = failed or bool(errors)
+        results[page_name] = {
+            'modules': len(page.modules),
+            'graph': {src: {dep: {'name': ref.name, 'eager': ref.eager, 'guarded': ref.guarded, 'line': ref.line}
+                            for dep, ref in edges.items()} for src, edges in graph.items()},
+            'lazyCandidates': candidates,
+            'critical': [m.src for m in critical],
+            'lazy': [m.src for m in lazy_modules],
+            'bytesBefore': before,
+            'gzipBytesBefore': before_gzip,
+            'criticalFile': bundle.critical_file,
+            'criticalBytes': len(bundle.critical),
+            'criticalGzipBytes': critical_gzip,
+            'lazyBytes': lazy_bytes,
+            'estimatedParseMsSaved': round(max(saved_ms, 0), 1),
+            'errors': errors,
+            'warnings': warnings
+        }
+        testcases.append({'group': page_name, 'name': 'bundle', 'failures': errors})
+
+    # Only after a complete build: a page that was not rebuilt may still use older chunks
+    if written and not failed and not args.keep_stale:
+        with timings.stage('prune'):
+            removed = prune_bundles(root / args.out_dir, stems, written)
+        for name in removed:
+            print(f'🗑️  removed stale {args.out_dir}/{name}')
+        if removed:
+            print()
+        results['removed'] = removed
+
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall'] * 1000:.0f} ms")
+    print('✅ BUNDLES OK' if not failed else '❌ BUNDLES FAILED')
+
+    write_report(args, 'bundle', results, timings, testcases)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,226 @@
+"""
+Automated comprehensive test runner
+
+Simulates the testers of the comprehensive test suite (the nine defaults or
+a scenario matrix) against WORKOUTS_DB, optionally in a process pool, and
+can keep watching workouts-db.js afterwards.
+"""
+
+import sys
+from datetime import datetime
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Run the comprehensive tester scenarios against WORKOUTS_DB'
+
+
+def add_arguments(parser):
+    from ..scenarios import add_matrix_arguments
+
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='number of worker processes (0 = one per CPU core, default: 1)')
+    parser.add_argument('--watch', action='store_true',
+                        help='after the run, keep watching workouts-db.js and re-check only edited workouts')
+    parser.add_argument('--interval', type=float, default=0.2,
+                        help='seconds between file checks in --watch mode (default: 0.2)')
+    add_matrix_arguments(parser)
+
+
+def run(args):
+    from ..comprehensive import run_scenarios
+    from ..report import Timings, start_report, write_report
+    from ..scenarios import scenarios_from_args
+    from ..workouts_db import DEFAULT_DB_PATH
+
+    start_report(args)
+    timings = Timings()
+
+    print('🧪 AUTOMATED COMPREHENSIVE TEST RUNNER\n')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    # Testers: the nine defaults, or a generated scenario matrix
+    scenarios, scenario_count, matrix_mode = scenarios_from_args(args)
+
+    test_results = {
+        'total': 0,
+        'passed': 0,
+        'failed': 0,
+        'byGoal': {},
+        'byTester': []
+    }
+
+    # Read and parse the workouts database (cached on disk by content hash)
+    db = load_db(timings, cached=True)
+    if db is None:
+        return 1
+
+    # Goal index, built once per run and shared read-only by all testers (and pool workers)
+    goal_index = {}
+    for goal in db.goals:
+        with timings.stage(f'index.{goal}'):
+            goal_index[goal] = db.goal_workouts(goal)
+
+    # JUnit/JSON test cases; matrix runs only keep the failing scenarios
+    testcases = []
+
+    # Run all testers
+    print(f'🚀 Starting all {scenario_count} testers...\n')
+
+    timings.start('testers')
+
+    results = run_scenarios(scenarios, goal_index, jobs=args.jobs)
+    if timings.profile:
+        # One stage per tester under --profile (their validation runs in the workers with --jobs)
+        results = timings.profile.iterate(results, lambda item: f"tester.{item[0]['id']}", timings.add)
+
+    for tester, result, lines in results:
+        if not matrix_mode or not result['success']:
+            print('\n'.join(lines))
+        else:
+            # Matrix runs stream one line per passing scenario
+            print(f"✅ {tester['id']}: {result['passed']}/{result['tests']}")
+
+        # Track by goal
+        goal = tester['goal']
+        if goal not in test_results['byGoal']:
+            test_results['byGoal'][goal] = {
+                'testers': 0,
+                'tests': 0,
+                'passed': 0,
+                'failed': 0,
+                'workouts': 0,
+                'time': 0.0,
+                'cpuTime': 0.0
+            }
+
+        test_results['byGoal'][goal]['testers'] += 1
+        test_results['byGoal'][goal]['tests'] += result['tests']
+        test_results['byGoal'][goal]['passed'] += result['passed']
+        test_results['byGoal'][goal]['failed'] += result['failed']
+        test_results['byGoal'][goal]['workouts'] += result['workouts']
+        test_results['byGoal'][goal]['time'] += result['time']
+        test_results['byGoal'][goal]['cpuTime'] += result['cpuTime']
+
+        test_results['total'] += result['tests']
+        test_results['passed'] += result['passed']
+        test_results['failed'] += result['failed']
+
+        if not matrix_mode or not result['success']:
+            failures = [line.strip().lstrip('❌ ') for line in lines if '❌' in line]
+            testcases.append({
+                'group': goal,
+                'name': tester['id'],
+                'time': result['time'],
+                'cpuTime': result['cpuTime'],
+                'failures': failures
+            })
+
+        # Matrix runs only keep the totals, so large sweeps run in constant memory
+        if not matrix_mode:
+            test_results['byTester'].append({
+                'name': tester['name'],
+                'level': tester['level'],
+                'goal': tester['goal'],
+                **result
+            })
+
+    timings.stop('testers')
+
+    # Validation time per goal, summed over its testers (worker time with --jobs)
+    for goal, data in test_results['byGoal'].items():
+        timings.add(f'validate.{goal}', data['time'], data['cpuTime'])
+
+    # Matrix runs report one summary test case per goal next to the failing scenarios
+    if matrix_mode:
+        for goal, data in test_results['byGoal'].items():
+            testcases.append({
+                'group': goal,
+                'name': f"{goal} matrix ({data['testers']} scenarios)",
+                'time': round(data['time'], 6),
+                'cpuTime': round(data['cpuTime'], 6),
+                'failures': [f"{data['failed']} of {data['tests']} variant checks failed"] if data['failed'] else []
+            })
+
+    timings.start('report')
+
+    # Summary
+    print('\n\n═══════════════════════════════════════════════════════════')
+    print('📊 COMPREHENSIVE TEST RESULTS')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    print(f"Total Tests:     {test_results['total']}")
+    print(f"Passed:          {test_results['passed']} ✅")
+    print(f"Failed:          {test_results['failed']} {'❌' if test_results['failed'] > 0 else '✅'}")
+
+    success_rate = (test_results['passed'] / test_results['total'] * 100) if test_results['total'] > 0 else 0
+    print(f"Success Rate:    {success_rate:.1f}%\n")
+
+    # Per goal breakdown
+    print('PER GOAL BREAKDOWN:')
+    print('───────────────────────────────────────────────────────────\n')
+
+    for goal, data in test_results['byGoal'].items():
+        goal_success_rate = (data['passed'] / data['tests'] * 100) if data['tests'] > 0 else 0
+
+        print(f"{goal.upper()}:")
+        print(f"  Testers:       {data['testers']} (Beginner, Intermediate, Advanced)")
+        print(f"  Workouts:      {data['workouts']}")
+        print(f"  Tests:         {data['tests']}")
+        print(f"  Passed:        {data['passed']} ✅")
+        print(f"  Failed:        {data['failed']} {'❌' if data['failed'] > 0 else '✅'}")
+        print(f"  Success Rate:  {goal_success_rate:.1f}%\n")
+
+    # Tester breakdown
+    print('PER TESTER BREAKDOWN:')
+    print('───────────────────────────────────────────────────────────\n')
+
+    if matrix_mode:
+        print(f'{scenario_count} scenarios, see the streamed results above')
+
+    for tester in test_results['byTester']:
+        status = '✅' if tester['success'] else '❌'
+        print(f"{status} {tester['name']} ({tester['level']}, {tester['goal'].upper()}): {tester['passed']}/{tester['tests']}")
+
+    # Final verdict
+    print('\n═══════════════════════════════════════════════════════════')
+    if test_results['failed'] == 0:
+        print('🎉 ALL TESTS PASSED! The application is production-ready!')
+    else:
+        print(f"⚠️  {test_results['failed']} tests failed. Please review the issues above.")
+    print('═══════════════════════════════════════════════════════════\n')
+
+    timings.stop('report')
+    write_report(args, 'comprehensive', test_results, timings, testcases, db)
+
+    def print_change(incremental, change):
+        """Console feedback for one edit in --watch mode"""
+        stamp = datetime.now().strftime('%H:%M:%S')
+        if isinstance(change, Exception):
+            print(f'\n❌ {stamp} {change}')
+            return
+
+        print(f'\n🔄 {stamp} {len(change.changed)} changed, {change.removed} removed workouts '
+              f'({change.scope}, {change.seconds * 1000:.1f} ms)')
+        for workout, variant, errors, warnings in change.rows:
+            issues = f": {', '.join(errors)}" if errors else ''
+            print(f"   {'❌' if errors else '✅'} {workout.goal}/{workout.intensity}: {workout.name} ({variant}){issues}")
+            for warning in warnings:
+                print(f'      ⚠️  {warning}')
+
+        tests, passed, failed, warnings = incremental.totals()
+        print(f"   {'✅' if failed == 0 else '❌'} {passed}/{tests} variants valid, {warnings} warnings")
+
+    # Watch mode: keep the parsed tree and re-check only the workouts that change
+    if args.watch:
+        from ..watch import watch
+
+        print(f'👀 Watching {DEFAULT_DB_PATH} (Ctrl+C to stop)...')
+        incremental = watch(DEFAULT_DB_PATH, print_change, args.interval, db)
+        return 1 if incremental.totals()[2] > 0 else 0
+
+    # Exit code
+    return 1 if test_results['failed'] > 0 else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
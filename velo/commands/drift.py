@@ -0,0 +1,134 @@
+"""
+Drift check
+
+Compares copies of workouts-db.js: builds a hash tree (goal → intensity →
+workout → variant) per file (see velo.drift) and reports exactly which
+workouts and variants differ from the first file.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Report structural differences between copies of workouts-db.js'
+
+
+def add_arguments(parser):
+    parser.add_argument('files', nargs='*',
+                        help='workouts-db.js files; the first is the reference '
+                             '(default: the public_html copy and config/workouts-db.js)')
+    parser.add_argument('--values', action='store_true', help='show old and new values of changed fields')
+    parser.add_argument('--no-cache', action='store_true', help='always parse the files again')
+
+
+def _default_files():
+    from .. import workouts_db
+
+    return [workouts_db.DEFAULT_DB_PATH, workouts_db.REPO_ROOT / 'config' / 'workouts-db.js']
+
+
+def _relative(path):
+    import os
+
+    from ..workouts_db import REPO_ROOT
+
+    try:
+        return os.path.relpath(path, REPO_ROOT)
+    except ValueError:
+        return str(path)
+
+
+def _shorten(value, width=90):
+    text = repr(value)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def run(args):
+    from .. import workouts_db
+    from ..drift import build_tree, diff
+    from ..report import Timings, start_report, write_report
+
+    start_report(args)
+    timings = Timings()
+
+    print('🌳 WORKOUTS_DB DRIFT CHECK')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    files = args.files or _default_files()
+    if len(files) < 2:
+        print('❌ Give at least two files to compare')
+        return 2
+
+    cache_dir = None if args.no_cache else workouts_db.DEFAULT_CACHE_DIR
+    databases, trees = [], []
+    for path in files:
+        try:
+            with timings.stage(f'parse.{_relative(path)}'):
+                db = workouts_db.load(path, cache_dir)
+            with timings.stage('hash'):
+                tree = build_tree(db)
+        except (OSError, workouts_db.WorkoutsDBError) as e:
+            print(f'❌ Failed to parse {path}: {e}')
+            return 1
+        databases.append(db)
+        trees.append(tree)
+
+    for i, (db, tree) in enumerate(zip(databases, trees)):
+        same = next((j for j in range(i) if trees[j].hash == tree.hash), None)
+        note = ' (reference)' if i == 0 else f' = {_relative(databases[same].path)}' if same is not None else ''
+        print(f'📄 {_relative(db.path)}{note}')
+        print(f"   root {tree.hash.hex()[:16]}  {tree.count('workout')} workouts, {tree.count('variant')} variants")
+    print()
+
+    testcases = []
+    results = []
+    reference, reference_tree = databases[0], trees[0]
+
+    for db, tree in zip(databases[1:], trees[1:]):
+        with timings.stage('diff'):
+            differences = list(diff(reference_tree, tree))
+        results.append({'file': _relative(db.path), 'root': tree.hash.hex(),
+                        'differences': [d.as_dict() for d in differences]})
+
+        if not differences:
+            print(f'✅ {_relative(db.path)}: identical to the reference\n')
+            testcases.append({'group': _relative(db.path), 'name': 'tree', 'failures': []})
+            continue
+
+        print(f'❌ {_relative(db.path)}: {len(differences)} differences')
+        for d in differences:
+            where = '/'.join(d.path) or 'WORKOUTS_DB'
+            if d.kind == 'changed':
+                lines = f'line {reference.line_of(d.pos)} / {db.line_of(d.other_pos)}'
+                print(f"   ~ {where}: {', '.join(sorted(d.fields))} ({lines})")
+                if args.values:
+                    for name, (old, new) in sorted(d.fields.items()):
+                        print(f'       {name}: {_shorten(old)}')
+                        print(f"       {' ' * len(name)}  → {_shorten(new)}")
+            elif d.kind == 'removed':
+                print(f'   - {where}: {d.level} only in the reference (line {reference.line_of(d.pos)})')
+            elif d.kind == 'added':
+                print(f'   + {where}: {d.level} only in this copy (line {db.line_of(d.other_pos)})')
+            else:
+                print(f'   ↕ {where}: same {d.level} entries in another order')
+            testcases.append({'group': _relative(db.path), 'name': f'{d.kind} {where}',
+                              'failures': [f'{d.kind}: ' + ', '.join(sorted(d.fields)) if d.fields else d.kind]})
+        print()
+
+    drifted = sum(1 for r in results if r['differences'])
+    hashed = sum(s['wall'] for s in timings.stages if s['stage'] == 'hash')
+    compared = sum(s['wall'] for s in timings.stages if s['stage'] == 'diff')
+    print('═══════════════════════════════════════════════════════════')
+    print(f'⏱️  {len(databases)} files hashed in {hashed * 1000:.1f}ms, compared in {compared * 1000:.2f}ms')
+    print('✅ ALL COPIES IDENTICAL' if not drifted else f'❌ {drifted} OF {len(results)} COPIES DRIFTED FROM THE REFERENCE')
+
+    write_report(args, 'drift', {
+        'reference': {'file': _relative(reference.path), 'root': reference_tree.hash.hex()},
+        'copies': results
+    }, timings, testcases, reference)
+
+    return 1 if drifted else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,113 @@
+"""
+Duplicate detector
+
+Finds variants with identical or near-identical phase structure, typically
+workouts copied between goals with small edits (see velo.duplicates).
+Candidates come from LSH buckets of MinHash sketches, so the cost grows
+with the number of distinct structures, not with the number of pairs.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Find exact and near-duplicate workout variants by phase structure'
+
+
+def add_arguments(parser):
+    from ..duplicates import THRESHOLD
+
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'similarity (0-1) from which variants count as near duplicates (default: {THRESHOLD})')
+    parser.add_argument('--limit', type=int, default=20, help='clusters to print, 0 for all (default: 20)')
+    parser.add_argument('--fail-on-exact', action='store_true',
+                        help='fail when different workouts have exactly the same structure')
+
+
+def _label(workout, variant):
+    return f'{workout.goal}/{workout.intensity}: {workout.name} ({variant.key}, {variant.duration} min)'
+
+
+def run(args):
+    from ..duplicates import find_duplicates
+    from ..report import Timings, start_report, write_report
+
+    start_report(args)
+    timings = Timings()
+
+    print('👯 DUPLICATE DETECTOR')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    with timings.stage('duplicates'):
+        report = find_duplicates(db, args.threshold)
+
+    exact = [c for c in report.clusters if c.exact]
+    near = [c for c in report.clusters if not c.exact]
+    print(f'Variants:    {report.variants}, {report.signatures} distinct structures')
+    print(f'Compared:    {report.candidates} candidate pairs from LSH buckets '
+          f'(of {report.all_pairs} pairs), {report.verified} at ≥ {args.threshold:g} similarity')
+    print(f'Clusters:    {len(exact)} exact, {len(near)} near\n')
+
+    def line(variant):
+        return db.line_of(variant.details_pos if variant.details_pos >= 0 else variant.pos)
+
+    shown = report.clusters if not args.limit else report.clusters[:args.limit]
+    for cluster in shown:
+        kind = 'Exact' if cluster.exact else 'Near'
+        print(f"{'🟰' if cluster.exact else '≈'}  {kind}: {len(cluster.members)} variants of {cluster.workouts} "
+              f"workouts ({', '.join(cluster.goals)})")
+        first, *rest = cluster.members
+        print(f'   {_label(*first)} - line {line(first[1])}')
+        for (workout, variant), score in zip(rest, cluster.similarity):
+            similarity = '' if cluster.exact else f' [{score:.2f}]'
+            print(f'   {_label(workout, variant)} - line {line(variant)}{similarity}')
+        print()
+    if len(shown) < len(report.clusters):
+        print(f'… {len(report.clusters) - len(shown)} more clusters (--limit 0 for all)\n')
+
+    testcases = []
+    clusters = []
+    for cluster in report.clusters:
+        first_workout, first_variant = cluster.members[0]
+        failures = []
+        if args.fail_on_exact and cluster.exact and cluster.workouts > 1:
+            failures.append(f'{cluster.workouts} workouts share the structure of {first_workout.name} '
+                            f'({first_variant.key}): ' + '; '.join(_label(w, v) for w, v in cluster.members[1:]))
+        testcases.append({'group': 'exact' if cluster.exact else 'near',
+                          'name': f'{first_workout.goal}/{first_workout.name} ({first_variant.key})',
+                          'failures': failures})
+        clusters.append({
+            'exact': cluster.exact,
+            'goals': cluster.goals,
+            'members': [{'goal': w.goal, 'intensity': w.intensity, 'name': w.name, 'variant': v.key,
+                         'line': line(v)} for w, v in cluster.members],
+            'similarity': cluster.similarity
+        })
+    failed = any(case['failures'] for case in testcases)
+
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall'] * 1000:.0f} ms")
+    if failed:
+        print('❌ DUPLICATE STRUCTURES FOUND')
+    else:
+        print('✅ DUPLICATES CHECKED' + (' (clusters are warnings, see --fail-on-exact)' if report.clusters else ''))
+
+    write_report(args, 'duplicates', {
+        'threshold': args.threshold,
+        'variants': report.variants,
+        'signatures': report.signatures,
+        'candidatePairs': report.candidates,
+        'verifiedPairs': report.verified,
+        'allPairs': report.all_pairs,
+        'clusters': clusters
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,97 @@
+"""
+Zwift export catalogue
+
+Writes a .zwo file for every workout variant with the same segments as the
+browser download, streamed to a directory or a zip archive and checked for
+well-formedness and segment durations on the way.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Export every WORKOUTS_DB variant as a Zwift .zwo file'
+
+
+def add_arguments(parser):
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--out-dir', metavar='DIR', help='write the .zwo files under DIR/<goal>/<intensity>/')
+    target.add_argument('--zip', metavar='FILE', help='write the .zwo files into the zip archive FILE')
+    parser.add_argument('--variants', default=None,
+                        help='comma-separated variant keys to export (default: all)')
+    parser.add_argument('--strict', action='store_true',
+                        help='also fail on files whose segments are off the parsed phases or the duration')
+
+
+def run(args):
+    from ..report import Timings, start_report, write_report
+    from ..zwo import TOLERANCE_MINUTES, export_catalogue
+
+    start_report(args)
+    timings = Timings()
+
+    print('📤 ZWIFT EXPORT CATALOGUE')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    variants = set(args.variants.split(',')) if args.variants else None
+    destination = args.zip or args.out_dir
+    print(f'🎯 Target: {destination or "(check only, nothing written)"}\n')
+
+    files = 0
+    broken = 0
+    total_bytes = 0
+    errors = []
+    warnings = []
+    testcases = []
+
+    with timings.stage('export'):
+        for result in export_catalogue(db, out_dir=args.out_dir, zip_path=args.zip, variants=variants):
+            files += 1
+            broken += bool(result.errors)
+            total_bytes += result.bytes
+            label = f'{result.goal}/{result.intensity}: {result.workout} ({result.variant})'
+            errors.extend(f'{label}: {e}' for e in result.errors)
+            warnings.extend(f'{label}: {w}' for w in result.warnings)
+            testcases.append({
+                'group': result.goal,
+                'name': result.path,
+                'failures': result.errors + (result.warnings if args.strict else [])
+            })
+
+    export_time = timings.stages[-1]['wall']
+
+    print(f'📊 Files:     {files}')
+    print(f'📊 Size:      {total_bytes / 1024:.1f} KB')
+    print(f'⏱️  Time:      {export_time * 1000:.1f} ms ({files / export_time if export_time else 0:.0f} files/s)')
+
+    print(f'\n{"✅" if not errors else "❌"} Well-formed: {files - broken}/{files}')
+    for error in errors:
+        print(f'   • {error}')
+
+    print(f'\n{"✅" if not warnings else "⚠️ "} Segment durations (±{TOLERANCE_MINUTES} min): {len(warnings)} warnings')
+    for warning in warnings:
+        print(f'   • {warning}')
+
+    failed = bool(errors) or (args.strict and bool(warnings))
+
+    print('\n═══════════════════════════════════════════════════════════')
+    print('✅ EXPORT CATALOGUE OK' if not failed else '❌ EXPORT CATALOGUE FAILED')
+
+    write_report(args, 'export', {
+        'target': destination,
+        'files': files,
+        'bytes': total_bytes,
+        'errors': errors,
+        'warnings': warnings,
+        'passed': not failed
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
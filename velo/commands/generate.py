@@ -0,0 +1,86 @@
+"""
+Synthetic database generator
+
+Writes a valid workouts-db.js of any size (see velo.synthetic): goals,
+workouts per intensity (or a scale of the shipped database), details
+complexity and repeated workout names are configurable. Nothing is written
+that the parser would not read back.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Generate a synthetic WORKOUTS_DB source file'
+
+
+def add_arguments(parser):
+    from ..synthetic import COMPLEXITIES
+    from ..workouts_db import GOALS
+
+    parser.add_argument('file', metavar='FILE', help="file to write ('-' for stdout)")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--workouts', '-w', type=int, help='workouts per goal and intensity')
+    size.add_argument('--scale', type=float, default=1.0,
+                      help='size as a multiple of the shipped database (default: 1)')
+    parser.add_argument('--goals', default=str(len(GOALS)),
+                        help=f'number of goals or comma-separated goal keys (default: {len(GOALS)})')
+    parser.add_argument('--complexity', choices=COMPLEXITIES, default='mixed',
+                        help='details strings: one interval pattern, the shipped patterns, or long '
+                             'multi-sentence text (default: mixed)')
+    parser.add_argument('--duplicates', type=float, default=0.0,
+                        help='share of workouts (0-1) that repeat an earlier name of their intensity (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for --duplicates (default: 0)')
+
+
+def run(args):
+    from .. import workouts_db
+    from ..report import Timings, start_report, write_report
+    from ..synthetic import generate_db, scaled_workouts
+
+    if args.file == '-' and args.format != 'text' and not args.output:
+        print('❌ Writing the database to stdout needs --output for the report', file=sys.stderr)
+        return 2
+    stdout = sys.stdout
+    start_report(args)
+    timings = Timings()
+
+    goals = int(args.goals) if args.goals.isdigit() else args.goals.split(',')
+    if not goals or not 0 <= args.duplicates <= 1:
+        print('❌ Need at least one goal and --duplicates between 0 and 1', file=sys.stderr)
+        return 2
+    per_intensity = args.workouts if args.workouts is not None else scaled_workouts(args.scale, goals)
+
+    with timings.stage('generate'):
+        content = generate_db(per_intensity, goals, complexity=args.complexity, duplicates=args.duplicates,
+                              seed=args.seed)
+
+    # Refuse to write anything the parser would not read back
+    try:
+        with timings.stage('parse'):
+            db = workouts_db.parse(content)
+    except workouts_db.WorkoutsDBError as e:
+        print(f'❌ Generated source does not parse: {e}', file=sys.stderr)
+        return 1
+
+    if args.file == '-':
+        stdout.write(content)
+    else:
+        with open(args.file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f'✅ {args.file}: {len(db.goals)} goals, {len(db.workouts())} workouts, {len(db.variants())} variants, '
+              f"{len(content.encode('utf-8')) / 1024:.1f} KB ({args.complexity}, duplicates {args.duplicates:g})")
+
+    write_report(args, 'generate', {
+        'file': args.file,
+        'complexity': args.complexity,
+        'duplicates': args.duplicates,
+        'workouts': len(db.workouts()),
+        'variants': len(db.variants())
+    }, timings, [], db)
+
+    return 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
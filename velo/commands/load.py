@@ -0,0 +1,139 @@
+"""
+Training load
+
+NP, IF and TSS per variant from the parsed phases (see velo.load), compared
+with the ProgressModule.calculateTSS estimate, and CTL / ATL / TSB over
+generated 6-week schedules.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Training load of every variant and of generated schedules'
+
+
+def add_arguments(parser):
+    from ..schedule import COMMITMENTS, DEFAULT_PREFERRED_DAYS
+
+    parser.add_argument('--table', metavar='FILE',
+                        help='write the per-variant load table to FILE (.csv or .json)')
+    parser.add_argument('--ftp', default=None,
+                        help="FTP values for NP in watts in the table, e.g. '150-350:25' or '200,250'")
+    parser.add_argument('--count', '-n', type=int, default=20000,
+                        help='schedules per goal and commitment (default: 20000, 0 = skip)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--goals', default=None, help='comma-separated goals (default: all in the database)')
+    parser.add_argument('--commitments', default=','.join(COMMITMENTS),
+                        help='comma-separated time commitments (default: starter,regular,serious)')
+    parser.add_argument('--days', default=','.join(DEFAULT_PREFERRED_DAYS),
+                        help='comma-separated preferred days (default: Tue,Thu,Sat)')
+
+
+def _write_table(path, rows, ftps):
+    import csv
+    import json
+
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            fields = [k for k in rows[0] if k != 'npWatts'] + [f'npWatts{ftp}' for ftp in ftps]
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                # A copy per CSV row: rows also go into the report with their npWatts
+                flat = {k: v for k, v in row.items() if k != 'npWatts'}
+                flat.update((f'npWatts{ftp}', w) for ftp, w in row.get('npWatts', {}).items())
+                writer.writerow(flat)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+def run(args):
+    from ..load import ATL_DAYS, CTL_DAYS, build_load_table, simulate_load
+    from ..report import Timings, start_report, write_report
+    from ..scenarios import parse_ftp_range
+    from ..schedule import ALL_DAYS, COMMITMENTS
+    from ..workout_parser import build_phase_table
+
+    start_report(args)
+    timings = Timings()
+
+    print('📈 TRAINING LOAD')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    goals = args.goals.split(',') if args.goals else list(db.goals)
+    commitments = args.commitments.split(',')
+    preferred_days = tuple(args.days.split(','))
+    for name, values, allowed in (('goal', goals, db.goals), ('commitment', commitments, COMMITMENTS),
+                                  ('day', preferred_days, ALL_DAYS)):
+        unknown = [v for v in values if v not in allowed]
+        if unknown:
+            print(f"❌ Unknown {name}: {', '.join(unknown)}")
+            return 2
+
+    with timings.stage('phases'):
+        phases = build_phase_table(db)
+    with timings.stage('table'):
+        load = build_load_table(phases)
+
+    ftps = parse_ftp_range(args.ftp) if args.ftp else []
+    rows = list(load.rows(ftps))
+
+    print(f'📊 Variants: {len(load)}')
+    print(f"📊 TSS from phases:  {sum(load.tss) / len(load):.1f} per variant")
+    print(f"📊 TSS estimate:     {sum(load.estimate) / len(load):.1f} per variant (ProgressModule.calculateTSS)")
+    unparsed = [r for r in rows if not r['mainParsed']]
+    if unparsed:
+        print(f'⚠️  {len(unparsed)} variants without a parsed main set count warm-up/cool-down only')
+
+    print('\nLargest differences with the estimate:')
+    for row in sorted(rows, key=lambda r: abs(r['tss'] - r['estimatedTss']), reverse=True)[:5]:
+        print(f"   • {row['goal']}/{row['intensity']}: {row['workout']} ({row['variant']}) - "
+              f"TSS {row['tss']:.0f} vs {row['estimatedTss']:.0f} estimated, IF {row['if']:.2f}")
+
+    if args.table:
+        with timings.stage('write'):
+            _write_table(args.table, rows, ftps)
+        print(f'\n💾 Load table written to {args.table}')
+
+    results = []
+    if args.count:
+        print(f'\n🎲 {args.count} schedules per goal/commitment (CTL {CTL_DAYS}d, ATL {ATL_DAYS}d, seed {args.seed})\n')
+        for goal in goals:
+            for commitment in commitments:
+                with timings.stage(f'schedules.{goal}.{commitment}'):
+                    stats = simulate_load(db, load, goal, commitment, args.count, args.seed, preferred_days)
+                results.append(stats)
+                print(f'{goal.upper()} / {commitment}:')
+                print(f"   6-week TSS:   {stats.total_tss['mean']:.0f} ± {stats.total_tss['stdev']:.0f} "
+                      f"(estimate {stats.estimated_total_tss['mean']:.0f})")
+                print('   Week TSS p50: ' + ' | '.join(f"W{i + 1} {w['p50']:.0f}" for i, w in enumerate(stats.week_tss)))
+                print(f"   Final CTL:    {stats.final_ctl['mean']:.1f} "
+                      f"(p5 {stats.final_ctl['p5']:.1f}, p95 {stats.final_ctl['p95']:.1f})")
+                print(f"   Peak ATL:     {stats.peak_atl['mean']:.1f}   Lowest TSB: {stats.lowest_tsb['mean']:.1f} "
+                      f"(p5 {stats.lowest_tsb['p5']:.1f})   Final TSB: {stats.final_tsb['mean']:.1f}")
+                print(f"   Peak ramp:    {stats.peak_ramp['mean']:.1f} CTL/week (max {stats.peak_ramp['max']:.1f})")
+                print()
+
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall']:.2f}s")
+
+    write_report(args, 'load', {
+        'variants': rows,
+        'schedules': [stats.as_dict() for stats in results]
+    }, timings, [
+        {'group': 'variants', 'name': f"{r['goal']}/{r['intensity']}/{r['workout']} ({r['variant']})",
+         'failures': [] if r['mainParsed'] else ['main set not parsed, TSS covers warm-up/cool-down only']}
+        for r in rows
+    ], db)
+
+    return 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
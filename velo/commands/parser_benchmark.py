@@ -0,0 +1,129 @@
+"""
+Parser benchmark
+
+Parses synthetic databases of up to 10k workouts (see velo.synthetic) and
+checks that the time per workout stays flat, that duplicate names still
+resolve to their own block, and that a stray token after deep indentation
+is rejected quickly instead of backtracking over the whitespace.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Check that the WORKOUTS_DB parser scales linearly and rejects bad input fast'
+
+WORKOUTS_PER_INTENSITY = [12, 120, 1200]   # × 3 goals × 3 intensities = up to 10,800 workouts
+REPEATS = 3
+MAX_GROWTH = 2.0          # allowed growth of the per-workout cost between sizes
+INDENTS = [8, 64, 512]    # spaces before a stray token that must be rejected
+MAX_REJECT_MS = 50        # time allowed to reject it
+
+
+def add_arguments(parser):
+    parser.add_argument('--repeat', type=int, default=REPEATS,
+                        help=f'parses per size, best time is kept (default: {REPEATS})')
+
+
+def _parse_all(content):
+    """Parse and extract every goal the way the test scripts do"""
+    from .. import workouts_db
+
+    db = workouts_db.parse(content)
+    for goal in db.goals:
+        db.goal_workouts(goal)
+    return db
+
+
+def run(args):
+    import time
+
+    from .. import workouts_db
+    from ..report import Timings, start_report, write_report
+    from ..synthetic import generate_db
+
+    start_report(args)
+    timings = Timings()
+
+    print('⏱️  WORKOUTS_DB PARSER SCALING BENCHMARK\n')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    failed = False
+    per_workout = []
+    testcases = []
+    results = {'sizes': [], 'rejects': []}
+
+    print(f"{'Workouts':>10} {'Bytes':>12} {'Time':>10} {'Per workout':>14}")
+    print('───────────────────────────────────────────────────────────')
+
+    sizes = [n * 9 for n in WORKOUTS_PER_INTENSITY]
+
+    for n, size in zip(WORKOUTS_PER_INTENSITY, sizes):
+        content = generate_db(n, unique_names=False)
+        best = float('inf')
+        with timings.stage(f'parse.{size}'):
+            for _ in range(max(args.repeat, 1)):
+                start = time.perf_counter()
+                db = _parse_all(content)
+                best = min(best, time.perf_counter() - start)
+
+        # Duplicate names must still resolve to their own block
+        workouts = db.workouts()
+        wrong = [w for w in workouts if w.variants['short'].duration != 45 + w.index % 5 * 5]
+        failures = []
+        if len(workouts) != size or wrong:
+            failures.append(f'parsed {len(workouts)}, {len(wrong)} resolved to the wrong block')
+            print(f'❌ {size} workouts: {failures[0]}')
+            failed = True
+        testcases.append({'group': 'sizes', 'name': f'{size} workouts', 'time': best, 'failures': failures})
+        results['sizes'].append({'workouts': size, 'bytes': len(content), 'seconds': round(best, 6)})
+
+        per_workout.append(best / size)
+        print(f'{size:>10} {len(content):>12,} {best * 1000:>8.1f}ms {best / size * 1e6:>11.1f}µs')
+
+    print()
+    for (small, large), (a, b) in zip(zip(sizes, sizes[1:]), zip(per_workout, per_workout[1:])):
+        growth = b / a
+        status = '✅' if growth <= MAX_GROWTH else '❌'
+        print(f'{status} {small} → {large} workouts: per-workout cost ×{growth:.2f}')
+        failures = [] if growth <= MAX_GROWTH else [f'per-workout cost ×{growth:.2f}']
+        testcases.append({'group': 'growth', 'name': f'{small} → {large}', 'failures': failures})
+        if failures:
+            failed = True
+
+    # A stray token after deep indentation must fail fast, not backtrack over the whitespace
+    print()
+    content = generate_db(12, unique_names=False)
+    at = content.index('details:')
+    for indent in INDENTS:
+        broken = content[:at] + ' ' * indent + '+' + content[at:]
+        start = time.perf_counter()
+        try:
+            workouts_db.parse(broken)
+            error = None
+        except workouts_db.WorkoutsDBError as e:
+            error = e
+        elapsed = (time.perf_counter() - start) * 1000
+        ok = error is not None and elapsed <= MAX_REJECT_MS
+        status = '✅' if ok else '❌'
+        outcome = 'rejected' if error else 'accepted'
+        print(f"{status} stray '+' after {indent} spaces: {outcome} in {elapsed:.1f}ms")
+        testcases.append({'group': 'reject', 'name': f'{indent} spaces', 'time': elapsed / 1000,
+                          'failures': [] if ok else [f'{outcome} in {elapsed:.1f}ms']})
+        results['rejects'].append({'indent': indent, 'rejected': error is not None, 'ms': round(elapsed, 3)})
+        if not ok:
+            failed = True
+
+    print()
+    if failed:
+        print('⚠️  Parser does not scale linearly or is slow to reject bad input')
+    else:
+        print('🎉 Parser scales linearly up to 10k workouts')
+
+    write_report(args, 'parser', results, timings, testcases)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,97 @@
+"""
+Phase validator
+
+Parses every workout variant like the browser does and reports variants
+whose main set cannot be parsed and variants whose phases do not add up to
+their duration.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Parse WORKOUTS_DB details into phases like WorkoutParser'
+
+
+def add_arguments(parser):
+    parser.add_argument('--strict', action='store_true',
+                        help='also fail on variants whose phases do not add up to their duration')
+    parser.add_argument('--phases', action='store_true',
+                        help='print the phase table of every variant')
+
+
+def run(args):
+    from ..report import Timings, start_report, write_report
+    from ..workout_parser import TOLERANCE_MINUTES, build_phase_table
+
+    start_report(args)
+    timings = Timings()
+
+    print('🧩 PHASE VALIDATOR')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    with timings.stage('phases'):
+        table = build_phase_table(db)
+
+    unparsed = table.unparsed()
+    mis_summed = table.mis_summed()
+
+    def label(i):
+        workout, variant = table.variants[i]
+        return f'{workout.goal}/{workout.intensity}: {workout.name} ({variant.key})'
+
+    print(f'📊 Variants: {len(table)}')
+    print(f'📊 Phases: {len(table.kind)}')
+
+    if args.phases:
+        for i in range(len(table)):
+            print(f'\n   {label(i)} - {table.declared[i]:g} min')
+            for kind, start, duration, power in table.phases(i):
+                print(f'      {start:6.1f}  {duration:5.1f} min  {power:5.1f}%  {kind}')
+
+    print(f'\n{"✅" if not unparsed else "❌"} Main set parsed: {len(table) - len(unparsed)}/{len(table)}')
+    for i in unparsed:
+        workout, variant = table.variants[i]
+        print(f'   • {label(i)} - regel {db.line_of(variant.details_pos)}')
+
+    print(f'\n{"✅" if not mis_summed else "⚠️ "} Phases add up (±{TOLERANCE_MINUTES} min): {len(table) - len(mis_summed)}/{len(table)}')
+    for i in mis_summed:
+        print(f'   • {label(i)}: {table.total[i]:.1f} min calculated, {table.declared[i]:g} min specified')
+
+    failed = bool(unparsed) or (args.strict and bool(mis_summed))
+
+    print('\n═══════════════════════════════════════════════════════════')
+    print('✅ ALL PHASES VALID' if not failed else '❌ PHASE VALIDATION FAILED')
+
+    unparsed_set = set(unparsed)
+    mis_summed_set = set(mis_summed)
+    testcases = []
+    for i in range(len(table)):
+        failures = []
+        if i in unparsed_set:
+            failures.append(f'{label(i)}: main set could not be parsed')
+        if args.strict and i in mis_summed_set:
+            failures.append(f'{label(i)}: phases sum to {table.total[i]:.1f} min, duration is {table.declared[i]:g} min')
+        workout, variant = table.variants[i]
+        testcases.append({'group': workout.goal, 'name': f'{workout.intensity}/{workout.name} ({variant.key})', 'failures': failures})
+
+    write_report(args, 'phases', {
+        'variants': len(table),
+        'phases': len(table.kind),
+        'unparsed': [label(i) for i in unparsed],
+        'misSummed': [
+            {'variant': label(i), 'calculated': round(table.total[i], 2), 'specified': table.declared[i]}
+            for i in mis_summed
+        ],
+        'passed': not failed
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,122 @@
+"""
+Catalogue query
+
+Answers queries over the workout catalogue from the inverted index of
+velo.catalogue, e.g. `velo query "hard ftp 60-75 min 4x8 above 105% FTP"`
+or `velo query goal:climbing reps:>=4 word:cadence`. The index is loaded
+from the cache when workouts-db.js has not changed, so the database is
+parsed only on the first query after an edit.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Query the workout catalogue through its inverted index'
+
+
+def add_arguments(parser):
+    parser.add_argument('queries', nargs='*', metavar='QUERY',
+                        help='one query per argument; without any, the indexed fields are listed')
+    parser.add_argument('--limit', type=int, default=20, help='rows to print per query, 0 for all (default: 20)')
+    parser.add_argument('--count', action='store_true', help='print the number of matches only')
+    parser.add_argument('--repeat', type=int, default=1000,
+                        help='searches per query for the timing (default: 1000)')
+    parser.add_argument('--no-cache', action='store_true', help='build the index in memory, ignoring the cache')
+
+
+def _shape(row):
+    if row.length is not None:
+        return f'{row.reps}×{row.length:g} min'
+    if row.reps:
+        return f'{row.reps} steps'
+    return 'steady'
+
+
+def run(args):
+    import time
+
+    from .. import workouts_db
+    from ..catalogue import QueryError, load_index, parse_query
+    from ..report import Timings, start_report, write_report
+
+    start_report(args)
+    timings = Timings()
+
+    print('🔎 CATALOGUE QUERY')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    path = workouts_db.DEFAULT_DB_PATH
+    try:
+        with timings.stage('load'):
+            content = workouts_db.read_source(path)
+        with timings.stage('index'):
+            index, cached = load_index(content, path, None if args.no_cache else workouts_db.DEFAULT_CACHE_DIR)
+    except (OSError, workouts_db.WorkoutsDBError) as e:
+        print(f'❌ Failed to parse WORKOUTS_DB: {e}')
+        return 1
+
+    terms = index.terms()
+    print(f"Index:     {len(index)} rows, {sum(terms.values())} terms, "
+          f"{'loaded from cache' if cached else 'built'} in {timings.stages[-1]['wall'] * 1000:.1f} ms")
+    print('Terms:     ' + ', '.join(f'{name} {count}' for name, count in terms.items()) + '\n')
+
+    if not args.queries:
+        for name in ('goal', 'intensity', 'variant'):
+            print(f"   {name + ':':<11}{', '.join(index.keywords[name])}")
+        for name, (values, _) in index.numeric.items():
+            print(f"   {name + ':':<11}{', '.join(f'{value:g}' for value in values)}")
+        print('\n   e.g. velo query "hard ftp 60-75 min 4x8 above 105% FTP" "climbing word:cadence -variant:long"\n')
+
+    results = {'rows': len(index), 'cached': cached, 'terms': terms, 'queries': {}}
+    testcases = []
+    for query in args.queries:
+        try:
+            clauses = parse_query(query, index)
+        except QueryError as e:
+            print(f'❌ {query!r}: {e}\n')
+            testcases.append({'group': 'query', 'name': query, 'failures': [str(e)]})
+            continue
+
+        with timings.stage('query'):
+            times = []
+            for _ in range(max(args.repeat, 1)):
+                started = time.perf_counter()
+                bits = index.bitmap(clauses)
+                times.append(time.perf_counter() - started)
+        times.sort()
+        matches = bits.bit_count()
+        ids = index.row_ids(bits, args.limit or None)
+
+        print(f"{query!r} → {' '.join(map(str, clauses)) or 'everything'}")
+        print(f'   {matches} match{"es" if matches != 1 else ""} in {times[0] * 1e6:.1f} µs '
+              f'(median {times[len(times) // 2] * 1e6:.1f} µs of {len(times)})')
+        if not args.count:
+            for row in (index.rows[i] for i in ids):
+                print(f"   {row.goal + '/' + row.intensity:<20} {row.display_name or row.name:<40} "
+                      f"{row.minutes:4d} min {row.power:4d}%  {_shape(row)}")
+            if matches > len(ids):
+                print(f'   … {matches - len(ids)} more (--limit 0 for all)')
+        print()
+
+        results['queries'][query] = {
+            'clauses': [str(clause) for clause in clauses],
+            'matches': matches,
+            'bestMicros': round(times[0] * 1e6, 2),
+            'medianMicros': round(times[len(times) // 2] * 1e6, 2),
+            'rows': [index.rows[i]._asdict() for i in ids]
+        }
+        testcases.append({'group': 'query', 'name': query, 'failures': []})
+
+    failed = any(case['failures'] for case in testcases)
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall'] * 1000:.0f} ms")
+    print('✅ QUERIES OK' if not failed else '❌ QUERIES FAILED')
+
+    write_report(args, 'query', results, timings, testcases)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
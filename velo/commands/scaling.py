@@ -0,0 +1,258 @@
+"""
+Scaling benchmark
+
+Runs every validator and simulator against synthetic databases of 1×, 10×,
+100× and 1000× the shipped size (see velo.synthetic), each in a child
+process; records wall time and peak memory per run, flags super-linear
+growth and, with --baseline, regressions. A run fails when it exits with
+anything but 0 or 1, or when it dies on an uncaught exception.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Time every validator and simulator against growing synthetic databases'
+
+# Command name -> arguments after the interpreter; {db} and {copy} are the generated files
+COMMANDS = {
+    'workouts': ['-m', 'velo', 'validate', '--suites', 'workouts'],
+    'phases': ['-m', 'velo', 'validate', '--suites', 'phases'],
+    'simulator': ['-m', 'velo', 'validate', '--suites', 'simulator'],
+    'comprehensive': ['-m', 'velo', 'validate', '--suites', 'comprehensive'],
+    'stats': ['-m', 'velo', 'stats'],
+    'export': ['-m', 'velo', 'export'],
+    'schedules': ['-m', 'velo', 'simulate', '--count', '1000'],
+    'load': ['-m', 'velo', 'load', '--count', '1000'],
+    'adapter': ['-m', 'velo', 'adapt', '--count', '20000', '--schedules', '2', '--verify', '100'],
+    'drift': ['-m', 'velo', 'drift', '--no-cache', '{db}', '{copy}']
+}
+
+# Runs shorter than this (seconds) or smaller than this (MB) are not compared against a baseline
+TIME_NOISE = 0.1
+MEMORY_NOISE = 5.0
+
+# Growth is only judged once the earlier size added this many seconds over the smallest
+GROWTH_FLOOR = 1.0
+
+
+def add_arguments(parser):
+    from ..synthetic import COMPLEXITIES
+
+    parser.add_argument('--scales', default='1,10,100,1000',
+                        help='database sizes as multiples of the shipped database (default: 1,10,100,1000)')
+    parser.add_argument('--commands', default=','.join(COMMANDS),
+                        help=f"comma-separated commands (default: {','.join(COMMANDS)})")
+    parser.add_argument('--complexity', choices=COMPLEXITIES, default='mixed',
+                        help='details strings of the generated databases (default: mixed)')
+    parser.add_argument('--duplicates', type=float, default=0.1,
+                        help='share of repeated workout names (default: 0.1)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per command and size, best time is kept (default: 1)')
+    parser.add_argument('--timeout', type=float, default=900, help='seconds before a run is killed (default: 900)')
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help='allowed growth of the per-workout cost between consecutive sizes (default: 2.0)')
+    parser.add_argument('--keep', metavar='DIR', help='write the generated databases to DIR and keep them')
+    parser.add_argument('--baseline', metavar='FILE', help='fail when time or memory is worse than in this baseline')
+    parser.add_argument('--save-baseline', metavar='FILE', help='write the results of this run as a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed regression against the baseline, as a fraction (default: 0.25)')
+
+
+def _measure(argv, env, timeout):
+    """(wall seconds, peak RSS in MB or None, exit code, stderr tail, crashed) of one child process
+
+    crashed is True when stderr holds a Python traceback: an uncaught
+    exception exits with 1, the same code as a validator finding.
+    """
+    import os
+    import subprocess
+    import tempfile
+    import threading
+    import time
+
+    from ..workouts_db import REPO_ROOT
+
+    with tempfile.TemporaryFile() as errors:
+        start = time.perf_counter()
+        proc = subprocess.Popen(argv, env=env, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=errors)
+        killer = threading.Timer(timeout, proc.kill)
+        killer.start()
+        try:
+            if hasattr(os, 'wait4'):
+                _, status, usage = os.wait4(proc.pid, 0)
+                wall = time.perf_counter() - start
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                # ru_maxrss is in KB on Linux, in bytes on macOS
+                peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+            else:
+                proc.wait()
+                wall = time.perf_counter() - start
+                peak = None
+        finally:
+            killer.cancel()
+        errors.seek(0)
+        lines = errors.read().decode('utf-8', 'replace').strip().splitlines()
+    crashed = any(line.startswith('Traceback (most recent call last):') for line in lines)
+    return wall, peak, proc.returncode, lines[-1] if lines else '', crashed
+
+
+def run(args):
+    import json
+    import os
+    import shutil
+    import tempfile
+
+    from ..report import Timings, start_report, write_report
+    from ..synthetic import scaled_db
+
+    start_report(args)
+    timings = Timings()
+
+    print('📏 SCALING BENCHMARK')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    try:
+        scales = sorted({float(s) if '.' in s else int(s) for s in args.scales.split(',')})
+    except ValueError:
+        print(f'❌ Invalid --scales: {args.scales}')
+        return 2
+    commands = args.commands.split(',')
+    unknown = [c for c in commands if c not in COMMANDS]
+    if unknown or not scales or args.repeat < 1:
+        print(f"❌ Unknown command: {', '.join(unknown)}" if unknown else '❌ Need at least one scale and one run')
+        return 2
+
+    workdir = args.keep or tempfile.mkdtemp(prefix='velo-scaling-')
+    os.makedirs(workdir, exist_ok=True)
+    results = {name: {} for name in commands}
+    sizes = {}
+    testcases = []
+    failed = False
+
+    try:
+        for scale in scales:
+            with timings.stage(f'generate.{scale}x'):
+                content = scaled_db(scale, complexity=args.complexity, duplicates=args.duplicates)
+                path = os.path.join(workdir, f'workouts-db-{scale}x.js')
+                copy = os.path.join(workdir, f'workouts-db-{scale}x-edited.js')
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                # One changed tip, so the drift check has something to find
+                with open(copy, 'w', encoding='utf-8') as f:
+                    f.write(content.replace('Generated for benchmarks.', 'Generated for benchmark runs.', 1))
+            workouts = content.count('                name: "')
+            sizes[scale] = {'workouts': workouts, 'bytes': len(content.encode('utf-8'))}
+            print(f"🧬 {scale}×: {workouts} workouts, {sizes[scale]['bytes'] / 1024 / 1024:.2f} MB")
+
+            for name in commands:
+                argv = [sys.executable] + [a.format(db=path, copy=copy) for a in COMMANDS[name]]
+                walls, peaks = [], []
+                broken = []
+                for attempt in range(args.repeat):
+                    # A fresh cache directory per run, so no run reads what an earlier one parsed
+                    cache = os.path.join(workdir, f'cache-{scale}-{name}-{attempt}')
+                    env = dict(os.environ, VELO_DB_PATH=path, VELO_CACHE_DIR=cache)
+                    with timings.stage(f'{name}.{scale}x'):
+                        wall, peak, code, tail, crashed = _measure(argv, env, args.timeout)
+                    shutil.rmtree(cache, ignore_errors=True)
+                    walls.append(wall)
+                    if peak is not None:
+                        peaks.append(peak)
+                    # Exit 1 is a validator finding, unless it came with a traceback
+                    if crashed:
+                        broken.append(f'crashed (exit {code}): {tail}')
+                    elif code not in (0, 1):
+                        broken.append(f'exit code {code}: {tail}')
+                # Fastest time, largest peak: the least noisy reading of each
+                best = {'wall': round(min(walls), 4), 'peakMB': round(max(peaks), 1) if peaks else None, 'exit': code}
+                results[name][scale] = best
+
+                failures = broken[:1]
+                if failures:
+                    failed = True
+                testcases.append({'group': name, 'name': f'{scale}x', 'time': best['wall'], 'failures': failures})
+                peak_text = f"{best['peakMB']:7.1f} MB" if best['peakMB'] is not None else '      -'
+                print(f"   {'❌' if failures else '✅'} {name:<14} {best['wall']:8.2f}s {peak_text}"
+                      + (f'  ({failures[0]})' if failures else ''))
+            print()
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # Per-workout cost above the fixed cost of the smallest size, between consecutive sizes
+    print('Growth of the per-workout cost (time above the smallest size / added workouts):')
+    for name in commands:
+        runs = [(sizes[s]['workouts'], results[name][s]['wall']) for s in scales]
+        if len(runs) < 3:
+            print(f'   {name:<14} needs three sizes')
+            continue
+        (n0, t0), costs, added = runs[0], [], []
+        for n, t in runs[1:]:
+            added.append(t - t0)
+            costs.append(max(t - t0, 0) / (n - n0) if n > n0 else 0)
+        # Below the floor the added time is mostly start-up jitter, not per-workout work
+        growth = [b / a if a > 0 and extra >= GROWTH_FLOOR else None
+                  for a, b, extra in zip(costs, costs[1:], added)]
+        failures = [f'per-workout cost ×{g:.2f} from {s1}× to {s2}×'
+                    for g, s1, s2 in zip(growth, scales[1:], scales[2:]) if g is not None and g > args.max_growth]
+        if failures:
+            failed = True
+        testcases.append({'group': name, 'name': 'growth', 'failures': failures})
+        judged = [g for g in growth if g is not None]
+        print(f"   {'❌' if failures else '✅'} {name:<14} " + '  '.join(f'{c * 1e6:8.1f}µs' for c in costs)
+              + (f'   (worst ×{max(judged):.2f})' if judged else '   (too fast to judge)'))
+    print()
+
+    settings = {'scales': scales, 'complexity': args.complexity, 'duplicates': args.duplicates}
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f'❌ Failed to read baseline {args.baseline}: {e}')
+            return 2
+        if baseline.get('settings') != settings:
+            print('⚠️  Baseline was recorded with different settings; runs are compared anyway')
+        print(f'📏 Baseline {args.baseline} (tolerance {args.tolerance:.0%}):')
+        for name in commands:
+            for scale in scales:
+                before = baseline.get('results', {}).get(name, {}).get(str(scale))
+                if not before:
+                    continue
+                now = results[name][scale]
+                failures = []
+                if now['wall'] > before['wall'] * (1 + args.tolerance) and now['wall'] - before['wall'] > TIME_NOISE:
+                    failures.append(f"time {before['wall']:.2f}s → {now['wall']:.2f}s")
+                if (now['peakMB'] and before.get('peakMB') and now['peakMB'] > before['peakMB'] * (1 + args.tolerance)
+                        and now['peakMB'] - before['peakMB'] > MEMORY_NOISE):
+                    failures.append(f"memory {before['peakMB']:.1f} MB → {now['peakMB']:.1f} MB")
+                if failures:
+                    failed = True
+                    print(f"   ❌ {name} {scale}×: {', '.join(failures)}")
+                testcases.append({'group': 'baseline', 'name': f'{name} {scale}x', 'failures': failures})
+        print()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings,
+                       'results': {name: {str(s): r for s, r in runs.items()} for name, runs in results.items()}},
+                      f, indent=2)
+        print(f'💾 Baseline written to {args.save_baseline}\n')
+
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall']:.2f}s")
+    print('✅ SCALING OK' if not failed else '❌ SCALING BENCHMARK FAILED')
+
+    write_report(args, 'scaling', {
+        'settings': settings,
+        'sizes': {str(s): v for s, v in sizes.items()},
+        'results': {name: {str(s): r for s, r in runs.items()} for name, runs in results.items()}
+    }, timings, testcases)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
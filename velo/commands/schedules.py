@@ -0,0 +1,139 @@
+"""
+Schedule simulator
+
+Monte Carlo over ScheduleModule.generateSchedule: draws many 6-week
+schedules per goal and time commitment and reports the spread of weekly
+minutes, intensity mix, repeated workouts and placement.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Monte Carlo statistics of generated training schedules'
+
+
+def add_arguments(parser):
+    from ..schedule import COMMITMENTS, DEFAULT_PREFERRED_DAYS
+
+    parser.add_argument('--count', '-n', type=int, default=100000,
+                        help='schedules per goal and commitment (default: 100000)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--goals', default=None, help='comma-separated goals (default: all in the database)')
+    parser.add_argument('--commitments', default=','.join(COMMITMENTS),
+                        help='comma-separated time commitments (default: starter,regular,serious)')
+    parser.add_argument('--days', default=','.join(DEFAULT_PREFERRED_DAYS),
+                        help='comma-separated preferred days (default: Tue,Thu,Sat)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='number of worker processes (0 = one per CPU core, default: 1)')
+    parser.add_argument('--where', metavar='QUERY',
+                        help='only draw variants matching a catalogue query (see velo query), '
+                             'e.g. "minutes:<=60" or "-word:sprint"')
+
+
+def run(args):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ..report import Timings, start_report, write_report
+    from ..schedule import ALL_DAYS, COMMITMENTS, simulate
+
+    start_report(args)
+    timings = Timings()
+
+    print('📅 SCHEDULE SIMULATOR')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    if args.where:
+        from ..catalogue import QueryError, load_index
+        from ..workouts_db import DEFAULT_CACHE_DIR
+
+        with timings.stage('index'):
+            index, _ = load_index(db.content, db.path, DEFAULT_CACHE_DIR, db)
+        try:
+            db = index.restrict(db, args.where)
+        except QueryError as e:
+            print(f'❌ --where: {e}')
+            return 2
+        print(f'🔎 Only variants matching {args.where!r}: {len(db.variants())} of {len(index)}')
+
+    goals = args.goals.split(',') if args.goals else list(db.goals)
+    commitments = args.commitments.split(',')
+    preferred_days = tuple(args.days.split(','))
+    for name, values, allowed in (('goal', goals, db.goals), ('commitment', commitments, COMMITMENTS),
+                                  ('day', preferred_days, ALL_DAYS)):
+        unknown = [v for v in values if v not in allowed]
+        if unknown:
+            print(f"❌ Unknown {name}: {', '.join(unknown)}")
+            return 2
+
+    combos = [(goal, commitment) for goal in goals for commitment in commitments]
+    print(f'🎲 {args.count} schedules × {len(combos)} goal/commitment combinations (seed {args.seed})')
+    print(f"📌 Preferred days: {', '.join(preferred_days)}\n")
+
+    def simulate_combo(combo):
+        goal, commitment = combo
+        return simulate(db, goal, commitment, args.count, args.seed, preferred_days)
+
+    timings.start('simulate')
+    if args.jobs == 1:
+        results = list(map(simulate_combo, combos))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs or None) as pool:
+            results = list(pool.map(simulate, [db] * len(combos), *zip(*combos),
+                                    [args.count] * len(combos), [args.seed] * len(combos),
+                                    [preferred_days] * len(combos)))
+    timings.stop('simulate')
+
+    def percent(rate):
+        return f'{rate * 100:5.1f}%'
+
+    testcases = []
+    failed = False
+
+    for stats in results:
+        minutes = stats.total_minutes
+        print(f'{stats.goal.upper()} / {stats.commitment}:')
+        print(f"   Total minutes:     {minutes['mean']:.0f} ± {minutes['stdev']:.0f} "
+              f"(p5 {minutes['p5']:.0f}, p95 {minutes['p95']:.0f}, {minutes['min']}-{minutes['max']})")
+        print('   Week minutes p50:  ' + ' | '.join(f"W{i + 1} {w['p50']:.0f}" for i, w in enumerate(stats.week_minutes)))
+        print(f"   Hard/moderate:     {stats.intense_share['mean'] * 100:.1f}% of minutes "
+              f"(p5 {stats.intense_share['p5'] * 100:.1f}%, p95 {stats.intense_share['p95'] * 100:.1f}%)")
+        print(f"   Distinct workouts: {stats.distinct_workouts['mean']:.1f} per plan "
+              f"(min {stats.distinct_workouts['min']})")
+        print(f"   {'⚠️ ' if stats.repeat_in_week else '✅'} Same workout twice in a week:    {percent(stats.repeat_in_week)} of plans")
+        print(f"   {'⚠️ ' if stats.back_to_back else '✅'} Hard/moderate on adjacent days: {percent(stats.back_to_back)} of plans")
+        print(f"   {'⚠️ ' if stats.four_in_a_row else '✅'} 4+ training days in a row:      {percent(stats.four_in_a_row)} of plans")
+        print(f"   {'⚠️ ' if stats.off_preference else '✅'} Workouts on non-preferred days: {percent(stats.off_preference)} of plans")
+        print(f"   {'❌' if stats.missing_intensity else '✅'} Weeks missing a planned intensity: {percent(stats.missing_intensity)}")
+        print()
+
+        failures = []
+        if stats.missing_intensity:
+            failed = True
+            failures.append(f'{stats.missing_intensity * 100:.1f}% of weeks have no workouts for a planned intensity')
+        testcases.append({'group': stats.goal, 'name': stats.commitment, 'failures': failures})
+
+    simulate_time = timings.stages[-1]['wall']
+    print('═══════════════════════════════════════════════════════════')
+    print(f'⏱️  {args.count * len(combos)} schedules in {simulate_time:.2f}s '
+          f'({args.count * len(combos) / simulate_time if simulate_time else 0:.0f} schedules/s)')
+    print('✅ SCHEDULES OK' if not failed else '❌ SCHEDULE SIMULATION FOUND BROKEN PLANS')
+
+    write_report(args, 'schedules', {
+        'count': args.count,
+        'seed': args.seed,
+        'preferredDays': list(preferred_days),
+        'where': args.where,
+        'combinations': [stats.as_dict() for stats in results],
+        'passed': not failed
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,212 @@
+"""
+Workout scorer
+
+Runs analyzeWorkoutQuality over local activity files: scores batches of
+activities with power streams against their scheduled workouts and writes
+batched upserts for the workout_scores table. With --jobs the files are
+scored in worker processes, one file per task.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Score activities against their scheduled workouts for workout_scores'
+
+# Users per simulated activity file
+USERS_PER_FILE = 50
+
+
+def add_arguments(parser):
+    from ..scoring import COMPLETION_MODES
+
+    parser.add_argument('files', nargs='*', help='activity files (JSON lines or JSON array)')
+    parser.add_argument('--completion', choices=COMPLETION_MODES, default='browser',
+                        help="completion score: 'browser' (intervals for hard workouts, as strava-config.js) or "
+                             "'phases' (planned work and steady phases ridden at target) (default: browser)")
+    parser.add_argument('--sql', metavar='FILE', help='write INSERT ... ON CONFLICT DO UPDATE statements to FILE')
+    parser.add_argument('--csv', metavar='FILE', help='write the rows to FILE as CSV')
+    parser.add_argument('--batch', type=int, default=500, help='rows per INSERT statement (default: 500)')
+    parser.add_argument('--synced-at', default=None,
+                        help='synced_at for records without one (default: now)')
+    parser.add_argument('--simulate', type=int, default=0, metavar='USERS',
+                        help='first write activities of USERS simulated riders and score them too')
+    parser.add_argument('--simulate-dir', default='simulated-activities',
+                        help='directory for the simulated activity files (default: simulated-activities)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of --simulate (default: 0)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='number of worker processes, one file per task (0 = one per CPU core, default: 1)')
+
+
+def _safe_score_file(path, completion, synced_at):
+    """score_file() in a worker; a file that cannot be read comes back as (None, error, None)"""
+    from ..scoring import score_file
+
+    try:
+        return score_file(path, completion, synced_at)
+    except (OSError, ValueError) as e:
+        return None, str(e), None
+
+
+def _write_simulated(db, args):
+    """Activities of args.simulate simulated riders, USERS_PER_FILE per file; (paths, records written)"""
+    import json
+    import os
+
+    from ..scoring import simulated_activities
+
+    os.makedirs(args.simulate_dir, exist_ok=True)
+    paths = []
+    current = None
+    out = None
+    written = 0
+    try:
+        for record in simulated_activities(db, args.simulate, args.seed):
+            user = int(record['user_id'].rsplit('-', 1)[1])
+            if current != user // USERS_PER_FILE:
+                current = user // USERS_PER_FILE
+                if out:
+                    out.close()
+                path = os.path.join(args.simulate_dir, f'activities-{current:04d}.jsonl')
+                out = open(path, 'w', encoding='utf-8')
+                paths.append(path)
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            written += 1
+    finally:
+        if out:
+            out.close()
+    return paths, written
+
+
+def run(args):
+    import csv
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from datetime import datetime, timezone
+    from functools import partial
+
+    from ..report import Timings, start_report, write_report
+    from ..schedule import summarize
+    from ..scoring import COLUMNS, ScoreStats, latest_rows, upsert_sql
+
+    start_report(args)
+    timings = Timings()
+
+    print('🏅 WORKOUT SCORER')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    if args.batch < 1:
+        print('❌ --batch must be at least 1')
+        return 2
+    synced_at = args.synced_at or datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+    files = list(args.files)
+    db = None
+    if args.simulate:
+        db = load_db(timings)
+        if db is None:
+            return 1
+        with timings.stage('simulate'):
+            paths, written = _write_simulated(db, args)
+        files.extend(paths)
+        print(f'🎲 {written} activities of {args.simulate} simulated riders written to {args.simulate_dir}/ (seed {args.seed})')
+
+    if not files:
+        print('❌ No activity files (pass files or --simulate USERS)')
+        return 2
+
+    print(f'📂 {len(files)} activity file(s), completion scored as {args.completion!r}\n')
+
+    sql = open(args.sql, 'w', encoding='utf-8') if args.sql else None
+    table = open(args.csv, 'w', newline='', encoding='utf-8') if args.csv else None
+    writer = csv.DictWriter(table, fieldnames=COLUMNS) if table else None
+    if sql:
+        sql.write('BEGIN;\n\n')
+    if writer:
+        writer.writeheader()
+
+    stats = ScoreStats()
+    testcases = []
+    failed = False
+    pending = []
+    statements = 0
+
+    def flush(rows):
+        nonlocal statements
+        rows = latest_rows(rows)
+        if sql:
+            sql.write(upsert_sql(rows) + '\n')
+            statements += 1
+        if writer:
+            writer.writerows(rows)
+
+    timings.start('score')
+    task = partial(_safe_score_file, completion=args.completion, synced_at=synced_at)
+    pool = ProcessPoolExecutor(max_workers=args.jobs or None) if args.jobs != 1 else None
+    try:
+        for path, (rows, rejected, file_stats) in zip(files, pool.map(task, files) if pool else map(task, files)):
+            if rows is None:
+                failed = True
+                print(f'❌ {path}: {rejected}')
+                testcases.append({'group': 'files', 'name': path, 'failures': [rejected]})
+                continue
+            stats.merge(file_stats)
+            if rejected:
+                failed = True
+                print(f'⚠️  {path}: {len(rejected)} record(s) rejected, first: {rejected[0][0]}: {rejected[0][1]}')
+            testcases.append({'group': 'files', 'name': path,
+                              'failures': [f'{position}: {message}' for position, message in rejected]})
+            pending.extend(rows)
+            while len(pending) >= args.batch:
+                flush(pending[:args.batch])
+                del pending[:args.batch]
+        if pending:
+            flush(pending)
+    finally:
+        if pool:
+            pool.shutdown()
+    seconds, _ = timings.stop('score')
+
+    if sql:
+        sql.write('COMMIT;\n')
+        sql.close()
+    if table:
+        table.close()
+
+    components = {name: summarize(values) for name, values in stats.components.items() if values}
+    print(f'📊 Scored:   {stats.activities} activities, {stats.samples} power samples'
+          + (f', {stats.rejected} rejected' if stats.rejected else ''))
+    print(f'⚡ Rate:     {stats.activities / seconds if seconds else 0:.0f} activities/s, '
+          f'{stats.samples / seconds / 1e6 if seconds else 0:.1f}M samples/s ({max(1, args.jobs or os.cpu_count())} job(s))')
+    if stats.activities:
+        print('\nTotal score distribution:')
+        for total in sorted(stats.totals, reverse=True):
+            count = stats.totals[total]
+            print(f'   {total:2d}/10  {count / stats.activities * 100:5.1f}%  {"█" * round(count / stats.activities * 50)}')
+        print()
+        for name, label in (('duration', 'Duration'), ('powerZones', 'Power zones'), ('completion', 'Completion')):
+            summary = components[name]
+            print(f"   {label + ':':13s} mean {summary['mean']:.2f} (p5 {summary['p5']:g}, p50 {summary['p50']:g}, p95 {summary['p95']:g})")
+    if sql:
+        print(f'\n💾 {statements} upsert statement(s) of up to {args.batch} rows written to {args.sql}')
+    if args.csv:
+        print(f'💾 Rows written to {args.csv}')
+
+    print('\n═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall']:.2f}s")
+
+    write_report(args, 'scoring', {
+        'completion': args.completion,
+        'files': len(files),
+        'activities': stats.activities,
+        'rejected': stats.rejected,
+        'samples': stats.samples,
+        'totals': {str(total): count for total, count in sorted(stats.totals.items())},
+        'components': components
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
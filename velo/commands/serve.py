@@ -0,0 +1,57 @@
+"""
+Static server
+
+Serves public_html/app like the CDN does: precompressed gzip/brotli
+variants, strong ETags with 304 responses, immutable caching for
+content-hashed files and an access log with optional timing (see
+velo.static). Replaces `python -m http.server 8000` for local testing.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Serve public_html/app with precompression, ETags and cache headers'
+
+
+def add_arguments(parser):
+    parser.add_argument('--root', metavar='DIR', help='directory to serve (default: public_html/app)')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on (default: 8000)')
+    parser.add_argument('--log', choices=('common', 'timing', 'off'), default='common',
+                        help='access log: one line per request, with encoding and handler time, '
+                             'or nothing (default: common)')
+    parser.add_argument('--no-warm', action='store_true',
+                        help='compress files on first request instead of at startup')
+
+
+def run(args):
+    from ..static import DEFAULT_ROOT, brotli, make_server
+
+    root = args.root or DEFAULT_ROOT
+    try:
+        server = make_server(root, args.host, args.port, args.log)
+    except OSError as e:
+        print(f'❌ Cannot listen on {args.host}:{args.port}: {e.strerror or e}')
+        return 1
+
+    print('🌍 STATIC SERVER')
+    print('═══════════════════════════════════════════════════════════\n')
+    print(f'📁 Root:      {server.RequestHandlerClass.cache.root}')
+    print(f"🗜️  Encodings: {'br, gzip' if brotli else 'gzip (pip install brotli for br)'}")
+    if not args.no_warm:
+        files, plain, encoded = server.RequestHandlerClass.cache.warm()
+        print(f'🔥 Prebuilt:  {files} files, {plain / 1024:.1f} KB → {encoded / 1024:.1f} KB compressed')
+    print(f'\n📍 http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)\n', flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,211 @@
+"""
+Static server benchmark
+
+Loads each page with its scripts and stylesheets from `python -m http.server`
+and from the velo static server (see velo.static): cold (empty cache) and
+again as a reload (conditional requests, immutable files skipped). Checks
+that every compressed response decodes to the file, and compares requests,
+bytes and an estimated load time.
+"""
+
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Compare page loads from http.server and the velo static server'
+
+# Browsers open up to six connections per host
+CONNECTIONS = 6
+ACCEPT_ENCODING = 'gzip, deflate, br'
+
+
+def add_arguments(parser):
+    parser.add_argument('--pages', default='index.html,intake.html',
+                        help='comma-separated pages under the root (default: index.html,intake.html)')
+    parser.add_argument('--root', metavar='DIR', help='directory to serve (default: public_html/app)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='loads per page and server, best time is kept (default: 20)')
+    parser.add_argument('--mbps', type=float, default=10.0,
+                        help='bandwidth of the estimated load time in Mbit/s (default: 10)')
+    parser.add_argument('--rtt', type=float, default=40.0,
+                        help='round trip of the estimated load time in ms (default: 40)')
+
+
+def _start_plain(root):
+    """http.server on root from a background thread, without its access log; returns (server, host)"""
+    import functools
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class Quiet(SimpleHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(Quiet, directory=str(root)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'127.0.0.1:{server.server_address[1]}'
+
+
+def _fetch(conn, url, cached=None):
+    """(status, response headers, body bytes, wire bytes) of one GET; cached holds the validators"""
+    headers = {'Accept-Encoding': ACCEPT_ENCODING}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last-modified'):
+            headers['If-Modified-Since'] = cached['last-modified']
+    conn.request('GET', url, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    head = sum(len(k) + len(v) + 4 for k, v in response.getheaders()) + 17
+    return response.status, {k.lower(): v for k, v in response.getheaders()}, body, head + len(body)
+
+
+def _decoded(headers, body):
+    import gzip
+
+    return gzip.decompress(body) if headers.get('content-encoding') == 'gzip' else body
+
+
+def _load_page(host, page, args, cache=None):
+    """One page load; with a cache it is a reload that revalidates and skips immutable files"""
+    import http.client
+    import posixpath
+    import time
+
+    from ..static import IMMUTABLE, page_assets
+
+    conn = http.client.HTTPConnection(host)
+    urls = ['/' + page]
+    stats = {'requests': 0, 'skipped': 0, 'bytes': 0, 'notModified': 0}
+    responses = {}
+    start = time.perf_counter()
+    status, headers, body, wire = _fetch(conn, urls[0], cache and cache.get(urls[0]))
+    html = _decoded(headers, body) if status == 200 else cache[urls[0]]['body']
+    urls += ['/' + posixpath.normpath(posixpath.join(posixpath.dirname(page), u))
+             for u in page_assets(html.decode('utf-8'))]
+    responses[urls[0]] = (status, headers, body, wire)
+    for url in urls[1:]:
+        known = cache and cache.get(url)
+        if known and IMMUTABLE in (known.get('cache-control') or ''):
+            stats['skipped'] += 1
+            continue
+        responses[url] = _fetch(conn, url, known)
+    seconds = time.perf_counter() - start
+    conn.close()
+
+    for status, headers, body, wire in responses.values():
+        stats['requests'] += 1
+        stats['bytes'] += wire
+        stats['notModified'] += status == 304
+    stats['seconds'] = seconds
+    # Requests go out in rounds over the browser's parallel connections
+    rounds = 1 + -(-(stats['requests'] - 1) // CONNECTIONS) if stats['requests'] else 0
+    stats['estimate'] = rounds * args.rtt / 1000 + stats['bytes'] * 8 / (args.mbps * 1_000_000)
+    return stats, responses
+
+
+def _remember(responses):
+    return {url: {**headers, 'body': _decoded(headers, body)}
+            for url, (status, headers, body, _) in responses.items() if status == 200}
+
+
+def _check(root, responses):
+    """Failures: responses that are not 200/304 or whose decoded body differs from the file"""
+    failures = []
+    for url, (status, headers, body, _) in responses.items():
+        if status not in (200, 304):
+            failures.append(f'{url}: HTTP {status}')
+            continue
+        if status == 200 and headers.get('content-encoding') not in (None, 'gzip'):
+            continue
+        if status == 200 and _decoded(headers, body) != (root / url.lstrip('/')).read_bytes():
+            failures.append(f'{url}: body differs from the file')
+    return failures
+
+
+def run(args):
+    from pathlib import Path
+
+    from ..report import Timings, start_report, write_report
+    from ..static import DEFAULT_ROOT, start_server
+
+    start_report(args)
+    timings = Timings()
+
+    print('🌍 STATIC SERVER BENCHMARK')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    root = Path(args.root or DEFAULT_ROOT)
+    pages = [p for p in args.pages.split(',') if p]
+    missing = [p for p in pages if not (root / p).is_file()]
+    if missing or args.repeat < 1:
+        print(f"❌ No such page: {', '.join(missing)}" if missing else '❌ --repeat must be at least 1')
+        return 2
+
+    plain, plain_host = _start_plain(root)
+    velo, velo_url = start_server(root)
+    velo_host = velo_url.split('://', 1)[1]
+    servers = {'http.server': plain_host, 'velo serve': velo_host}
+    print(f'📁 Root: {root}')
+    print(f'📶 Estimate: {args.mbps:g} Mbit/s, {args.rtt:g} ms round trip, {CONNECTIONS} connections\n')
+
+    results = {}
+    testcases = []
+    failed = False
+    try:
+        for page in pages:
+            results[page] = {}
+            for name, host in servers.items():
+                with timings.stage(f'{name}.{page}'):
+                    best = {}
+                    for mode in ('cold', 'reload'):
+                        for _ in range(args.repeat):
+                            if mode == 'cold':
+                                stats, responses = _load_page(host, page, args)
+                                cache = _remember(responses)
+                            else:
+                                stats, responses = _load_page(host, page, args, cache)
+                            if mode not in best or stats['seconds'] < best[mode]['seconds']:
+                                best[mode] = stats
+                        failures = _check(root, responses)
+                        failed = failed or bool(failures)
+                        testcases.append({'group': page, 'name': f'{name} {mode}', 'time': best[mode]['seconds'],
+                                          'failures': failures})
+                results[page][name] = best
+
+            print(f'{page}:')
+            for mode in ('cold', 'reload'):
+                for name in servers:
+                    s = results[page][name][mode]
+                    print(f"   {mode:<7}{name:<12} {s['requests']:3d} requests"
+                          + (f", {s['skipped']} from cache" if s['skipped'] else '')
+                          + (f", {s['notModified']}× 304" if s['notModified'] else '')
+                          + f", {s['bytes'] / 1024:7.1f} KB, {s['seconds'] * 1000:6.1f} ms local, "
+                            f"≈{s['estimate'] * 1000:5.0f} ms estimated")
+                before, after = results[page]['http.server'][mode], results[page]['velo serve'][mode]
+                if before['bytes']:
+                    print(f"   {'':<7}{'':<12} {after['bytes'] / before['bytes'] * 100:.0f}% of the bytes, "
+                          f"{after['estimate'] / before['estimate'] * 100:.0f}% of the estimated time")
+            print()
+    finally:
+        plain.shutdown()
+        velo.shutdown()
+
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall']:.2f}s")
+    print('✅ STATIC SERVER OK' if not failed else '❌ STATIC SERVER RESPONSES WRONG')
+
+    write_report(args, 'static', {
+        'settings': {'mbps': args.mbps, 'rttMs': args.rtt, 'connections': CONNECTIONS, 'repeat': args.repeat},
+        'pages': results
+    }, timings, testcases)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
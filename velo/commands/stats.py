@@ -0,0 +1,113 @@
+"""
+Database statistics
+
+Counts per goal and intensity, variant durations, how many main sets the
+phase parser understands, and phase-based IF / TSS per intensity.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Counts, durations and training load of WORKOUTS_DB'
+
+
+def add_arguments(parser):
+    parser.add_argument('--no-load', action='store_true',
+                        help='skip parsing phases and computing IF / TSS')
+
+
+def run(args):
+    from ..report import Timings, start_report, write_report
+    from ..workouts_db import INTENSITIES, VARIANTS
+
+    start_report(args)
+    timings = Timings()
+
+    print('📊 DATABASE STATISTICS')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    variants = db.variants()
+    print(f'Goals:     {len(db.goals)}' + (f" (duplicates: {', '.join(db.duplicate_goals)})" if db.duplicate_goals else ''))
+    print(f'Workouts:  {len(db.workouts())}')
+    print(f'Variants:  {len(variants)} (' + ', '.join(
+        f'{key} {sum(1 for _, v in variants if v.key == key)}' for key in VARIANTS) + ')')
+    print(f"Source:    {len(db.content.encode('utf-8')) / 1024:.1f} KB, {db.content.count(chr(10)) + 1} lines\n")
+
+    by_goal = {}
+    testcases = []
+    for goal_key, goal in db.goals.items():
+        by_goal[goal_key] = {}
+        print(f'{goal_key.upper()}:')
+        for intensity in INTENSITIES:
+            workouts = goal.intensities.get(intensity, [])
+            durations = [v.duration for w in workouts for v in w.variants.values()]
+            by_goal[goal_key][intensity] = {
+                'workouts': len(workouts),
+                'variants': len(durations),
+                'minMinutes': min(durations, default=0),
+                'maxMinutes': max(durations, default=0)
+            }
+            span = f'{min(durations)}-{max(durations)} min' if durations else '-'
+            print(f'   {intensity:<9} {len(workouts):3d} workouts, {len(durations):3d} variants, {span}')
+            testcases.append({'group': goal_key, 'name': intensity,
+                              'failures': [] if workouts else [f'{goal_key} has no {intensity} workouts']})
+        print()
+
+    print('Variant durations:')
+    durations = {}
+    for key in VARIANTS:
+        minutes = [v.duration for _, v in variants if v.key == key]
+        durations[key] = {
+            'min': min(minutes, default=0),
+            'mean': round(sum(minutes) / len(minutes), 1) if minutes else 0,
+            'max': max(minutes, default=0)
+        }
+        print(f"   {key:<7} {durations[key]['min']}-{durations[key]['max']} min, "
+              f"mean {durations[key]['mean']:.1f}")
+
+    load = {}
+    parsed = None
+    if not args.no_load:
+        from ..load import build_load_table
+        from ..workout_parser import build_phase_table
+
+        with timings.stage('phases'):
+            table = build_phase_table(db)
+        with timings.stage('table'):
+            loads = build_load_table(table)
+        parsed = len(table) - len(table.unparsed())
+        print(f'\nMain sets parsed: {parsed}/{len(table)}')
+        print('Load per variant (from phases):')
+        for intensity in INTENSITIES:
+            rows = [i for i, (w, _) in enumerate(loads.variants) if w.intensity == intensity]
+            if not rows:
+                continue
+            load[intensity] = {
+                'if': round(sum(loads.intensity_factor[i] for i in rows) / len(rows), 3),
+                'tss': round(sum(loads.tss[i] for i in rows) / len(rows), 1)
+            }
+            print(f"   {intensity:<9} IF {load[intensity]['if']:.2f}, TSS {load[intensity]['tss']:.0f}")
+
+    print('\n═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall'] * 1000:.0f} ms")
+
+    write_report(args, 'stats', {
+        'goals': len(db.goals),
+        'workouts': len(db.workouts()),
+        'variants': len(variants),
+        'byGoal': by_goal,
+        'durations': durations,
+        'mainParsed': parsed,
+        'load': load
+    }, timings, testcases, db)
+
+    return 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
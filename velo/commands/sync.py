@@ -0,0 +1,139 @@
+"""
+Sync benchmark
+
+Replays the StorageModule.saveState / syncFromSupabase sequences of
+simulated users against a local PostgREST stand-in (or --url) and compares
+the current full-state sync with debounced and delta sync modes. The
+stand-in runs in a child process started from run(), see velo.sync.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Load benchmark of the Supabase state sync'
+
+
+def add_arguments(parser):
+    from ..sync import MODES
+
+    parser.add_argument('--users', '-n', type=int, default=300, help='simulated users per mode (default: 300)')
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help=f"comma-separated sync modes (default: {','.join(MODES)})")
+    parser.add_argument('--debounce', type=float, default=3.0,
+                        help='debounce window in seconds of simulated time (default: 3)')
+    parser.add_argument('--concurrency', '-c', type=int, default=8, help='concurrent clients (default: 8)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--url', help='PostgREST base url to load instead of the local stand-in')
+    parser.add_argument('--key', default='', help='apikey / bearer token for --url')
+    parser.add_argument('--serve', action='store_true', help='only run the stand-in (on --port) until Ctrl+C')
+    parser.add_argument('--port', type=int, default=0, help='port of the stand-in (default: any free port)')
+
+
+def _kib(n):
+    return f'{n / 1024:,.1f} KiB'
+
+
+def run(args):
+    from ..report import Timings, start_report, write_report
+    from ..sync import MODES, make_server, run_mode, start_stand_in
+
+    if args.serve:
+        server = make_server(port=args.port or 54321)
+        print(f'🗄️  PostgREST stand-in on http://127.0.0.1:{server.server_address[1]}/rest/v1/ (Ctrl+C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    start_report(args)
+    timings = Timings()
+
+    print('🔁 SYNC LOAD BENCHMARK')
+    print('═══════════════════════════════════════════════════════════\n')
+
+    modes = args.modes.split(',')
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        print(f"❌ Unknown mode: {', '.join(unknown)}")
+        return 2
+
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    process = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        process, base_url = start_stand_in(port=args.port)
+
+    print(f"🌐 Endpoint: {base_url}{'' if args.url else ' (local stand-in)'}")
+    print(f'👥 {args.users} users per mode, {args.concurrency} concurrent clients, '
+          f'debounce {args.debounce:g}s (seed {args.seed})\n')
+
+    results = []
+    try:
+        for mode in modes:
+            with timings.stage(f'mode.{mode}'):
+                metrics = run_mode(db, base_url, mode, args.users, args.seed, args.debounce, args.concurrency, args.key)
+            results.append(metrics)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join()
+
+    testcases = []
+    failed = False
+    baseline = results[0] if results and results[0].mode == 'full' else None
+
+    for metrics in results:
+        stats = metrics.as_dict()
+        write, read = stats['writeLatencyMs'], stats['readLatencyMs']
+        print(f'{metrics.mode.upper()}:')
+        print(f"   Saves:         {metrics.saves} → {metrics.writes} writes"
+              + (f', {metrics.unchanged} unchanged saves not sent' if metrics.unchanged else '')
+              + f", {metrics.reads} reads")
+        print(f"   Upload:        {_kib(metrics.request_bytes)} ({stats['bytesPerSave']:,.0f} B per save)"
+              + (f', {metrics.request_bytes / baseline.request_bytes * 100:.1f}% of full'
+                 if baseline and baseline is not metrics else ''))
+        print(f"   Download:      {_kib(metrics.response_bytes)}")
+        print(f"   Write rate:    {stats['writesPerUserDay']:.2f} per active user-day "
+              f"({stats['writesPerUserDay'] * 10000 / 86400:.2f}/s for 10k daily users)")
+        if write:
+            print(f"   Write latency: p50 {write['p50']:.2f}ms, p99 {write['p99']:.2f}ms, max {write['max']:.1f}ms")
+        if read:
+            print(f"   Read latency:  p50 {read['p50']:.2f}ms, p99 {read['p99']:.2f}ms, max {read['max']:.1f}ms")
+        print(f"   Throughput:    {stats['requestsPerSecond']:.0f} requests/s over {metrics.seconds:.1f}s")
+
+        failures = []
+        if metrics.errors:
+            failures.append(f'{metrics.errors} failed requests')
+        if metrics.inconsistent:
+            failures.append(f'{metrics.inconsistent} users end with a stored state that differs from the local one')
+        print(f"   {'❌' if failures else '✅'} Stored state matches local state for "
+              f'{metrics.users - metrics.inconsistent}/{metrics.users} users'
+              + (f', {metrics.errors} errors' if metrics.errors else ''))
+        print()
+        failed = failed or bool(failures)
+        testcases.append({'group': 'modes', 'name': metrics.mode, 'time': metrics.seconds, 'failures': failures})
+
+    print('═══════════════════════════════════════════════════════════')
+    print(f"⏱️  Completed in {timings.total()['wall']:.2f}s")
+    print('✅ SYNC OK' if not failed else '❌ SYNC LOST OR FAILED WRITES')
+
+    write_report(args, 'sync', {
+        'endpoint': base_url,
+        'users': args.users,
+        'debounce': args.debounce,
+        'concurrency': args.concurrency,
+        'seed': args.seed,
+        'modes': [metrics.as_dict() for metrics in results]
+    }, timings, testcases, db)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
@@ -0,0 +1,61 @@
+"""
+Validate
+
+Runs the database validators in one process on one parsed WORKOUTS_DB:
+the structure test, the phase validator, the browser test simulator, the
+duplicate detector and the comprehensive test runner, in that order (the
+runner last, so --watch can follow it).
+"""
+
+import importlib
+import os
+import sys
+
+from . import command_main
+
+DESCRIPTION = 'Run the WORKOUTS_DB validators on one parsed database'
+
+# Suite name -> command module; names match the report suites
+SUITES = {
+    'workouts': 'velo.commands.workouts',
+    'phases': 'velo.commands.phases',
+    'simulator': 'velo.commands.simulator',
+    'duplicates': 'velo.commands.duplicates',
+    'comprehensive': 'velo.commands.comprehensive'
+}
+
+
+def add_arguments(parser):
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"comma-separated validators to run (default: {','.join(SUITES)})")
+    # The suites share the scenario matrix flags; the last registration wins
+    parser.conflict_handler = 'resolve'
+    for name in SUITES.values():
+        importlib.import_module(name).add_arguments(parser)
+
+
+def run(args):
+    suites = [s.strip() for s in args.suites.split(',') if s.strip()]
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        print(f"❌ Unknown suite: {', '.join(unknown)}")
+        return 2
+    if args.format != 'text' and len(suites) > 1 and not args.output:
+        print('❌ --format json|junit with several suites needs --output (one file per suite)')
+        return 2
+
+    code = 0
+    stdout = sys.stdout
+    for suite in suites:
+        suite_args = type(args)(**vars(args))
+        if args.output and len(suites) > 1:
+            root, ext = os.path.splitext(args.output)
+            suite_args.output = f'{root}.{suite}{ext}'
+        code = max(code, importlib.import_module(SUITES[suite]).run(suite_args) or 0)
+        sys.stdout = stdout
+        print()
+    return code
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
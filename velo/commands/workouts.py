@@ -0,0 +1,215 @@
+"""
+Workout database test
+
+Structure of WORKOUTS_DB: goals, workout and variant counts, Main: sections
+and Warm-up/Main/Cool-down structure, with a per-goal breakdown.
+"""
+
+import sys
+
+from . import command_main, load_db
+
+DESCRIPTION = 'Validate the structure of WORKOUTS_DB'
+
+
+def add_arguments(parser):
+    pass
+
+
+def run(args):
+    from ..report import Timings, start_report, write_report
+    from ..workouts_db import GOALS
+
+    start_report(args)
+    timings = Timings()
+
+    print('🧪 WORKOUT DATABASE TEST\n')
+    print('═══════════════════════════════════════\n')
+
+    # Read and parse the workouts database in one pass
+    db = load_db(timings)
+    if db is None:
+        return 1
+
+    timings.start('validate')
+
+    # Goals as defined in WORKOUTS_DB (duplicate keys are reported by the parser)
+    goals = list(db.goals) + db.duplicate_goals
+
+    print(f'✅ Goals gevonden: {len(set(goals))}')
+    print(f'   → {", ".join(sorted(set(goals)))}\n')
+
+    # Check for duplicates
+    if len(goals) != len(set(goals)):
+        print(f'⚠️  WAARSCHUWING: Duplicate goals gevonden!')
+        for goal in set(goals):
+            count = goals.count(goal)
+            if count > 1:
+                print(f'   → {goal}: {count}x gedefinieerd')
+        print()
+    else:
+        print('✅ Geen duplicate goals\n')
+
+    # Expected goals
+    expected_goals = ['ftp', 'climbing', 'granfondo']
+    missing = [g for g in expected_goals if g not in goals]
+    extra = [g for g in set(goals) if g not in expected_goals]
+
+    if missing:
+        print(f'❌ Missende goals: {", ".join(missing)}')
+    if extra:
+        print(f'⚠️  Extra goals: {", ".join(extra)}')
+    if not missing and not extra:
+        print('✅ Alle verwachte goals aanwezig\n')
+
+    # Count workouts by name
+    workout_names = [w.name for w in db.workouts()]
+    print(f'📊 Totaal workouts gevonden: {len(workout_names)}')
+
+    # Count variants
+    all_variants = db.variants()
+    variants_short = sum(1 for _, v in all_variants if v.key == 'short')
+    variants_medium = sum(1 for _, v in all_variants if v.key == 'medium')
+    variants_long = sum(1 for _, v in all_variants if v.key == 'long')
+
+    print(f'   → Short variants: {variants_short}')
+    print(f'   → Medium variants: {variants_medium}')
+    print(f'   → Long variants: {variants_long}')
+    print(f'   → Totaal variants: {variants_short + variants_medium + variants_long}\n')
+
+    # Check for "Main:" in details
+    details_all = [v.details for _, v in all_variants if v.details]
+    missing_main = [v.details_pos for _, v in all_variants if v.details and 'Main:' not in v.details]
+    details_with_main = [d for d in details_all if 'Main:' in d]
+
+    print(f'📋 Details validatie:')
+    print(f'   → Totaal details: {len(details_all)}')
+    print(f'   → Met "Main:" sectie: {len(details_with_main)}')
+    print(f'   → Zonder "Main:": {len(details_all) - len(details_with_main)}')
+
+    if len(details_all) == len(details_with_main):
+        print(f'   ✅ Alle workouts hebben "Main:" sectie\n')
+    else:
+        print(f'   ❌ Sommige workouts missen "Main:" sectie\n')
+        # Find which ones are missing
+        print('   Workouts zonder "Main:":')
+        for offset in missing_main:
+            # Look up the owning workout and variant by the offset of its details
+            workout, variant = db.owner_at(offset)
+            print(f'      • {workout.goal}/{workout.intensity}: {workout.name[:50]} ({variant.key}) - regel {db.line_of(offset)}')
+
+    # Check for proper structure (Warm-up, Main, Cool-down)
+    proper_structure = [d for d in details_all if 'Warm-up:' in d and 'Main:' in d and 'Cool-down:' in d]
+    print(f'\n📝 Structuur validatie:')
+    print(f'   → Met volledige structuur (Warm-up/Main/Cool-down): {len(proper_structure)}')
+    print(f'   → Zonder volledige structuur: {len(details_all) - len(proper_structure)}')
+
+    if len(details_all) == len(proper_structure):
+        print(f'   ✅ Alle workouts hebben volledige structuur\n')
+    else:
+        print(f'   ⚠️  Sommige workouts hebben incomplete structuur\n')
+
+    timings.stop('validate')
+
+    # Count each goal's workouts
+    print('\n═══════════════════════════════════════')
+    print('📊 PER GOAL BREAKDOWN')
+    print('═══════════════════════════════════════\n')
+
+    by_goal = {}
+
+    for goal in GOALS:
+        if goal in db.goals:
+            timings.start(f'goal.{goal}')
+            section = db.goals[goal]
+            names_in_section = [w.name for w in section.workouts()]
+            print(f'{goal.upper()}:')
+            print(f'   Workouts: {len(names_in_section)}')
+            print(f'   Variants: {len(names_in_section) * 3} (verwacht)')
+
+            easy_workouts = [w.name for w in section.intensities.get('easy', [])]
+            moderate_workouts = [w.name for w in section.intensities.get('moderate', [])]
+            hard_workouts = [w.name for w in section.intensities.get('hard', [])]
+
+            print(f'   • Easy: {len(easy_workouts)}')
+            for name in easy_workouts:
+                print(f'     - {name}')
+            print(f'   • Moderate: {len(moderate_workouts)}')
+            for name in moderate_workouts:
+                print(f'     - {name}')
+            print(f'   • Hard: {len(hard_workouts)}')
+            for name in hard_workouts:
+                print(f'     - {name}')
+            print()
+
+            by_goal[goal] = {
+                'workouts': len(names_in_section),
+                'easy': easy_workouts,
+                'moderate': moderate_workouts,
+                'hard': hard_workouts
+            }
+            timings.stop(f'goal.{goal}')
+
+    timings.start('report')
+
+    print('\n═══════════════════════════════════════')
+    print('✅ SAMENVATTING')
+    print('═══════════════════════════════════════')
+    print(f'Goals:          {len(set(goals))} ✅')
+    print(f'Workouts:       {len(workout_names)} ✅')
+    print(f'Variants:       {variants_short + variants_medium + variants_long} ✅')
+    print(f'Met "Main:":    {len(details_with_main)}/{len(details_all)} {"✅" if len(details_all) == len(details_with_main) else "❌"}')
+    print(f'Structuur:      {len(proper_structure)}/{len(details_all)} {"✅" if len(details_all) == len(proper_structure) else "⚠️"}')
+
+    all_passed = len(set(goals)) == 3 and len(details_all) == len(details_with_main)
+    if all_passed:
+        print('\n🎉 ALLE TESTS GESLAAGD!')
+    else:
+        print('\n⚠️  Sommige issues gevonden - zie details hierboven')
+
+    print()
+    timings.stop('report')
+
+    # Machine-readable report (--format json|junit)
+    duplicate_goals = sorted({g for g in goals if goals.count(g) > 1})
+    main_failures = []
+    for offset in missing_main:
+        workout, variant = db.owner_at(offset)
+        main_failures.append(f'{workout.goal}/{workout.intensity}: {workout.name} ({variant.key}) has no Main: section, line {db.line_of(offset)}')
+
+    goal_time = {stage['stage'][len('goal.'):]: stage['wall'] for stage in timings.stages if stage['stage'].startswith('goal.')}
+
+    testcases = [
+        {'group': 'database', 'name': 'goals', 'failures':
+            [f'missing goal: {g}' for g in missing] + [f'duplicate goal: {g}' for g in duplicate_goals]},
+        {'group': 'database', 'name': 'main-section', 'failures': main_failures},
+        {'group': 'database', 'name': 'structure', 'failures': []}
+    ] + [
+        {'group': 'goals', 'name': goal, 'time': goal_time[goal], 'failures': [] if data['workouts'] else [f'{goal} has no workouts']}
+        for goal, data in by_goal.items()
+    ]
+
+    write_report(args, 'workouts', {
+        'goals': len(set(goals)),
+        'duplicateGoals': duplicate_goals,
+        'missingGoals': missing,
+        'extraGoals': extra,
+        'workouts': len(workout_names),
+        'variants': {
+            'short': variants_short,
+            'medium': variants_medium,
+            'long': variants_long,
+            'total': variants_short + variants_medium + variants_long
+        },
+        'details': len(details_all),
+        'withMain': len(details_with_main),
+        'withStructure': len(proper_structure),
+        'byGoal': by_goal,
+        'passed': all_passed
+    }, timings, testcases, db)
+
+    return 0
+
+
+def main(argv=None):
+    return command_main(sys.modules[__name__], argv)
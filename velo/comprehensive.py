@@ -0,0 +1,153 @@
+"""
+Comprehensive tester scenarios
+
+The per-tester checks behind run-comprehensive-tests.py. Scenarios are
+streamed serially or across a process pool; either way results come back in
+tester order, together with the console lines each scenario produced.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .report import timed
+from .workouts_db import INTENSITIES, VARIANTS
+
+
+def run_tester_scenario(tester, goal_workouts):
+    """Run test scenario for a specific tester, returns (result, log lines)"""
+    lines = []
+    log = lines.append
+
+    log(f"\n👤 TESTER: {tester['name']} ({tester['level']})")
+    log(f"   Goal: {tester['goal'].upper()} | FTP: {tester['ftp']}W | Prefers: {tester['preferredVariant']}")
+    log('   ─────────────────────────────────────────────────')
+
+    if not goal_workouts:
+        log(f"   ❌ ERROR: Goal '{tester['goal']}' not found!")
+        return {'success': False, 'tests': 0, 'passed': 0, 'failed': 0, 'workouts': 0}, lines
+
+    # Step 1: Intake simulation
+    log('   📝 Intake: ✅ Completed')
+
+    total_tests = 0
+    passed_tests = 0
+    failed_tests = 0
+    total_workouts = 0
+
+    # Test each intensity level
+    for intensity in INTENSITIES:
+        workouts = goal_workouts.get(intensity, [])
+        if not workouts:
+            continue
+
+        total_workouts += len(workouts)
+        log(f'   📂 {intensity.upper()}: {len(workouts)} workouts')
+
+        for workout in workouts:
+            for variant in VARIANTS:
+                total_tests += 1
+
+                variant_data = workout['variants'].get(variant)
+                if not variant_data:
+                    log(f"      ❌ {workout['name']} ({variant}): Missing")
+                    failed_tests += 1
+                    continue
+
+                # Validate variant data
+                has_details = variant_data['details'] and len(variant_data['details']) > 0
+                has_main = 'Main:' in variant_data['details'] if variant_data['details'] else False
+                has_duration = variant_data['duration'] > 0
+                has_display_name = variant_data['displayName'] and len(variant_data['displayName']) > 0
+
+                if has_details and has_main and has_duration and has_display_name:
+                    # Only log preferred variant
+                    if variant == tester['preferredVariant']:
+                        log(f"      ✅ {workout['name']} ({variant}) - {variant_data['duration']}min")
+                    passed_tests += 1
+                else:
+                    issues = []
+                    if not has_details:
+                        issues.append('no details')
+                    if not has_main:
+                        issues.append('no Main section')
+                    if not has_duration:
+                        issues.append('no duration')
+                    if not has_display_name:
+                        issues.append('no display name')
+
+                    log(f"      ❌ {workout['name']} ({variant}): {', '.join(issues)}")
+                    failed_tests += 1
+
+    tester_success = failed_tests == 0
+    log(f"   {'✅' if tester_success else '⚠️'}  Result: {passed_tests}/{total_tests} passed")
+
+    return {
+        'success': tester_success,
+        'tests': total_tests,
+        'passed': passed_tests,
+        'failed': failed_tests,
+        'workouts': total_workouts
+    }, lines
+
+
+def _timed_scenario(tester, goal_workouts):
+    with timed() as spent:
+        result, lines = run_tester_scenario(tester, goal_workouts)
+    result.update(spent)
+    return result, lines
+
+
+# Goal index of a pool worker, handed over once by the initializer and only read afterwards
+_worker_goal_index = None
+
+
+def _init_worker(goal_index):
+    global _worker_goal_index
+    _worker_goal_index = goal_index
+
+
+def _run_batch(testers):
+    return [_timed_scenario(tester, _worker_goal_index.get(tester['goal'])) for tester in testers]
+
+
+def _batches(testers, size):
+    batch = []
+    for tester in testers:
+        batch.append(tester)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_scenarios(testers, goal_index, jobs=1, batch_size=16):
+    """Yield (tester, result, log lines) for every tester, in tester order
+
+    Each result carries the wall-clock 'time' and 'cpuTime' of its scenario.
+
+    testers may be any iterable, including a lazy scenario stream. With
+    jobs > 1 the scenarios are spread over a process pool in batches, with a
+    bounded number of batches in flight; jobs=0 uses one worker per CPU core.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1:
+        for tester in testers:
+            result, lines = _timed_scenario(tester, goal_index.get(tester['goal']))
+            yield tester, result, lines
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(goal_index,)) as pool:
+        # Batches are drained in submission order, which keeps the merge deterministic
+        pending = deque()
+        for batch in _batches(testers, batch_size):
+            pending.append((batch, pool.submit(_run_batch, batch)))
+            if len(pending) >= jobs * 2:
+                batch, future = pending.popleft()
+                yield from ((tester, *outcome) for tester, outcome in zip(batch, future.result()))
+        while pending:
+            batch, future = pending.popleft()
+            yield from ((tester, *outcome) for tester, outcome in zip(batch, future.result()))
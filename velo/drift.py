@@ -0,0 +1,125 @@
+"""
+Database drift
+
+Merkle-style hash trees (database → goal → intensity → workout → variant)
+over parsed WORKOUTS_DB copies. Equal subtrees have equal hashes, so diff()
+only descends into the parts that changed and the cost of comparing two
+copies follows the number of differences, not the size of the catalogue.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+LEVELS = ('database', 'goal', 'intensity', 'workout', 'variant')
+
+
+def _digest(*parts):
+    return hashlib.blake2b(json.dumps(parts, ensure_ascii=False).encode('utf-8'), digest_size=16).digest()
+
+
+@dataclass
+class Node:
+    """A subtree of the database; hash covers the fields and the children in order"""
+    level: str
+    key: str
+    fields: dict = field(default_factory=dict)
+    children: dict = field(default_factory=dict)
+    # Hash of the fields alone, and of the whole subtree
+    own: bytes = b''
+    hash: bytes = b''
+    # Source offset, for line numbers in reports
+    pos: int = 0
+
+    def seal(self):
+        self.own = _digest(self.level, self.key, sorted(self.fields.items()))
+        self.hash = _digest(self.own.hex(), [(key, child.hash.hex()) for key, child in self.children.items()])
+        return self
+
+    def count(self, level):
+        """Number of nodes of a level in this subtree"""
+        if self.level == level:
+            return 1
+        return sum(child.count(level) for child in self.children.values())
+
+
+def _unique_key(name, seen):
+    """Workout names can repeat inside an intensity; later copies get ' #2', ' #3', ..."""
+    seen[name] = seen.get(name, 0) + 1
+    return name if seen[name] == 1 else f'{name} #{seen[name]}'
+
+
+def build_tree(db):
+    """Hash tree of a parsed WorkoutsDB"""
+    root = Node('database', '', fields={'duplicateGoals': db.duplicate_goals})
+    for goal_key, goal in db.goals.items():
+        goal_node = Node('goal', goal_key, pos=goal.pos)
+        for intensity, workouts in goal.intensities.items():
+            intensity_node = Node('intensity', intensity, pos=goal.spans.get(intensity, (goal.pos,))[0])
+            seen = {}
+            for workout in workouts:
+                workout_node = Node('workout', workout.name, pos=workout.pos, fields={
+                    'description': workout.description,
+                    'intensity': workout.power_zone,
+                    'tips': workout.tips
+                })
+                for key, variant in workout.variants.items():
+                    workout_node.children[key] = Node('variant', key, pos=variant.pos, fields={
+                        'duration': variant.duration,
+                        'displayName': variant.display_name,
+                        'details': variant.details
+                    }).seal()
+                intensity_node.children[_unique_key(workout.name, seen)] = workout_node.seal()
+            goal_node.children[intensity] = intensity_node.seal()
+        root.children[goal_key] = goal_node.seal()
+    return root.seal()
+
+
+@dataclass
+class Difference:
+    """One difference between two trees; path is the keys below the root"""
+    # 'changed' (fields differ), 'added', 'removed' or 'reordered' (same children, other order)
+    kind: str
+    level: str
+    path: tuple
+    # Field name -> (value in the reference, value in the other copy), for 'changed'
+    fields: dict = field(default_factory=dict)
+    pos: int = 0
+    other_pos: int = 0
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'level': self.level,
+            'path': list(self.path),
+            'fields': {name: list(values) for name, values in self.fields.items()}
+        }
+
+
+def diff(reference, other, path=()):
+    """Yield the Differences between two trees, descending only into subtrees whose hashes differ
+
+    For 'added' and 'removed' only the topmost missing node is reported.
+    """
+    if reference.hash == other.hash:
+        return
+    if reference.own != other.own:
+        yield Difference('changed', reference.level, path, {
+            name: (reference.fields.get(name), other.fields.get(name))
+            for name in reference.fields.keys() | other.fields.keys()
+            if reference.fields.get(name) != other.fields.get(name)
+        }, reference.pos, other.pos)
+
+    for key, child in reference.children.items():
+        counterpart = other.children.get(key)
+        if counterpart is None:
+            yield Difference('removed', child.level, path + (key,), pos=child.pos)
+        else:
+            yield from diff(child, counterpart, path + (key,))
+    for key, child in other.children.items():
+        if key not in reference.children:
+            yield Difference('added', child.level, path + (key,), other_pos=child.pos)
+
+    if (reference.children.keys() == other.children.keys()
+            and list(reference.children) != list(other.children)):
+        yield Difference('reordered', reference.level, path, pos=reference.pos, other_pos=other.pos)
@@ -0,0 +1,228 @@
+"""
+Near-duplicate workouts
+
+Finds variants whose structure was copied, between goals or within one,
+without comparing every pair:
+
+    1. Each variant's details are parsed into phases (velo.workout_parser)
+       and normalized into a signature: phase types in order, durations
+       rounded to half minutes and power to 5% FTP. Wording, names and
+       the declared duration do not take part.
+    2. Identical signatures are grouped through a dict: exact duplicates.
+    3. One representative per distinct signature gets a MinHash sketch of
+       its shingles (each phase, numbered by occurrence, and each pair of
+       consecutive phases). The sketch is cut into bands and every band is
+       a bucket key (LSH), so only variants sharing a bucket are compared.
+    4. Candidates are verified with the exact Jaccard similarity of their
+       shingles, and verified pairs are merged into clusters (union-find).
+
+Variants of the same workout are meant to resemble each other and are never
+paired as near duplicates; identical ones are still reported as exact.
+"""
+
+import hashlib
+import random
+from dataclasses import dataclass, field
+from itertools import combinations
+
+from .workout_parser import parse_workout, resolved_workout
+
+# Rounding of the signature: durations to 1/DURATION_STEPS minutes, power to POWER_STEP % FTP
+DURATION_STEPS = 2
+POWER_STEP = 5
+
+# Default Jaccard similarity of the shingles at which two variants count as near duplicates
+THRESHOLD = 0.7
+
+# MinHash sketch of BANDS × ROWS values; a pair becomes a candidate when one
+# band agrees, with probability 1 - (1 - s^ROWS)^BANDS at similarity s
+# (about 0.05 at s = 0.3, 0.47 at s = 0.5 and 0.97 at s = 0.7)
+BANDS = 20
+ROWS = 5
+
+# Buckets larger than this compare each member with the first one only
+MAX_BUCKET = 32
+
+_PRIME = (1 << 61) - 1
+_PHASE_CODES = {'warmup': 'W', 'work': 'I', 'recovery': 'R', 'steady': 'S', 'cooldown': 'C'}
+
+
+def signature(workout, variant):
+    """Normalized phase sequence of a variant: ((type, half minutes, power %), ...)
+
+    A main set the parser does not understand stands in as one steady block
+    of the remaining declared minutes at the workout's intensity, so such
+    variants still differ by length.
+    """
+    parsed = parse_workout(resolved_workout(workout, variant))
+    phases = parsed['phases']
+    main = phases['main']
+    if not main:
+        rest = variant.duration - phases['warmup']['duration'] - phases['cooldown']['duration']
+        main = [{'duration': max(rest, 0), 'intensity': parsed['intensity']['value'], 'type': 'steady'}]
+    return tuple(
+        (_PHASE_CODES[phase['type']], round(phase['duration'] * DURATION_STEPS),
+         round(phase['intensity'] * 100 / POWER_STEP) * POWER_STEP)
+        for phase in [phases['warmup'], *main, phases['cooldown']]
+    )
+
+
+def shingles(sig):
+    """Set of phase and phase-pair tokens of a signature; repeated phases are numbered"""
+    tokens = []
+    seen = {}
+    for kind, duration, power in sig:
+        token = f'{kind}{duration}@{power}'
+        seen[token] = seen.get(token, 0) + 1
+        tokens.append(f'{token}#{seen[token]}')
+    pairs = [f'{a.split("#")[0]}>{b.split("#")[0]}' for a, b in zip(tokens, tokens[1:])]
+    return frozenset(tokens + pairs)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHasher:
+    """MinHash sketches over a fixed family of BANDS × ROWS hash functions
+
+    Hash values are computed once per distinct shingle; catalogues reuse a
+    small vocabulary of phases, so sketching is mostly element-wise min.
+    """
+
+    def __init__(self, bands=BANDS, rows=ROWS, seed=0):
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = rows
+        self._params = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(bands * rows)]
+        self._values = {}
+
+    def _hashes(self, token):
+        values = self._values.get(token)
+        if values is None:
+            x = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+            values = self._values[token] = tuple((a * x + b) % _PRIME for a, b in self._params)
+        return values
+
+    def sketch(self, tokens):
+        return tuple(map(min, *map(self._hashes, tokens)))
+
+    def band_keys(self, sketch):
+        r = self.rows
+        return [(band, sketch[band * r:(band + 1) * r]) for band in range(self.bands)]
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+            return True
+        return False
+
+
+@dataclass
+class Cluster:
+    """Variants with identical or near-identical structure, in file order
+
+    members are (workout, variant) pairs; similarity has, for every member
+    after the first, its shingle similarity with the first member.
+    """
+    members: list
+    exact: bool
+    similarity: list = field(default_factory=list)
+
+    @property
+    def goals(self):
+        return sorted({workout.goal for workout, _ in self.members})
+
+    @property
+    def workouts(self):
+        return len({id(workout) for workout, _ in self.members})
+
+
+@dataclass
+class DuplicateReport:
+    clusters: list
+    variants: int
+    signatures: int
+    # Pairs of distinct signatures compared, and those at or above the threshold
+    candidates: int
+    verified: int
+    # Pairs of distinct signatures an all-pairs comparison would compare
+    all_pairs: int
+
+
+def find_duplicates(db, threshold=THRESHOLD, bands=BANDS, rows=ROWS, seed=0):
+    """Exact and near-duplicate clusters of the variants of a database"""
+    variants = db.variants()
+
+    # Exact: identical signatures, one group per distinct signature
+    groups = {}
+    for i, (workout, variant) in enumerate(variants):
+        groups.setdefault(signature(workout, variant), []).append(i)
+    keys = list(groups)
+    members = list(groups.values())
+    owners = [{id(variants[i][0]) for i in group} for group in members]
+
+    # Near: LSH buckets over one sketch per distinct signature
+    hasher = MinHasher(bands, rows, seed)
+    token_sets = [shingles(key) for key in keys]
+    buckets = {}
+    for g, tokens in enumerate(token_sets):
+        for band_key in hasher.band_keys(hasher.sketch(tokens)):
+            buckets.setdefault(band_key, []).append(g)
+
+    union = _UnionFind(len(keys))
+    checked = set()
+    verified = 0
+    for bucket in buckets.values():
+        if len(bucket) < 2:
+            continue
+        # One member per cluster formed so far; pairs inside a cluster need no check
+        firsts = {}
+        for g in bucket:
+            firsts.setdefault(union.find(g), g)
+        bucket = list(firsts.values())
+        pairs = combinations(bucket, 2) if len(bucket) <= MAX_BUCKET else ((bucket[0], g) for g in bucket[1:])
+        for a, b in pairs:
+            if (a, b) in checked or union.find(a) == union.find(b):
+                continue
+            checked.add((a, b))
+            # Only variants of one workout on both sides: they are supposed to look alike
+            if len(owners[a]) == 1 and owners[a] == owners[b]:
+                continue
+            if jaccard(token_sets[a], token_sets[b]) >= threshold:
+                verified += 1
+                union.union(a, b)
+
+    clustered = {}
+    for g in range(len(keys)):
+        clustered.setdefault(union.find(g), []).append(g)
+
+    clusters = []
+    for group_ids in clustered.values():
+        ids = sorted(i for g in group_ids for i in members[g])
+        if len(ids) < 2:
+            continue
+        group_of = {i: g for g in group_ids for i in members[g]}
+        first = token_sets[group_of[ids[0]]]
+        clusters.append(Cluster(
+            members=[variants[i] for i in ids],
+            exact=len(group_ids) == 1,
+            similarity=[round(jaccard(first, token_sets[group_of[i]]), 3) for i in ids[1:]]
+        ))
+    clusters.sort(key=lambda c: (not c.exact, -len(c.members)))
+
+    n = len(keys)
+    return DuplicateReport(clusters, len(variants), n, len(checked), verified, n * (n - 1) // 2)
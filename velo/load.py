@@ -0,0 +1,283 @@
+"""
+Training load
+
+Normalized power, intensity factor and TSS per variant from the phase table
+of velo.workout_parser, instead of the label lookup of
+ProgressModule.calculateTSS, and CTL / ATL / TSB curves over batches of
+generated 6-week schedules.
+
+Power is handled as a fraction of FTP throughout, so NP (% FTP), IF and TSS
+do not depend on the rider's FTP; watts are NP × FTP.
+"""
+
+import math
+import random
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate, repeat
+from operator import sub
+
+from .schedule import (
+    INTENSITY_PLANS, POOL_ORDER, TARGET_DURATIONS, WEEKLY_WORKOUTS, WEEKS, DEFAULT_PREFERRED_DAYS,
+    placement_distribution, select_best_variant, summarize, uniform_picks
+)
+
+# Rolling window of normalized power (seconds)
+NP_WINDOW = 30
+
+# Time constants (days) of chronic and acute training load
+CTL_DAYS = 42
+ATL_DAYS = 7
+
+# IF per intensity label in ProgressModule.calculateTSS
+ESTIMATE_INTENSITY_FACTORS = {'easy': 0.5, 'moderate': 0.75, 'hard': 0.95}
+
+
+def estimate_tss(workout):
+    """ProgressModule.calculateTSS: hours × IF² × 100 with IF looked up from the intensity label"""
+    if not workout or not workout.get('duration') or not workout.get('powerZone'):
+        return 0
+    factor = ESTIMATE_INTENSITY_FACTORS.get(workout.get('intensity'), 0.5)
+    return math.floor(workout['duration'] / 60 * factor * factor * 100 + 0.5)
+
+
+def normalized_power(series):
+    """Normalized power of a per-second power series (any unit)"""
+    n = len(series)
+    if n == 0:
+        return 0.0
+    if n < NP_WINDOW:
+        return math.fsum(series) / n
+    sums = list(accumulate(series, initial=0.0))
+    rolling = map(sub, sums[NP_WINDOW:], sums[:-NP_WINDOW])
+    return (math.fsum(map(pow, rolling, repeat(4))) / (n - NP_WINDOW + 1)) ** 0.25 / NP_WINDOW
+
+
+@dataclass
+class LoadTable:
+    """Load of every variant of a PhaseTable, in the same row order"""
+    variants: list = field(default_factory=list)
+    minutes: array = field(default_factory=lambda: array('d'))
+    # Normalized power as a fraction of FTP, which equals IF
+    intensity_factor: array = field(default_factory=lambda: array('d'))
+    tss: array = field(default_factory=lambda: array('d'))
+    # ProgressModule.calculateTSS for the same variant
+    estimate: array = field(default_factory=lambda: array('d'))
+    # 0 where the main set did not parse and only warm-up / cool-down count
+    main_parsed: array = field(default_factory=lambda: array('B'))
+
+    def __len__(self):
+        return len(self.variants)
+
+    def index(self):
+        """{(id(workout), variant key): row}"""
+        return {(id(w), v.key): i for i, (w, v) in enumerate(self.variants)}
+
+    def rows(self, ftps=()):
+        """Load table rows as dicts, with NP in watts per FTP value"""
+        for i, (workout, variant) in enumerate(self.variants):
+            row = {
+                'goal': workout.goal,
+                'intensity': workout.intensity,
+                'workout': workout.name,
+                'variant': variant.key,
+                'minutes': round(self.minutes[i], 2),
+                'np': round(self.intensity_factor[i] * 100, 1),
+                'if': round(self.intensity_factor[i], 3),
+                'tss': round(self.tss[i], 1),
+                'estimatedTss': self.estimate[i],
+                'mainParsed': bool(self.main_parsed[i])
+            }
+            if ftps:
+                row['npWatts'] = {ftp: round(self.intensity_factor[i] * ftp) for ftp in ftps}
+            yield row
+
+
+def phases_load(phases):
+    """(minutes, IF, TSS) of one parse_workout() phases dict, as build_load_table computes them"""
+    series = []
+    for phase in [phases['warmup'], *phases['main'], phases['cooldown']]:
+        series.extend(repeat(phase['intensity'], math.floor(phase['duration'] * 60 + 0.5)))
+    intensity_factor = normalized_power(series)
+    return len(series) / 60, intensity_factor, len(series) / 3600 * intensity_factor * intensity_factor * 100
+
+
+def build_load_table(phases):
+    """NP, IF and TSS of every variant of a velo.workout_parser.PhaseTable"""
+    table = LoadTable()
+    for i, (workout, variant) in enumerate(phases.variants):
+        series = []
+        for r in range(phases.offsets[i], phases.offsets[i + 1]):
+            series.extend(repeat(phases.power[r] / 100, math.floor(phases.duration[r] * 60 + 0.5)))
+
+        intensity_factor = normalized_power(series)
+        hours = len(series) / 3600
+        table.variants.append((workout, variant))
+        table.minutes.append(len(series) / 60)
+        table.intensity_factor.append(intensity_factor)
+        table.tss.append(hours * intensity_factor * intensity_factor * 100)
+        table.estimate.append(estimate_tss({
+            'duration': variant.duration,
+            'powerZone': workout.power_zone,
+            'intensity': workout.intensity
+        }))
+        table.main_parsed.append(phases.main_parsed[i])
+    return table
+
+
+def load_curves(daily_tss):
+    """CTL, ATL and TSB per day of one TSS series; TSB is yesterday's CTL − ATL"""
+    ctl = atl = 0.0
+    ctls, atls, tsbs = [], [], []
+    for tss in daily_tss:
+        tsbs.append(ctl - atl)
+        ctl += (tss - ctl) / CTL_DAYS
+        atl += (tss - atl) / ATL_DAYS
+        ctls.append(ctl)
+        atls.append(atl)
+    return ctls, atls, tsbs
+
+
+@dataclass
+class LoadStats:
+    goal: str
+    commitment: str
+    schedules: int
+    # Summaries of per-schedule values
+    total_tss: dict = field(default_factory=dict)
+    week_tss: list = field(default_factory=list)
+    final_ctl: dict = field(default_factory=dict)
+    peak_atl: dict = field(default_factory=dict)
+    lowest_tsb: dict = field(default_factory=dict)
+    final_tsb: dict = field(default_factory=dict)
+    # Largest CTL gain over one week
+    peak_ramp: dict = field(default_factory=dict)
+    # Same plans scored with ProgressModule.calculateTSS
+    estimated_total_tss: dict = field(default_factory=dict)
+
+    def as_dict(self):
+        return {
+            'goal': self.goal,
+            'commitment': self.commitment,
+            'schedules': self.schedules,
+            'totalTss': self.total_tss,
+            'weekTss': self.week_tss,
+            'finalCtl': self.final_ctl,
+            'peakAtl': self.peak_atl,
+            'lowestTsb': self.lowest_tsb,
+            'finalTsb': self.final_tsb,
+            'peakRamp': self.peak_ramp,
+            'estimatedTotalTss': self.estimated_total_tss
+        }
+
+
+def _week_layouts(placements):
+    """Per placement: (day, intensity, k) for the k-th workout of that intensity in the pool"""
+    layouts = []
+    for placement, _ in placements:
+        seen = {}
+        layout = []
+        for day, intensity in zip(placement.days, placement.intensities):
+            k = seen.get(intensity, 0)
+            seen[intensity] = k + 1
+            layout.append((day, intensity, k))
+        layouts.append(layout)
+    return layouts
+
+
+def simulate_load(db, load, goal, commitment, count, seed=0, preferred_days=DEFAULT_PREFERRED_DAYS,
+                  batch_size=10000):
+    """CTL / ATL / TSB statistics of count generated schedules for a goal and commitment level
+
+    Uses the same sampling as velo.schedule.simulate(), but keeps which
+    workout lands on which day so daily TSS curves can be built.
+    """
+    rng = random.Random(f'{seed}:{goal}:{commitment}:load')
+    goal_data = db.goals[goal]
+    preferred_days = tuple(preferred_days)
+    rows = load.index()
+    stats = LoadStats(goal, commitment, count)
+
+    weeks = []
+    for week in range(1, WEEKS + 1):
+        plan = INTENSITY_PLANS[commitment][week - 1]
+        effective = {i: plan[i] if goal_data.intensities.get(i) else 0 for i in POOL_ORDER}
+        scores = {}
+        for intensity in POOL_ORDER:
+            tss, estimate = [], []
+            for w in goal_data.intensities.get(intensity, []):
+                key, _ = select_best_variant(w, TARGET_DURATIONS[commitment][intensity], week)
+                row = rows[(id(w), key)]
+                tss.append(load.tss[row])
+                estimate.append(load.estimate[row])
+            scores[intensity] = (tss, estimate)
+        placements = placement_distribution(effective, preferred_days, WEEKLY_WORKOUTS[commitment][week - 1])
+        cumulative = list(accumulate(p for _, p in placements))
+        weeks.append((effective, scores, _week_layouts(placements), cumulative))
+
+    days = WEEKS * 7
+    totals, estimated_totals = [], []
+    week_totals = [[] for _ in range(WEEKS)]
+    final_ctl, peak_atl, lowest_tsb, final_tsb, peak_ramp = [], [], [], [], []
+
+    for start in range(0, count, batch_size):
+        n = min(batch_size, count - start)
+        daily = [[0.0] * n for _ in range(days)]
+        estimated = [0.0] * n
+
+        for week_index, (effective, scores, layouts, cumulative) in enumerate(weeks):
+            columns = {}
+            for intensity in POOL_ORDER:
+                tss, estimate = scores[intensity]
+                columns[intensity] = []
+                for _ in range(effective[intensity]):
+                    picks = uniform_picks(rng, len(tss), n) if len(tss) <= 256 else rng.choices(range(len(tss)), k=n)
+                    columns[intensity].append([tss[p] for p in picks])
+                    estimated = [e + estimate[p] for e, p in zip(estimated, picks)]
+
+            chosen = rng.choices(range(len(layouts)), cum_weights=cumulative, k=n)
+            offset = week_index * 7
+            for i, layout_index in enumerate(chosen):
+                for day, intensity, k in layouts[layout_index]:
+                    daily[offset + day][i] = columns[intensity][k][i]
+
+            week_sum = [0.0] * n
+            for day in daily[offset:offset + 7]:
+                week_sum = list(map(float.__add__, week_sum, day))
+            week_totals[week_index].extend(week_sum)
+
+        # CTL / ATL / TSB for the whole batch, one day column at a time
+        ctl = [0.0] * n
+        atl = [0.0] * n
+        peak = [0.0] * n
+        lowest = [0.0] * n
+        ramp = [0.0] * n
+        week_start_ctl = ctl
+        total = [0.0] * n
+        for day_index, tss in enumerate(daily):
+            lowest = [min(low, c - a) for low, c, a in zip(lowest, ctl, atl)]
+            ctl = [c + (t - c) / CTL_DAYS for c, t in zip(ctl, tss)]
+            atl = [a + (t - a) / ATL_DAYS for a, t in zip(atl, tss)]
+            peak = list(map(max, peak, atl))
+            total = list(map(float.__add__, total, tss))
+            if day_index % 7 == 6:
+                ramp = [max(r, c - s) for r, c, s in zip(ramp, ctl, week_start_ctl)]
+                week_start_ctl = ctl
+
+        totals.extend(total)
+        estimated_totals.extend(estimated)
+        final_ctl.extend(ctl)
+        peak_atl.extend(peak)
+        lowest_tsb.extend(lowest)
+        final_tsb.extend(map(sub, ctl, atl))
+        peak_ramp.extend(ramp)
+
+    stats.total_tss = summarize(totals)
+    stats.week_tss = [summarize(values) for values in week_totals]
+    stats.final_ctl = summarize(final_ctl)
+    stats.peak_atl = summarize(peak_atl)
+    stats.lowest_tsb = summarize(lowest_tsb)
+    stats.final_tsb = summarize(final_tsb)
+    stats.peak_ramp = summarize(peak_ramp)
+    stats.estimated_total_tss = summarize(estimated_totals)
+    return stats
@@ -0,0 +1,276 @@
+"""
+Profiling
+
+--profile for the velo commands: every Timings stage of the run (load,
+parse, index.<goal>, tester.<id>, report, ...) additionally records the
+regex calls and characters scanned by the parser and validator patterns,
+the file bytes read, and the memory allocated and peaking inside the stage
+(tracemalloc). --profile-out writes a cProfile dump (.prof / .pstats) or
+sampled collapsed stacks (any other name) for flamegraph.pl or speedscope.
+
+Profiling only sees the main process; run with --jobs 1 to profile testers.
+"""
+
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Modules whose compiled module-level patterns are counted
+PATTERN_MODULES = ('velo.workouts_db', 'velo.workout_parser', 'velo.validation')
+
+_PATTERN_METHODS = ('match', 'fullmatch', 'search', 'finditer', 'findall', 'sub', 'subn', 'split')
+
+# Seconds between stack samples for collapsed-stack output
+SAMPLE_INTERVAL = 0.001
+
+# Stages listed in the console summary, slowest first
+SUMMARY_STAGES = 20
+
+
+def add_profile_arguments(parser):
+    """Register --profile and --profile-out on an argparse parser"""
+    parser.add_argument('--profile', action='store_true',
+                        help='record regex calls, bytes scanned and allocations per stage')
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help='with --profile, write a cProfile dump (.prof/.pstats) or collapsed stacks (other names)')
+
+
+class _CountingPattern:
+    """A compiled pattern that counts its calls and the characters it was handed"""
+
+    def __init__(self, pattern, name, counters):
+        self._pattern = pattern
+        self._name = name
+        self._counters = counters
+        for method in _PATTERN_METHODS:
+            setattr(self, method, self._wrap(method, getattr(pattern, method)))
+
+    def _wrap(self, method, call):
+        counters = self._counters
+        key = f'regex.{self._name}'
+
+        def counted(*args, **kwargs):
+            counters['regex.calls'] += 1
+            counters[key] += 1
+            result = call(*args, **kwargs)
+            if method in ('sub', 'subn'):
+                string, start = args[1] if len(args) > 1 else kwargs.get('string', ''), 0
+            else:
+                string = args[0] if args else kwargs.get('string', '')
+                start = args[1] if len(args) > 1 and method != 'split' else kwargs.get('pos', 0)
+            if method in ('match', 'fullmatch') and result is not None:
+                # The tokenizer matches in place; count only what it consumed
+                counters['regex.scanned'] += result.end() - start
+            else:
+                counters['regex.scanned'] += len(string) - start
+            return result
+
+        return counted
+
+    def __getattr__(self, name):
+        return getattr(self._pattern, name)
+
+
+class Profile:
+    """Counters, allocations and optional cProfile / stack samples of one run"""
+
+    def __init__(self, out=None):
+        self.out = out
+        self.counters = Counter()
+        self.stages = []
+        self._open = {}
+        self._patched = []
+        self._cprofile = None
+        self._sampler = None
+        self._samples = Counter()
+        self.peak = 0
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def start(self):
+        import tracemalloc
+
+        self._instrument()
+        tracemalloc.start()
+        if self.out and self.out.endswith(('.prof', '.pstats')):
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.out:
+            import threading
+
+            self._sampler = threading.Thread(target=self._sample, args=(threading.get_ident(),), daemon=True)
+            self._running = True
+            self._sampler.start()
+
+    def stop(self):
+        import tracemalloc
+
+        if self._cprofile:
+            self._cprofile.disable()
+        if self._sampler:
+            self._running = False
+            self._sampler.join()
+        self._fold_peak()
+        tracemalloc.stop()
+        for module, name, pattern in self._patched:
+            setattr(module, name, pattern)
+        self._patched = []
+
+    def _instrument(self):
+        import importlib
+        import re
+
+        for module_name in PATTERN_MODULES:
+            module = importlib.import_module(module_name)
+            for name, value in list(vars(module).items()):
+                if isinstance(value, re.Pattern):
+                    label = f"{module_name.rsplit('.', 1)[-1]}.{name.strip('_')}"
+                    setattr(module, name, _CountingPattern(value, label, self.counters))
+                    self._patched.append((module, name, value))
+
+        from . import workouts_db
+
+        read_source = workouts_db.read_source
+
+        def counted_read(path=workouts_db.DEFAULT_DB_PATH):
+            content = read_source(path)
+            self.counters['io.reads'] += 1
+            self.counters['io.bytes'] += len(content.encode('utf-8'))
+            return content
+
+        workouts_db.read_source = counted_read
+        self._patched.append((workouts_db, 'read_source', read_source))
+
+    def _fold_peak(self):
+        import tracemalloc
+
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak = max(self.peak, peak)
+        for entry in self._open.values():
+            entry['peak'] = max(entry['peak'], peak)
+        tracemalloc.reset_peak()
+
+    def enter(self, name):
+        """Start the measurements of a stage; stages may nest and overlap"""
+        import tracemalloc
+
+        self._fold_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        self._open[name] = {'base': current, 'peak': current, 'counters': self.counters.copy()}
+
+    def exit(self, name, wall, cpu):
+        """End a stage and return its measurements for the Timings stage entry"""
+        import tracemalloc
+
+        self._fold_peak()
+        entry = self._open.pop(name)
+        counters = {key: value - entry['counters'][key]
+                    for key, value in self.counters.items() if value != entry['counters'][key]}
+        extra = {
+            'allocBytes': tracemalloc.get_traced_memory()[0] - entry['base'],
+            'peakBytes': entry['peak'] - entry['base'],
+            'counters': counters
+        }
+        self.stages.append({'stage': name, 'wall': wall, 'cpu': cpu, **extra})
+        return extra
+
+    def iterate(self, items, name, record=None):
+        """Yield from items, recording the work behind each item as stage name(item)
+
+        record(stage, wall, cpu, **measurements) is called for every item, e.g.
+        Timings.add to put the stages into the report as well.
+        """
+        items = iter(items)
+        pending = ('next', id(items))
+        while True:
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            self.enter(pending)
+            try:
+                item = next(items)
+            except StopIteration:
+                self._open.pop(pending)
+                return
+            stage = name(item)
+            self._open[stage] = self._open.pop(pending)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            extra = self.exit(stage, wall, cpu)
+            if record:
+                record(stage, wall, cpu, **extra)
+            yield item
+
+    def _sample(self, thread_id):
+        own = sys._current_frames
+        while self._running:
+            frame = own().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self._samples[';'.join(reversed(stack))] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def dump(self):
+        """Write --profile-out; returns a description of what was written"""
+        if self._cprofile:
+            self._cprofile.dump_stats(self.out)
+            return f'cProfile dump {self.out} (python -m pstats {self.out})'
+        with open(self.out, 'w', encoding='utf-8') as f:
+            for stack, count in self._samples.most_common():
+                f.write(f'{stack} {count}\n')
+        return f'{sum(self._samples.values())} stack samples in {self.out} (flamegraph.pl / speedscope)'
+
+    def print_summary(self):
+        print('\n🔬 PROFILE')
+        print('───────────────────────────────────────────────────────────')
+        print(f"{'stage':<34}{'wall ms':>9}{'cpu ms':>9}{'alloc KB':>10}{'peak KB':>10}{'regex':>9}{'scanned KB':>12}")
+        stages = sorted(self.stages, key=lambda s: -s['wall'])
+        for stage in stages[:SUMMARY_STAGES]:
+            counters = stage['counters']
+            print(f"{stage['stage'][:33]:<34}{stage['wall'] * 1000:9.1f}{stage['cpu'] * 1000:9.1f}"
+                  f"{stage['allocBytes'] / 1024:10.1f}{stage['peakBytes'] / 1024:10.1f}"
+                  f"{counters.get('regex.calls', 0):9d}{counters.get('regex.scanned', 0) / 1024:12.1f}")
+        if len(stages) > SUMMARY_STAGES:
+            print(f'... {len(stages) - SUMMARY_STAGES} more stages in the json report')
+
+        print(f"\nFile reads:      {self.counters['io.reads']} ({self.counters['io.bytes'] / 1024:.1f} KB)")
+        print(f"Regex calls:     {self.counters['regex.calls']} "
+              f"({self.counters['regex.scanned'] / 1024:.1f} KB scanned)")
+        patterns = sorted(((k, v) for k, v in self.counters.items()
+                           if k.startswith('regex.') and k not in ('regex.calls', 'regex.scanned')),
+                          key=lambda kv: -kv[1])
+        for key, value in patterns:
+            print(f'   {key[6:]:<30}{value:9d}')
+        print(f'Peak traced:     {self.peak / 1024:.1f} KB')
+
+
+# The profile of the running command; Timings created while it is set report to it
+active = None
+
+
+@contextmanager
+def profiled(args):
+    """Profile the block when args.profile is set; nested blocks share the outer profile"""
+    global active
+
+    if not getattr(args, 'profile', False) or active is not None:
+        yield active
+        return
+
+    profile = Profile(args.profile_out)
+    active = profile
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        active = None
+        profile.print_summary()
+        if profile.out:
+            print(f'💾 {profile.dump()}')
@@ -0,0 +1,175 @@
+"""
+Machine-readable reports
+
+Stage timings (wall-clock and CPU) and the JSON / JUnit XML output of the
+validator scripts. With --format json|junit and no --output file the report
+goes to stdout and the console text moves to stderr.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class Timings:
+    """Wall-clock and CPU time per named stage, in the order the stages ran
+
+    Under --profile every stage also carries the measurements of the active
+    velo.profiling.Profile (allocations, regex calls, bytes scanned).
+    """
+
+    def __init__(self):
+        # Profiling is imported only by --profile runs, so plain runs skip the import
+        profiling = sys.modules.get('velo.profiling')
+        self.profile = profiling.active if profiling else None
+        self.stages = []
+        self._open = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        if self.profile:
+            self.profile.enter(name)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self._finish(name, time.perf_counter() - wall, time.process_time() - cpu, True)
+
+    def start(self, name):
+        """Start a stage that runs until stop(name), for script code that is not a block"""
+        if self.profile:
+            self.profile.enter(name)
+        self._open[name] = (time.perf_counter(), time.process_time())
+
+    def stop(self, name, record=True):
+        """End a started stage and return its (wall, cpu) seconds; record=False only measures it"""
+        wall, cpu = self._open.pop(name)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        self._finish(name, wall, cpu, record)
+        return wall, cpu
+
+    def _finish(self, name, wall, cpu, record):
+        extra = self.profile.exit(name, wall, cpu) if self.profile else {}
+        if record:
+            self.add(name, wall, cpu, **extra)
+
+    def add(self, name, wall, cpu, **extra):
+        self.stages.append({'stage': name, 'wall': round(wall, 6), 'cpu': round(cpu, 6), **extra})
+
+    def total(self):
+        return {
+            'wall': round(time.perf_counter() - self._wall, 6),
+            'cpu': round(time.process_time() - self._cpu, 6)
+        }
+
+
+@contextmanager
+def timed():
+    """Yields a dict that holds 'time' and 'cpuTime' (seconds) once the block ends"""
+    spent = {}
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield spent
+    finally:
+        spent['time'] = round(time.perf_counter() - wall, 6)
+        spent['cpuTime'] = round(time.process_time() - cpu, 6)
+
+
+def add_report_arguments(parser):
+    """Register --format and --output on an argparse parser"""
+    parser.add_argument('--format', choices=('text', 'json', 'junit'), default='text',
+                        help='report format (default: text)')
+    parser.add_argument('--output', '-o', metavar='FILE',
+                        help='write the json/junit report to FILE instead of stdout')
+
+
+def start_report(args):
+    """Send console text to stderr when the report itself goes to stdout"""
+    if args.format != 'text' and not args.output:
+        sys.stdout = sys.stderr
+
+
+def db_info(db):
+    """Summary of the parsed database for report headers"""
+    from .workouts_db import content_hash
+
+    return {
+        'path': db.path,
+        'bytes': len(db.content.encode('utf-8')),
+        'hash': content_hash(db.content),
+        'goals': len(db.goals),
+        'workouts': len(db.workouts()),
+        'variants': len(db.variants())
+    }
+
+
+def write_report(args, suite, results, timings, testcases, db=None):
+    """Write the json or junit report; a no-op for --format text
+
+    testcases is a list of {'group', 'name', 'time', 'cpuTime', 'failures'}
+    dicts, where failures is a list of messages.
+    """
+    if args.format == 'text':
+        return
+
+    if args.format == 'json':
+        report = {
+            'suite': suite,
+            'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'db': db_info(db) if db is not None else None,
+            'results': results,
+            'timings': timings.stages,
+            'total': timings.total(),
+            'testcases': testcases
+        }
+        text = json.dumps(report, indent=2, ensure_ascii=False) + '\n'
+    else:
+        text = _junit(suite, timings, testcases, db)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.__stdout__.write(text)
+        sys.__stdout__.flush()
+
+
+def _junit(suite, timings, testcases, db):
+    import xml.etree.ElementTree as ET
+
+    total = timings.total()
+    root = ET.Element('testsuites', name=suite, time=f"{total['wall']:.6f}")
+
+    properties = ET.SubElement(root, 'properties')
+    for stage in timings.stages:
+        ET.SubElement(properties, 'property', name=f"stage.{stage['stage']}.wall", value=f"{stage['wall']:.6f}")
+        ET.SubElement(properties, 'property', name=f"stage.{stage['stage']}.cpu", value=f"{stage['cpu']:.6f}")
+    ET.SubElement(properties, 'property', name='total.cpu', value=f"{total['cpu']:.6f}")
+    if db is not None:
+        for key, value in db_info(db).items():
+            ET.SubElement(properties, 'property', name=f'db.{key}', value=str(value))
+
+    groups = {}
+    for case in testcases:
+        groups.setdefault(case['group'], []).append(case)
+
+    for group, cases in groups.items():
+        failures = sum(1 for case in cases if case['failures'])
+        group_time = sum(case.get('time', 0) for case in cases)
+        testsuite = ET.SubElement(root, 'testsuite', name=f'{suite}.{group}', tests=str(len(cases)),
+                                  failures=str(failures), errors='0', time=f'{group_time:.6f}')
+        for case in cases:
+            testcase = ET.SubElement(testsuite, 'testcase', classname=f'{suite}.{group}',
+                                     name=case['name'], time=f"{case.get('time', 0):.6f}")
+            if case['failures']:
+                failure = ET.SubElement(testcase, 'failure', message=case['failures'][0])
+                failure.text = '\n'.join(case['failures'])
+
+    ET.indent(root)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding='unicode') + '\n'
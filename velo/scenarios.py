@@ -0,0 +1,140 @@
+"""
+Tester scenarios
+
+The nine default testers of test-comprehensive.html, and a scenario matrix
+that streams the cross product of goals × levels × variants × FTP values
+(optionally a random sample of it) without materializing it.
+"""
+
+import json
+import random
+from dataclasses import dataclass
+
+from .workouts_db import GOALS, VARIANTS
+
+LEVELS = ('Beginner', 'Intermediate', 'Advanced')
+
+DEFAULT_TESTERS = [
+    # FTP Goal Testers
+    {'id': 'ftp-beginner', 'name': 'Sarah', 'level': 'Beginner', 'goal': 'ftp', 'preferredVariant': 'short', 'ftp': 180, 'emoji': '👩‍🦰'},
+    {'id': 'ftp-intermediate', 'name': 'Mike', 'level': 'Intermediate', 'goal': 'ftp', 'preferredVariant': 'medium', 'ftp': 250, 'emoji': '👨‍💼'},
+    {'id': 'ftp-advanced', 'name': 'Alex', 'level': 'Advanced', 'goal': 'ftp', 'preferredVariant': 'long', 'ftp': 320, 'emoji': '🏃‍♂️'},
+
+    # Climbing Goal Testers
+    {'id': 'climbing-beginner', 'name': 'Emma', 'level': 'Beginner', 'goal': 'climbing', 'preferredVariant': 'short', 'ftp': 170, 'emoji': '👩‍🎓'},
+    {'id': 'climbing-intermediate', 'name': 'Tom', 'level': 'Intermediate', 'goal': 'climbing', 'preferredVariant': 'medium', 'ftp': 240, 'emoji': '👨‍🔧'},
+    {'id': 'climbing-advanced', 'name': 'Lisa', 'level': 'Advanced', 'goal': 'climbing', 'preferredVariant': 'long', 'ftp': 300, 'emoji': '🏋️‍♀️'},
+
+    # Gran Fondo Goal Testers
+    {'id': 'granfondo-beginner', 'name': 'John', 'level': 'Beginner', 'goal': 'granfondo', 'preferredVariant': 'short', 'ftp': 190, 'emoji': '👨‍💻'},
+    {'id': 'granfondo-intermediate', 'name': 'Maria', 'level': 'Intermediate', 'goal': 'granfondo', 'preferredVariant': 'medium', 'ftp': 260, 'emoji': '👩‍⚕️'},
+    {'id': 'granfondo-advanced', 'name': 'Chris', 'level': 'Advanced', 'goal': 'granfondo', 'preferredVariant': 'long', 'ftp': 310, 'emoji': '🚴‍♂️'}
+]
+
+LEVEL_EMOJI = {'Beginner': '🚲', 'Intermediate': '🚴', 'Advanced': '🚴‍♂️'}
+
+
+def parse_ftp_range(spec):
+    """FTP values from a list, a single value, 'min-max:step' or {'min', 'max', 'step'}"""
+    if isinstance(spec, dict):
+        return list(range(int(spec['min']), int(spec['max']) + 1, int(spec.get('step', 10))))
+    if isinstance(spec, (list, tuple)):
+        return [int(v) for v in spec]
+    if isinstance(spec, int):
+        return [spec]
+
+    values = []
+    for part in str(spec).split(','):
+        part = part.strip()
+        if '-' in part:
+            bounds, _, step = part.partition(':')
+            low, high = bounds.split('-')
+            values.extend(range(int(low), int(high) + 1, int(step or 10)))
+        elif part:
+            values.append(int(part))
+    return values
+
+
+@dataclass
+class ScenarioMatrix:
+    goals: tuple = GOALS
+    levels: tuple = LEVELS
+    variants: tuple = VARIANTS
+    ftps: tuple = (250,)
+
+    def __len__(self):
+        return len(self.goals) * len(self.levels) * len(self.variants) * len(self.ftps)
+
+    def scenario(self, index):
+        """The index-th scenario of the cross product, in goal-major order"""
+        index, fi = divmod(index, len(self.ftps))
+        index, vi = divmod(index, len(self.variants))
+        gi, li = divmod(index, len(self.levels))
+        goal, level, variant, ftp = self.goals[gi], self.levels[li], self.variants[vi], self.ftps[fi]
+        scenario_id = f'{goal}-{level.lower()}-{variant}-{ftp}'
+        return {
+            'id': scenario_id,
+            'name': scenario_id,
+            'level': level,
+            'goal': goal,
+            'preferredVariant': variant,
+            'ftp': ftp,
+            'emoji': LEVEL_EMOJI.get(level, '🚴')
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.scenario(index)
+
+    def sample(self, k, seed=None):
+        """k random scenarios in matrix order; only the chosen indices are held in memory"""
+        k = min(k, len(self))
+        for index in sorted(random.Random(seed).sample(range(len(self)), k)):
+            yield self.scenario(index)
+
+
+def add_matrix_arguments(parser):
+    """Register the scenario matrix flags on an argparse parser"""
+    group = parser.add_argument_group('scenario matrix')
+    group.add_argument('--matrix', metavar='FILE',
+                       help='JSON file with goals/levels/variants/ftp lists (flags below override it)')
+    group.add_argument('--goals', help='comma separated goals, e.g. ftp,climbing')
+    group.add_argument('--levels', help='comma separated levels, e.g. Beginner,Advanced')
+    group.add_argument('--variants', help='comma separated variants, e.g. short,long')
+    group.add_argument('--ftp', help="FTP values, e.g. 180,250 or 150-350:25")
+    group.add_argument('--sample', type=int, metavar='N', help='run N randomly chosen scenarios of the matrix')
+    group.add_argument('--seed', type=int, help='random seed for --sample')
+
+
+def _split(value):
+    return tuple(part.strip() for part in value.split(',') if part.strip())
+
+
+def scenarios_from_args(args):
+    """(scenarios, count, is_matrix) for parsed matrix flags
+
+    Without any matrix flag this is the nine DEFAULT_TESTERS.
+    """
+    options = {}
+    if args.matrix:
+        with open(args.matrix, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        for key in ('goals', 'levels', 'variants'):
+            if key in config:
+                options[key] = tuple(config[key])
+        if 'ftp' in config:
+            options['ftps'] = tuple(parse_ftp_range(config['ftp']))
+
+    for key in ('goals', 'levels', 'variants'):
+        if getattr(args, key):
+            options[key] = _split(getattr(args, key))
+    if args.ftp:
+        options['ftps'] = tuple(parse_ftp_range(args.ftp))
+
+    if not options and not args.sample:
+        return iter(DEFAULT_TESTERS), len(DEFAULT_TESTERS), False
+
+    matrix = ScenarioMatrix(**options)
+    if args.sample:
+        return matrix.sample(args.sample, args.seed), min(args.sample, len(matrix)), True
+    return iter(matrix), len(matrix), True
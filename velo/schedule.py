@@ -0,0 +1,453 @@
+"""
+Schedule generator
+
+Python port of modules/schedule.js (generateSchedule, selectBestVariant,
+selectRandomWorkout, calculateDayScore) with a seeded RNG, and a Monte Carlo
+engine that draws many schedules per goal × timeCommitment in batches.
+
+The batched engine relies on the structure of generateSchedule: variant
+selection is deterministic per workout and week, and day placement depends
+only on the order of intensities after the random-comparator shuffle, not on
+which workouts were drawn. Workout draws are therefore sampled column by
+column, and placements are sampled from their exact distribution, which is
+enumerated once per week layout.
+"""
+
+import math
+import random
+import statistics
+from dataclasses import dataclass, field
+from functools import cmp_to_key, lru_cache
+
+from .workouts_db import INTENSITIES
+
+ALL_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+WEEKS = 6
+COMMITMENTS = ('starter', 'regular', 'serious')
+DEFAULT_PREFERRED_DAYS = ('Tue', 'Thu', 'Sat')
+
+# Workouts per week per commitment level
+WEEKLY_WORKOUTS = {
+    'starter': (3, 3, 4, 3, 3, 3),
+    'regular': (4, 4, 5, 4, 4, 4),
+    'serious': (5, 5, 6, 5, 5, 4)
+}
+
+# Intensity distribution per week (80/20), week 4 is the recovery week
+INTENSITY_PLANS = {
+    'starter': (
+        {'easy': 2, 'moderate': 1, 'hard': 0},
+        {'easy': 2, 'moderate': 0, 'hard': 1},
+        {'easy': 3, 'moderate': 0, 'hard': 1},
+        {'easy': 3, 'moderate': 0, 'hard': 0},
+        {'easy': 2, 'moderate': 0, 'hard': 1},
+        {'easy': 2, 'moderate': 1, 'hard': 0}
+    ),
+    'regular': (
+        {'easy': 3, 'moderate': 1, 'hard': 0},
+        {'easy': 3, 'moderate': 0, 'hard': 1},
+        {'easy': 3, 'moderate': 1, 'hard': 1},
+        {'easy': 4, 'moderate': 0, 'hard': 0},
+        {'easy': 3, 'moderate': 0, 'hard': 1},
+        {'easy': 3, 'moderate': 1, 'hard': 0}
+    ),
+    'serious': (
+        {'easy': 4, 'moderate': 1, 'hard': 0},
+        {'easy': 4, 'moderate': 0, 'hard': 1},
+        {'easy': 4, 'moderate': 1, 'hard': 1},
+        {'easy': 5, 'moderate': 0, 'hard': 0},
+        {'easy': 3, 'moderate': 1, 'hard': 1},
+        {'easy': 3, 'moderate': 1, 'hard': 0}
+    )
+}
+
+# Target duration (minutes) per commitment level, a guide for variant selection
+TARGET_DURATIONS = {
+    'starter': {'easy': 60, 'moderate': 55, 'hard': 50},
+    'regular': {'easy': 90, 'moderate': 70, 'hard': 60},
+    'serious': {'easy': 120, 'moderate': 80, 'hard': 65}
+}
+
+# Workouts are added to the weekly pool in this order before the shuffle
+POOL_ORDER = ('hard', 'moderate', 'easy')
+
+_INTENSE = ('hard', 'moderate')
+
+
+def select_best_variant(workout, target_duration, week):
+    """(variant key, Variant) closest to the target, longer in week 3 and shorter in week 4"""
+    if not workout.variants:
+        return None
+
+    adjusted = target_duration
+    if week == 3:
+        adjusted = target_duration * 1.1
+    elif week == 4:
+        adjusted = target_duration * 0.7
+
+    best = None
+    smallest = float('inf')
+    for key, variant in workout.variants.items():
+        diff = abs(variant.duration - adjusted)
+        if diff < smallest:
+            smallest = diff
+            best = (key, variant)
+    return best
+
+
+def calculate_day_score(day, scheduled_days, preferred_days, intensity):
+    """Suitability of a day for the next workout, higher is better"""
+    day_index = ALL_DAYS.index(day)
+    score = 0
+
+    if day in preferred_days:
+        score += 10
+
+    if day in ('Sat', 'Sun') and intensity == 'easy':
+        score += 5
+
+    consecutive = 1
+    for j in range(day_index - 1, max(-1, day_index - 4), -1):
+        if ALL_DAYS[j] in scheduled_days:
+            consecutive += 1
+        else:
+            break
+    if consecutive >= 4:
+        score -= 20
+
+    if intensity in _INTENSE:
+        prev_day = ALL_DAYS[day_index - 1] if day_index > 0 else None
+        next_day = ALL_DAYS[day_index + 1] if day_index < len(ALL_DAYS) - 1 else None
+        if prev_day in scheduled_days or next_day in scheduled_days:
+            score -= 15
+
+    return score
+
+
+def select_random_workout(workouts, rng=random):
+    if not workouts:
+        return None
+    return workouts[int(rng.random() * len(workouts))]
+
+
+def _random_comparator_sort(items, rng):
+    """workoutPool.sort(() => Math.random() - 0.5)
+
+    V8's Array.prototype.sort is a port of CPython's list sort, so sorting
+    with the same random comparator reproduces its (biased) shuffle.
+    """
+    return sorted(items, key=cmp_to_key(lambda a, b: rng.random() - 0.5))
+
+
+def assign_days(intensities, preferred_days, workout_count):
+    """Day index per pool position, following the smart scheduling loop of generateSchedule"""
+    sorted_days = sorted(ALL_DAYS, key=lambda d: 0 if d in preferred_days else 1)
+    scheduled = []
+    days = []
+    for i in range(min(workout_count, len(intensities))):
+        best_day = None
+        best_score = float('-inf')
+        for day in sorted_days:
+            if day in scheduled:
+                continue
+            score = calculate_day_score(day, scheduled, preferred_days, intensities[i])
+            if score > best_score:
+                best_score = score
+                best_day = day
+        if best_day is not None:
+            scheduled.append(best_day)
+            days.append(ALL_DAYS.index(best_day))
+    return days
+
+
+def generate_schedule(db, goal, time_commitment, preferred_days=DEFAULT_PREFERRED_DAYS, rng=random):
+    """One 6-week schedule: {week: {day: resolved workout dict or None}}"""
+    schedule = {}
+    goal_data = db.goals.get(goal)
+    if goal_data is None:
+        return schedule
+
+    for week in range(1, WEEKS + 1):
+        schedule[week] = {day: None for day in ALL_DAYS}
+        workout_count = WEEKLY_WORKOUTS[time_commitment][week - 1]
+        plan = INTENSITY_PLANS[time_commitment][week - 1]
+
+        pool = []
+        for intensity in POOL_ORDER:
+            for _ in range(plan[intensity]):
+                base = select_random_workout(goal_data.intensities.get(intensity, []), rng)
+                if base is None:
+                    continue
+                selected = select_best_variant(base, TARGET_DURATIONS[time_commitment][intensity], week)
+                if selected is None:
+                    continue
+                key, variant = selected
+                pool.append({
+                    'name': variant.display_name or base.name,
+                    'baseName': base.name,
+                    'intensity': intensity,
+                    'description': base.description,
+                    'tips': base.tips,
+                    'powerZone': base.power_zone,
+                    'duration': variant.duration,
+                    'details': variant.details,
+                    'variantType': key,
+                    'adapted': False,
+                    'originalDuration': variant.duration
+                })
+
+        pool = _random_comparator_sort(pool, rng)
+        days = assign_days([w['intensity'] for w in pool], preferred_days, workout_count)
+        for workout, day in zip(pool, days):
+            schedule[week][ALL_DAYS[day]] = workout
+
+    return schedule
+
+
+class _NeedBit(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def shuffle_distribution(n):
+    """Exact {permutation: probability} of sorting n items with a random comparator
+
+    Explores every comparison outcome sequence of the sort; each comparison
+    goes either way with probability 1/2.
+    """
+    outcomes = {}
+    stack = [()]
+    while stack:
+        prefix = stack.pop()
+        bits = iter(prefix)
+
+        def compare(a, b):
+            for bit in bits:
+                return -1 if bit else 1
+            raise _NeedBit
+
+        try:
+            perm = tuple(sorted(range(n), key=cmp_to_key(compare)))
+        except _NeedBit:
+            stack.append(prefix + (True,))
+            stack.append(prefix + (False,))
+            continue
+        outcomes[perm] = outcomes.get(perm, 0.0) + 0.5 ** len(prefix)
+    return outcomes
+
+
+@dataclass
+class Placement:
+    """Where the intensities of one shuffled week land"""
+    days: tuple
+    intensities: tuple
+    # Adjacent day pairs that are both hard/moderate
+    back_to_back: int = 0
+    # Longest run of consecutive training days
+    max_consecutive: int = 0
+    # Workouts on days the user did not prefer
+    off_preference: int = 0
+
+
+def _placement(intensities, preferred_days, workout_count):
+    days = assign_days(intensities, preferred_days, workout_count)
+    by_day = dict(zip(days, intensities))
+    back_to_back = sum(1 for d in range(len(ALL_DAYS) - 1)
+                       if by_day.get(d) in _INTENSE and by_day.get(d + 1) in _INTENSE)
+    longest = run = 0
+    for d in range(len(ALL_DAYS)):
+        run = run + 1 if d in by_day else 0
+        longest = max(longest, run)
+    off_preference = sum(1 for d in days if ALL_DAYS[d] not in preferred_days)
+    return Placement(tuple(days), tuple(intensities[:len(days)]), back_to_back, longest, off_preference)
+
+
+def placement_distribution(plan, preferred_days, workout_count):
+    """[(Placement, probability)] of one week's pool after the shuffle"""
+    pool = [intensity for intensity in POOL_ORDER for _ in range(plan[intensity])]
+    merged = {}
+    for perm, probability in shuffle_distribution(len(pool)).items():
+        order = tuple(pool[i] for i in perm)
+        merged[order] = merged.get(order, 0.0) + probability
+    return [(_placement(list(order), preferred_days, workout_count), p) for order, p in merged.items()]
+
+
+def summarize(values):
+    """mean / stdev / min / p5 / p50 / p95 / max of a sample, rounded to 3 decimals"""
+    if not values:
+        return {}
+    q = statistics.quantiles(values, n=20, method='inclusive') if len(values) > 1 else [values[0]] * 19
+    mean = statistics.fmean(values)
+    summary = {
+        'mean': mean,
+        'stdev': math.sqrt(statistics.fmean([(v - mean) ** 2 for v in values])),
+        'min': min(values),
+        'p5': q[0],
+        'p50': q[9],
+        'p95': q[18],
+        'max': max(values)
+    }
+    return {key: round(value, 3) for key, value in summary.items()}
+
+
+@dataclass
+class ScheduleStats:
+    goal: str
+    commitment: str
+    schedules: int
+    # Summaries of per-schedule values
+    total_minutes: dict = field(default_factory=dict)
+    week_minutes: list = field(default_factory=list)
+    intense_share: dict = field(default_factory=dict)
+    distinct_workouts: dict = field(default_factory=dict)
+    # Share of schedules with at least one occurrence
+    repeat_in_week: float = 0.0
+    back_to_back: float = 0.0
+    four_in_a_row: float = 0.0
+    off_preference: float = 0.0
+    # Share of schedules where a week's pool had no workout of a planned intensity
+    missing_intensity: float = 0.0
+
+    def as_dict(self):
+        return {
+            'goal': self.goal,
+            'commitment': self.commitment,
+            'schedules': self.schedules,
+            'totalMinutes': self.total_minutes,
+            'weekMinutes': self.week_minutes,
+            'intenseShare': self.intense_share,
+            'distinctWorkouts': self.distinct_workouts,
+            'repeatInWeek': self.repeat_in_week,
+            'backToBack': self.back_to_back,
+            'fourInARow': self.four_in_a_row,
+            'offPreference': self.off_preference,
+            'missingIntensity': self.missing_intensity
+        }
+
+
+# Placement flags, sampled as one bitmask per week
+_BACK_TO_BACK = 1
+_FOUR_IN_A_ROW = 2
+_OFF_PREFERENCE = 4
+
+
+def _placement_masks(placements):
+    """([mask], cumulative weights) of a placement distribution, merged per flag combination"""
+    merged = {}
+    for placement, probability in placements:
+        mask = ((_BACK_TO_BACK if placement.back_to_back else 0)
+                | (_FOUR_IN_A_ROW if placement.max_consecutive >= 4 else 0)
+                | (_OFF_PREFERENCE if placement.off_preference else 0))
+        merged[mask] = merged.get(mask, 0.0) + probability
+    masks = sorted(merged)
+    cumulative = []
+    total = 0.0
+    for mask in masks:
+        total += merged[mask]
+        cumulative.append(total)
+    return masks, cumulative
+
+
+def uniform_picks(rng, k, n):
+    """n uniform draws from range(k), k <= 256, by rejection sampling random bytes in C"""
+    table = bytes(i % k for i in range(256))
+    rejected = bytes(range(256 - 256 % k, 256))
+    picks = b''
+    while len(picks) < n:
+        picks += rng.randbytes(n - len(picks) + (n >> 3) + 16).translate(table, rejected)
+    return picks[:n]
+
+
+def simulate(db, goal, commitment, count, seed=0, preferred_days=DEFAULT_PREFERRED_DAYS, batch_size=20000):
+    """Draw count schedules for a goal and commitment level and summarize them"""
+    rng = random.Random(f'{seed}:{goal}:{commitment}')
+    goal_data = db.goals[goal]
+    preferred_days = tuple(preferred_days)
+    stats = ScheduleStats(goal, commitment, count)
+
+    # Global id per workout so repeats can be counted across intensities
+    ids = {}
+    for intensity in INTENSITIES:
+        for w in goal_data.intensities.get(intensity, []):
+            ids[id(w)] = len(ids)
+
+    # Per week: one column spec per pool slot, plus the placement distribution
+    weeks = []
+    for week in range(1, WEEKS + 1):
+        plan = INTENSITY_PLANS[commitment][week - 1]
+        slots = []
+        for intensity in POOL_ORDER:
+            workouts = goal_data.intensities.get(intensity, [])
+            target = TARGET_DURATIONS[commitment][intensity]
+            durations = []
+            for w in workouts:
+                selected = select_best_variant(w, target, week)
+                durations.append(selected[1].duration if selected else 0)
+            for _ in range(plan[intensity]):
+                slots.append((intensity, [ids[id(w)] for w in workouts], durations))
+        available = {i: bool(goal_data.intensities.get(i)) for i in POOL_ORDER}
+        effective = {i: plan[i] if available[i] else 0 for i in POOL_ORDER}
+        placements = placement_distribution(effective, preferred_days, WEEKLY_WORKOUTS[commitment][week - 1])
+        weeks.append((slots, _placement_masks(placements), not all(available[i] or plan[i] == 0 for i in POOL_ORDER)))
+
+    totals = []
+    week_totals = [[] for _ in range(WEEKS)]
+    intense_shares = []
+    distinct = []
+    repeat_schedules = back_to_back_schedules = four_schedules = off_schedules = 0
+    missing = 0
+
+    for start in range(0, count, batch_size):
+        n = min(batch_size, count - start)
+        all_ids = []
+        batch_total = [0] * n
+        batch_intense = [0] * n
+        repeat = [False] * n
+        flags = [0] * n
+
+        for week_index, (slots, (masks, cumulative), lacks_intensity) in enumerate(weeks):
+            week_minutes = [0] * n
+            week_ids = []
+            for intensity, slot_ids, durations in slots:
+                if not slot_ids:
+                    continue
+                if len(slot_ids) <= 256:
+                    picks = uniform_picks(rng, len(slot_ids), n)
+                else:
+                    picks = rng.choices(range(len(slot_ids)), k=n)
+                minutes = [durations[p] for p in picks]
+                week_minutes = list(map(int.__add__, week_minutes, minutes))
+                if intensity in _INTENSE:
+                    batch_intense = list(map(int.__add__, batch_intense, minutes))
+                week_ids.append([slot_ids[p] for p in picks])
+            if len(week_ids) > 1:
+                repeat = [r or len(set(row)) < len(row) for r, row in zip(repeat, zip(*week_ids))]
+            all_ids.extend(week_ids)
+            week_totals[week_index].extend(week_minutes)
+            batch_total = list(map(int.__add__, batch_total, week_minutes))
+
+            if len(masks) > 1:
+                flags = list(map(int.__or__, flags, rng.choices(masks, cum_weights=cumulative, k=n)))
+            elif masks[0]:
+                flags = [f | masks[0] for f in flags]
+            if lacks_intensity:
+                missing += n
+
+        totals.extend(batch_total)
+        intense_shares.extend(i / t if t else 0.0 for i, t in zip(batch_intense, batch_total))
+        distinct.extend(map(len, map(set, zip(*all_ids))) if all_ids else [0] * n)
+        repeat_schedules += sum(repeat)
+        back_to_back_schedules += sum(1 for f in flags if f & _BACK_TO_BACK)
+        four_schedules += sum(1 for f in flags if f & _FOUR_IN_A_ROW)
+        off_schedules += sum(1 for f in flags if f & _OFF_PREFERENCE)
+
+    stats.total_minutes = summarize(totals)
+    stats.week_minutes = [summarize(values) for values in week_totals]
+    stats.intense_share = summarize(intense_shares)
+    stats.distinct_workouts = summarize(distinct)
+    stats.repeat_in_week = repeat_schedules / count
+    stats.back_to_back = back_to_back_schedules / count
+    stats.four_in_a_row = four_schedules / count
+    stats.off_preference = off_schedules / count
+    stats.missing_intensity = missing / (count * WEEKS)
+    return stats
@@ -0,0 +1,462 @@
+"""
+Workout scoring
+
+Python port of the workout-quality scoring in modules/strava-config.js
+(analyzeWorkoutQuality and its helpers), for backfilling the workout_scores
+table from local activity files instead of one activity at a time in the
+browser.
+
+Besides the browser rules, completion can be scored against the planned
+phase structure of velo.workout_parser: every work and steady phase is
+checked against the power of the same stretch of the ride, instead of
+counting intervals above 105% FTP against a fixed five.
+
+Activity records are JSON objects, in JSON lines files or JSON array files:
+
+    {"user_id": "<uuid>", "history_key": "1-0", "ftp": 250,
+     "activity": {"id": 123, "moving_time": 3600, "has_power": true, ...},
+     "workout": {<scheduled workout as in appState.schedule>},
+     "streams": {"watts": {"data": [...]}}}
+
+activity is the Strava activity summary and streams the response of the
+streams endpoint with key_by_type=true, both as the browser gets them.
+"""
+
+import bisect
+import json
+import math
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from .schedule import ALL_DAYS, COMMITMENTS, WEEKS, generate_schedule
+from .workout_parser import parse_workout
+
+TABLE = 'workout_scores'
+COLUMNS = ('user_id', 'history_key', 'activity_id', 'total_score', 'duration_score',
+           'power_zones_score', 'completion_score', 'synced_at')
+COMPLETION_MODES = ('browser', 'phases')
+
+# Upper bounds of StravaConfig.powerZones zone1-zone5 as decimal FTP; zone6 is everything above
+ZONE_MAXIMA = (0.55, 0.75, 0.90, 1.05, 1.20)
+ZONES = ('zone1', 'zone2', 'zone3', 'zone4', 'zone5', 'zone6')
+
+# detectIntervals: power above 105% FTP for at least a minute
+INTERVAL_THRESHOLD = 1.05
+MIN_INTERVAL_SECONDS = 60
+EXPECTED_INTERVALS = 5
+
+# Component weights of the total
+WEIGHTS = {'duration': 0.30, 'powerZones': 0.40, 'completion': 0.30}
+
+# Phase completion: a phase counts when its average power is at least this far below target (decimal FTP)
+PHASE_TOLERANCE = 0.05
+_SCORED_PHASES = ('work', 'steady')
+
+_RUN_RE = re.compile(rb'\x01+')
+
+
+def _js_round(value):
+    """Math.round: halves go up"""
+    return math.floor(value + 0.5)
+
+
+class ActivityError(ValueError):
+    """An activity record that cannot be scored"""
+
+
+def time_in_zones(watts, ftp):
+    """calculateTimeInZones: percentage of samples per power zone, or None without data
+
+    Power meters report whole watts, so a stream has a few hundred distinct
+    values: they are counted in C and only the distinct values are placed in
+    a zone. The ratio is computed as watts / ftp like the browser, so samples
+    on a bound land in the same zone.
+    """
+    if not watts or not ftp:
+        return None
+    counts = [0] * len(ZONES)
+    for value, count in Counter(watts).items():
+        counts[bisect.bisect_left(ZONE_MAXIMA, value / ftp)] += count
+    total = len(watts)
+    return {zone: count / total * 100 for zone, count in zip(ZONES, counts)}
+
+
+def detect_intervals(watts, ftp, min_seconds=MIN_INTERVAL_SECONDS):
+    """detectIntervals: [(start, end)] of runs above 105% FTP of at least min_seconds
+
+    Like the browser, a run still going at the end of the ride is not counted.
+    """
+    if not watts or not ftp:
+        return []
+    threshold = ftp * INTERVAL_THRESHOLD
+    mask = bytes(map(threshold.__lt__, watts))
+    return [run.span() for run in _RUN_RE.finditer(mask)
+            if run.end() < len(mask) and run.end() - run.start() >= min_seconds]
+
+
+def score_power_zones(zones, intensity):
+    """scorePowerZoneAccuracy: 0-10 for the time in the zones the intensity calls for"""
+    if not zones:
+        return 5
+    if intensity == 'easy':
+        share = zones['zone2']
+        return 10 if share >= 80 else 9 if share >= 70 else 8 if share >= 60 else 6 if share >= 50 else 4
+    if intensity == 'moderate':
+        share = zones['zone2'] + zones['zone3']
+        return 10 if share >= 75 else 9 if share >= 65 else 7 if share >= 55 else 5
+    if intensity == 'hard':
+        share = zones['zone4'] + zones['zone5'] + zones['zone6']
+        return 10 if share >= 25 else 9 if share >= 20 else 8 if share >= 15 else 6 if share >= 10 else 4
+    return 5
+
+
+def estimate_intensity_score(average_watts, ftp, intensity):
+    """estimateIntensityScore: 9 when average power fits the intensity, otherwise 5"""
+    if not ftp:
+        return 5
+    ratio = average_watts / ftp
+    if intensity == 'easy' and 0.56 <= ratio <= 0.75:
+        return 9
+    if intensity == 'moderate' and 0.76 <= ratio <= 0.90:
+        return 9
+    if intensity == 'hard' and ratio >= 0.91:
+        return 9
+    return 5
+
+
+def score_duration(moving_time, scheduled_minutes):
+    """Duration component of analyzeWorkoutQuality and its details"""
+    actual = _js_round(moving_time / 60)
+    scheduled = scheduled_minutes or 60
+    ratio = actual / scheduled
+    if 0.95 <= ratio <= 1.05:
+        score = 10
+    elif 0.90 <= ratio <= 1.10:
+        score = 8
+    elif 0.85 <= ratio <= 1.15:
+        score = 6
+    else:
+        score = max(2, 10 - abs(ratio - 1) * 20)
+    return score, {'actual': actual, 'scheduled': scheduled, 'ratio': _js_round(ratio * 100)}
+
+
+@lru_cache(maxsize=4096)
+def _planned_phases(duration, details, intensity):
+    parsed = parse_workout({'duration': duration, 'details': details, 'intensity': intensity})
+    phases = parsed['phases']
+    planned = []
+    clock = 0
+    for phase in [phases['warmup'], *phases['main'], phases['cooldown']]:
+        seconds = _js_round(phase['duration'] * 60)
+        if phase['type'] in _SCORED_PHASES and seconds > 0:
+            planned.append((phase['type'], clock, seconds, phase['intensity']))
+        clock += seconds
+    return tuple(planned)
+
+
+def planned_phases(workout):
+    """(type, start second, seconds, decimal FTP) of the work and steady phases of a scheduled workout
+
+    Parsed with velo.workout_parser and cached by the fields that determine the
+    phases, since a user base shares a few hundred variants.
+    """
+    return _planned_phases(workout.get('duration') or 60, workout.get('details') or '', workout.get('intensity') or '')
+
+
+def phase_completion(watts, ftp, phases, tolerance=PHASE_TOLERANCE):
+    """(phases hit, phases planned) for the planned work and steady phases
+
+    A phase is hit when the ride's average power over the same seconds is at
+    most tolerance below its target; phases the ride did not last into miss.
+    """
+    hit = 0
+    for _, start, seconds, target in phases:
+        window = watts[start:start + seconds]
+        if len(window) == seconds and math.fsum(window) / seconds / ftp >= target - tolerance:
+            hit += 1
+    return hit, len(phases)
+
+
+@dataclass
+class Score:
+    """Quality score of one activity, components on the browser's 0-10 scale"""
+    duration: float = 0
+    power_zones: float = 0
+    completion: float = 0
+    total: int = 0
+    details: dict = field(default_factory=dict)
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'duration': self.duration,
+            'powerZones': self.power_zones,
+            'completion': self.completion,
+            'details': self.details
+        }
+
+
+def _watts(streams):
+    data = ((streams or {}).get('watts') or {}).get('data')
+    if not data:
+        return None
+    # Strava sends null for dropouts; the browser's arithmetic treats them as 0
+    return [w or 0 for w in data] if None in data else data
+
+
+def analyze(activity, workout, ftp, streams=None, completion='browser'):
+    """analyzeWorkoutQuality for one activity against its scheduled workout
+
+    With completion='phases' the completion component of every workout with
+    planned work or steady phases is the share of those phases ridden at
+    target; otherwise the browser rules apply (intervals for hard workouts,
+    the duration score for the rest).
+    """
+    score = Score()
+    score.duration, score.details['duration'] = score_duration(activity.get('moving_time') or 0,
+                                                               workout.get('duration'))
+    intensity = workout.get('intensity')
+
+    has_power = activity.get('has_power') or activity.get('device_watts') or activity.get('average_watts')
+    watts = _watts(streams) if has_power and ftp else None
+    if watts:
+        zones = time_in_zones(watts, ftp)
+        score.power_zones = score_power_zones(zones, intensity)
+        score.details['timeInZones'] = zones
+        if intensity == 'hard':
+            intervals = detect_intervals(watts, ftp)
+            score.completion = min(10, len(intervals) / EXPECTED_INTERVALS * 10)
+            score.details['intervals'] = {'detected': len(intervals), 'expected': EXPECTED_INTERVALS}
+        else:
+            score.completion = score.duration
+        if completion == 'phases':
+            phases = planned_phases(workout)
+            if phases:
+                hit, planned = phase_completion(watts, ftp, phases)
+                score.completion = hit / planned * 10
+                score.details['phases'] = {'hit': hit, 'planned': planned}
+    elif has_power and ftp:
+        # Power recorded but no stream in the file
+        score.power_zones = 5
+        score.completion = score.duration
+    else:
+        average = activity.get('average_watts')
+        score.power_zones = estimate_intensity_score(average, ftp, intensity) if average else 5
+        score.completion = score.duration
+        score.details['noPowerData'] = True
+
+    score.total = _js_round(score.duration * WEIGHTS['duration'] + score.power_zones * WEIGHTS['powerZones']
+                            + score.completion * WEIGHTS['completion'])
+    return score
+
+
+def score_record(record, completion='browser', synced_at=None):
+    """workout_scores row of one activity record; raises ActivityError for unusable records"""
+    activity = record.get('activity') or {}
+    workout = record.get('workout')
+    missing = [name for name, value in (('user_id', record.get('user_id')),
+                                        ('history_key', record.get('history_key')),
+                                        ('activity.id', activity.get('id')),
+                                        ('workout', workout)) if not value]
+    if missing:
+        raise ActivityError(f"missing {', '.join(missing)}")
+    try:
+        activity_id = int(activity['id'])
+        score = analyze(activity, workout, record.get('ftp'), record.get('streams'), completion)
+    except (TypeError, ValueError, AttributeError) as e:
+        raise ActivityError(str(e)) from e
+    return {
+        'user_id': str(record['user_id']),
+        'history_key': str(record['history_key']),
+        'activity_id': activity_id,
+        'total_score': score.total,
+        'duration_score': round(score.duration, 2),
+        'power_zones_score': round(score.power_zones, 2),
+        'completion_score': round(score.completion, 2),
+        'synced_at': record.get('synced_at') or synced_at
+    }
+
+
+def iter_records(path, chunk_size=1 << 20):
+    """Yield (position, record) from a JSON lines file or a JSON array file without reading it whole
+
+    position is the line number for JSON lines and the record index for arrays.
+    Raises ValueError on malformed JSON.
+    """
+    with open(path, encoding='utf-8') as f:
+        head = f.read(chunk_size)
+        if not head.lstrip().startswith('['):
+            # JSON lines
+            f.seek(0)
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f'line {number}: {e}') from e
+            return
+
+        decoder = json.JSONDecoder()
+        buffer = head[head.index('[') + 1:]
+        index = 0
+        eof = False
+        while True:
+            buffer = buffer.lstrip(' \t\r\n,')
+            if buffer.startswith(']'):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f'record {index + 1}: {e}') from e
+                more = f.read(chunk_size)
+                eof = not more
+                buffer += more
+                continue
+            index += 1
+            yield index, record
+            buffer = buffer[end:]
+            if len(buffer) < chunk_size and not eof:
+                more = f.read(chunk_size)
+                eof = not more
+                buffer += more
+
+
+@dataclass
+class ScoreStats:
+    """Counts and score distributions of a scoring run"""
+    activities: int = 0
+    rejected: int = 0
+    samples: int = 0
+    totals: dict = field(default_factory=dict)
+    components: dict = field(default_factory=lambda: {'duration': [], 'powerZones': [], 'completion': []})
+
+    def add(self, row, samples):
+        self.activities += 1
+        self.samples += samples
+        self.totals[row['total_score']] = self.totals.get(row['total_score'], 0) + 1
+        self.components['duration'].append(row['duration_score'])
+        self.components['powerZones'].append(row['power_zones_score'])
+        self.components['completion'].append(row['completion_score'])
+
+    def merge(self, other):
+        self.activities += other.activities
+        self.rejected += other.rejected
+        self.samples += other.samples
+        for total, count in other.totals.items():
+            self.totals[total] = self.totals.get(total, 0) + count
+        for name, values in other.components.items():
+            self.components[name].extend(values)
+
+
+def score_file(path, completion='browser', synced_at=None):
+    """(rows, rejected, stats) of one activity file; rejected is [(position, message)]
+
+    Rows come in file order; the stream of a record is dropped as soon as it
+    is scored, so memory follows the largest record, not the file.
+    """
+    rows, rejected = [], []
+    stats = ScoreStats()
+    for position, record in iter_records(path):
+        try:
+            row = score_record(record, completion, synced_at)
+        except ActivityError as e:
+            rejected.append((position, str(e)))
+            stats.rejected += 1
+            continue
+        rows.append(row)
+        stats.add(row, len(((record.get('streams') or {}).get('watts') or {}).get('data') or ()))
+    return rows, rejected, stats
+
+
+def latest_rows(rows):
+    """Rows with one per (user_id, history_key), the last one winning like consecutive upserts
+
+    One INSERT ... ON CONFLICT DO UPDATE cannot touch the same row twice.
+    """
+    latest = {}
+    for row in rows:
+        key = (row['user_id'], row['history_key'])
+        latest.pop(key, None)
+        latest[key] = row
+    return list(latest.values())
+
+
+def _literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def upsert_sql(rows):
+    """One INSERT ... ON CONFLICT (user_id, history_key) DO UPDATE statement for a batch of rows"""
+    values = ',\n'.join('    (' + ', '.join(_literal(row[c]) for c in COLUMNS) + ')' for row in rows)
+    updates = ',\n'.join(f'    {c} = EXCLUDED.{c}' for c in COLUMNS[2:])
+    return (f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES\n{values}\n"
+            f'ON CONFLICT (user_id, history_key) DO UPDATE SET\n{updates};\n')
+
+
+def _iso(seconds, epoch=datetime(2025, 1, 6, tzinfo=timezone.utc)):
+    return (epoch + timedelta(seconds=seconds)).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _ride(workout, ftp, rng):
+    """Per-second watts of a ride of a scheduled workout, with a rider that fades, cuts short or skips"""
+    parsed = parse_workout(workout)
+    phases = parsed['phases']
+    form = rng.gauss(1.0, 0.06)
+    stop = rng.random() < 0.15
+    # Main sets the parser does not understand leave a gap; the rider fills it at the workout's intensity
+    gap = parsed['duration'] - parsed['totalDuration']
+    filler = [{'type': 'steady', 'duration': gap, 'intensity': parsed['intensity']['value']}] if gap > 0 else []
+    watts = []
+    for phase in [phases['warmup'], *phases['main'], *filler, phases['cooldown']]:
+        seconds = _js_round(phase['duration'] * 60)
+        target = phase['intensity'] * ftp * form
+        if phase['type'] == 'work' and rng.random() < 0.1:
+            target *= 0.7
+        watts.extend(max(0, _js_round(rng.gauss(target, target * 0.08))) for _ in range(seconds))
+        if stop and phase['type'] != 'warmup' and rng.random() < 0.3:
+            break
+    return watts
+
+
+def simulated_activities(db, users, seed=0):
+    """Yield activity records for users riding generated schedules, for trying out the scorer"""
+    rng = random.Random(f'{seed}:scoring')
+    activity_id = 10_000_000_000
+    for user in range(users):
+        goal = rng.choice(list(db.goals))
+        commitment = rng.choice(COMMITMENTS)
+        preferred_days = sorted(rng.sample(ALL_DAYS, rng.randint(3, 5)), key=ALL_DAYS.index)
+        ftp = rng.randrange(150, 331, 5)
+        user_id = f'00000000-0000-4000-8000-{user:012d}'
+        schedule = generate_schedule(db, goal, commitment, preferred_days, rng)
+        for week in range(1, WEEKS + 1):
+            for day_index, day in enumerate(ALL_DAYS):
+                workout = schedule[week][day]
+                if not workout or rng.random() < 0.2:
+                    continue
+                watts = _ride(workout, ftp, rng)
+                activity_id += 1
+                with_power = rng.random() < 0.9
+                yield {
+                    'user_id': user_id,
+                    'history_key': f'{week}-{day_index}',
+                    'ftp': ftp,
+                    'activity': {
+                        'id': activity_id,
+                        'moving_time': len(watts),
+                        'has_power': with_power,
+                        'average_watts': round(sum(watts) / len(watts), 1) if watts and with_power else None
+                    },
+                    'workout': workout,
+                    'streams': {'watts': {'data': watts}} if with_power else {},
+                    'synced_at': _iso(((week - 1) * 7 + day_index) * 86400 + 64800)
+                }
@@ -0,0 +1,183 @@
+"""
+Per-goal JSON shards
+
+Compiles WORKOUTS_DB into one minified JSON file per goal plus a small
+manifest, so a page can fetch only the goal it shows. Every variant carries
+the phases of WorkoutParser.parseWorkout (same shape), its total minutes,
+IF and TSS, so the browser does not parse details strings again.
+
+Shard file names contain a hash of their bytes and never change content;
+the manifest is the only file that has to be fetched fresh.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from .load import phases_load
+from .workout_parser import parse_workout, resolved_workout
+from .workouts_db import REPO_ROOT, content_hash
+
+DEFAULT_OUT_DIR = REPO_ROOT / 'public_html' / 'app' / 'assets' / 'data' / 'workouts'
+
+MANIFEST = 'manifest.json'
+
+# Bumped when the shard layout changes, so clients can refuse shards they do not understand
+SHARD_VERSION = 1
+
+# Shard file names: <goal>.<first 16 hex digits of the SHA-256 of the bytes>.json
+_SHARD_RE = re.compile(r'(.+)\.[0-9a-f]{16}\.json')
+
+# Decimal places of phase durations (minutes) and intensities (fraction of FTP)
+_PRECISION = 4
+
+
+def _compact(value):
+    """value with floats rounded and integral floats written as integers"""
+    if isinstance(value, float):
+        value = round(value, _PRECISION)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _variant(workout, variant):
+    parsed = parse_workout(resolved_workout(workout, variant))
+    _, intensity_factor, tss = phases_load(parsed['phases'])
+    return {
+        'duration': variant.duration,
+        'displayName': variant.display_name,
+        'details': variant.details,
+        'phases': _compact(parsed['phases']),
+        'totalMinutes': _compact(parsed['totalDuration']),
+        'if': round(intensity_factor, 3),
+        'tss': round(tss, 1),
+        'hasIntervals': parsed['hasIntervals'],
+        'isPyramid': parsed['isPyramid']
+    }
+
+
+def goal_shard(goal):
+    """The shard of one parsed goal: WORKOUTS_DB[goal] plus the derived variant fields"""
+    shard = {'version': SHARD_VERSION, 'goal': goal.key, 'intensities': {}}
+    for intensity, workouts in goal.intensities.items():
+        shard['intensities'][intensity] = [
+            {
+                'name': w.name,
+                'description': w.description,
+                'intensity': w.power_zone,
+                'tips': w.tips,
+                'variants': {key: _variant(w, v) for key, v in w.variants.items()}
+            }
+            for w in workouts
+        ]
+    return shard
+
+
+class Shard:
+    """One encoded goal shard"""
+
+    def __init__(self, goal, shard):
+        self.goal = goal
+        self.data = _dumps(shard).encode('utf-8')
+        self.hash = hashlib.sha256(self.data).hexdigest()[:16]
+        self.file = f'{goal}.{self.hash}.json'
+        self.workouts = sum(len(ws) for ws in shard['intensities'].values())
+        self.variants = sum(len(w['variants']) for ws in shard['intensities'].values() for w in ws)
+        self.minutes = [v['duration'] for ws in shard['intensities'].values() for w in ws
+                        for v in w['variants'].values()]
+
+    def gzip_size(self):
+        return len(gzip.compress(self.data, 9, mtime=0))
+
+
+def build_shards(db):
+    """(shards, manifest) for a parsed database; the manifest lists each shard's file"""
+    shards = [Shard(key, goal_shard(goal)) for key, goal in db.goals.items()]
+    manifest = {
+        'version': SHARD_VERSION,
+        'source': content_hash(db.content)[:16],
+        'goals': {
+            s.goal: {
+                'file': s.file,
+                'bytes': len(s.data),
+                'workouts': s.workouts,
+                'variants': s.variants,
+                'minutes': [min(s.minutes, default=0), max(s.minutes, default=0)]
+            }
+            for s in shards
+        }
+    }
+    return shards, manifest
+
+
+def manifest_bytes(manifest):
+    return (_dumps(manifest) + '\n').encode('utf-8')
+
+
+def _write(path, data):
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _manifest_goals(out_dir):
+    """Goals of the manifest in out_dir, empty when there is none or it cannot be read"""
+    try:
+        goals = json.loads((out_dir / MANIFEST).read_bytes()).get('goals')
+    except (OSError, ValueError, AttributeError):
+        return set()
+    return set(goals) if isinstance(goals, dict) else set()
+
+
+def write_shards(shards, manifest, out_dir=DEFAULT_OUT_DIR, prune=True):
+    """Write the shards and then the manifest; returns the names of removed stale shards
+
+    Shards are written before the manifest that names them, so a client never
+    sees a manifest pointing at a missing file. prune removes shard files of
+    earlier builds that the new manifest no longer lists: only names of the
+    form <goal>.<16 hex digits>.json, for goals of the new or the previous
+    manifest, so other files in out_dir are never touched.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    goals = set(manifest['goals']) | (_manifest_goals(out_dir) if prune else set())
+    for shard in shards:
+        path = out_dir / shard.file
+        if not path.exists():
+            _write(path, shard.data)
+    _write(out_dir / MANIFEST, manifest_bytes(manifest))
+
+    removed = []
+    if prune:
+        current = {shard.file for shard in shards}
+        for path in sorted(out_dir.glob('*.json')):
+            match = _SHARD_RE.fullmatch(path.name)
+            if match and match.group(1) in goals and path.name not in current:
+                path.unlink()
+                removed.append(path.name)
+    return removed
+
+
+def stale_files(shards, manifest, out_dir=DEFAULT_OUT_DIR):
+    """Files of out_dir that differ from a fresh build (missing shards or an outdated manifest)"""
+    out_dir = Path(out_dir)
+    stale = [s.file for s in shards if not (out_dir / s.file).is_file()]
+    try:
+        current = (out_dir / MANIFEST).read_bytes()
+    except OSError:
+        current = None
+    if current != manifest_bytes(manifest):
+        stale.append(MANIFEST)
+    return stale
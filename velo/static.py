@@ -0,0 +1,323 @@
+"""
+Static file server
+
+A local server for public_html/app that behaves like the CDN instead of
+`python -m http.server`:
+
+    - gzip and brotli variants built once per file version (or taken from
+      prebuilt file.gz / file.br next to the file) and chosen by
+      Accept-Encoding, with Vary: Accept-Encoding
+    - strong ETags per representation and Last-Modified, answered with 304
+    - Cache-Control: immutable for the content-hashed names of the shards
+      and bundles (ftp.<hash>.json, index.<hash>.js), no-cache (always
+      revalidate) for everything else
+    - an access log, optionally with per-request timing and Server-Timing
+
+Brotli needs the optional `brotli` package; without it only gzip is offered.
+"""
+
+import email.utils
+import errno
+import gzip
+import hashlib
+import mimetypes
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from .workouts_db import REPO_ROOT
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_ROOT = REPO_ROOT / 'public_html' / 'app'
+
+LOG_MODES = ('common', 'timing', 'off')
+
+# Content-hashed names never change: bundles and chunks (velo.bundles.content_name,
+# 12 hex digits) and goal shards (velo.shards, 16 hex digits). Other names that
+# merely end in digits, like report-20250101.json, are revalidated
+_HASHED_RE = re.compile(r'\.(?:[0-9a-f]{12}\.js|[0-9a-f]{16}\.json)$')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+_COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'application/xml', 'image/svg+xml')
+
+# Files smaller than this are sent as they are
+MIN_COMPRESS_BYTES = 256
+
+# Preference when the client accepts several encodings equally
+_ENCODINGS = ('br', 'gzip')
+_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def is_hashed(name):
+    return bool(_HASHED_RE.search(name))
+
+
+def _content_type(path):
+    kind = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    if kind == 'text/javascript':
+        kind = 'application/javascript'
+    if kind.startswith('text/') or kind in ('application/javascript', 'application/json'):
+        kind += '; charset=utf-8'
+    return kind
+
+
+def _compress(encoding, data):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, 9, mtime=0)
+
+
+@dataclass
+class Asset:
+    """One file version with its encoded representations"""
+    version: tuple
+    content_type: str
+    cache_control: str
+    last_modified: str
+    # Encoding ('' for identity) -> (body, ETag)
+    bodies: dict = field(default_factory=dict)
+
+
+def build_asset(path, stat):
+    """Read a file and build its representations; encodings that save under 5% are dropped"""
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    kind = _content_type(path)
+    asset = Asset(
+        version=(stat.st_mtime_ns, stat.st_size),
+        content_type=kind,
+        cache_control=IMMUTABLE if is_hashed(path.name) else REVALIDATE,
+        last_modified=email.utils.formatdate(stat.st_mtime, usegmt=True),
+        bodies={'': (data, f'"{digest}"')}
+    )
+    if len(data) < MIN_COMPRESS_BYTES or not kind.startswith(_COMPRESSIBLE):
+        return asset
+
+    for encoding in _ENCODINGS:
+        prebuilt = path.with_name(path.name + _SUFFIXES[encoding])
+        try:
+            fresh = prebuilt.stat().st_mtime_ns >= stat.st_mtime_ns
+        except OSError:
+            fresh = False
+        if fresh:
+            body = prebuilt.read_bytes()
+        elif encoding == 'br' and brotli is None:
+            continue
+        else:
+            body = _compress(encoding, data)
+        if len(body) < len(data) * 0.95:
+            asset.bodies[encoding] = (body, f'"{digest}-{_SUFFIXES[encoding][1:]}"')
+    return asset
+
+
+def accepted_encodings(header):
+    """Encodings of an Accept-Encoding header with q > 0, best first"""
+    accepted = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[token] = q
+    wildcard = accepted.get('*', 0.0)
+    ranked = [(accepted.get(e, wildcard), -i, e) for i, e in enumerate(_ENCODINGS)]
+    return [e for q, _, e in sorted(ranked, reverse=True) if q > 0]
+
+
+def _etag_matches(header, etag):
+    """If-None-Match with the weak comparison RFC 9110 prescribes for it"""
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+class AssetCache:
+    """Assets by path, rebuilt when a file's mtime or size changes"""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, url_path):
+        """File of a URL path under the root, or None (directories map to their index.html)
+
+        A directory named without its trailing slash comes back as the
+        directory itself, for the handler to redirect to the slashed URL as
+        http.server does, so relative URLs on its page resolve inside it.
+        Raises ValueError for paths no file can have: a NUL byte, or a name
+        the file system rejects as too long.
+        """
+        relative = unquote(url_path).lstrip('/')
+        if '\0' in relative:
+            raise ValueError('NUL byte in path')
+        try:
+            path = (self.root / relative).resolve()
+            if path != self.root and self.root not in path.parents:
+                return None
+            if path.is_dir():
+                if not url_path.endswith('/'):
+                    return path
+                path = path / 'index.html'
+            return path if path.is_file() else None
+        except OSError as e:
+            if e.errno == errno.ENAMETOOLONG:
+                raise ValueError('path too long') from e
+            return None
+
+    def get(self, path):
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        asset = self._assets.get(path)
+        if asset is None or asset.version != version:
+            asset = build_asset(path, stat)
+            with self._lock:
+                self._assets[path] = asset
+        return asset
+
+    def warm(self):
+        """Build every file up front; returns (files, identity bytes, smallest encoded bytes)"""
+        files = plain = encoded = 0
+        for path in sorted(self.root.rglob('*')):
+            if path.is_file() and path.suffix not in ('.gz', '.br'):
+                asset = self.get(path)
+                files += 1
+                plain += len(asset.bodies[''][0])
+                encoded += min(len(body) for body, _ in asset.bodies.values())
+        return files, plain, encoded
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET and HEAD of static files with content negotiation and conditional requests"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server_version = 'velo-static'
+    cache = None
+    log_mode = 'common'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, headers, body=b'', head=False):
+        self.send_response_only(status)
+        self.send_header('Date', self.date_time_string())
+        for name, value in headers:
+            self.send_header(name, value)
+        if self.log_mode == 'timing':
+            self.send_header('Server-Timing', f'app;dur={(time.perf_counter() - self._started) * 1000:.3f}')
+        self.end_headers()
+        if body and not head:
+            self.wfile.write(body)
+        self._logged = (status, len(body) if not head else 0)
+
+    def _error(self, status, head):
+        body = f'{status} {self.responses[status][0]}\n'.encode('utf-8')
+        self._send(status, [('Content-Type', 'text/plain; charset=utf-8'), ('Content-Length', str(len(body)))],
+                   body, head)
+
+    def _serve(self, head=False):
+        self._started = time.perf_counter()
+        self._encoding = ''
+        parts = urlsplit(self.path)
+        try:
+            path = self.cache.resolve(parts.path)
+        except ValueError:
+            self._error(400, head)
+            return self._log()
+        if path is None:
+            self._error(404, head)
+            return self._log()
+        if path.is_dir():
+            location = urlunsplit(parts._replace(scheme='', netloc='', path=parts.path + '/'))
+            self._send(301, [('Location', location), ('Content-Length', '0')])
+            return self._log()
+
+        asset = self.cache.get(path)
+        vary = len(asset.bodies) > 1
+        encoding = next((e for e in accepted_encodings(self.headers.get('Accept-Encoding'))
+                         if e in asset.bodies), '') if vary else ''
+        body, etag = asset.bodies[encoding]
+        self._encoding = encoding
+        headers = [('ETag', etag), ('Last-Modified', asset.last_modified), ('Cache-Control', asset.cache_control)]
+        if vary:
+            headers.append(('Vary', 'Accept-Encoding'))
+
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        elif if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+                not_modified = int(asset.version[0] // 1_000_000_000) <= since
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+        if not_modified:
+            self._send(304, headers)
+            return self._log()
+
+        headers.append(('Content-Type', asset.content_type))
+        headers.append(('Content-Length', str(len(body))))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        self._send(200, headers, body, head)
+        self._log()
+
+    def _log(self):
+        if self.log_mode == 'off':
+            return
+        status, size = self._logged
+        line = f'{self.address_string()} "{self.requestline}" {status} {size}'
+        if self.log_mode == 'timing':
+            line += f" {self._encoding or '-'} {(time.perf_counter() - self._started) * 1000:.2f}ms"
+        print(line, flush=True)
+
+    def do_GET(self):
+        self._serve()
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(root=DEFAULT_ROOT, host='127.0.0.1', port=8000, log_mode='common'):
+    """A ThreadingHTTPServer for the files under root"""
+    handler = type('Handler', (_Handler,), {'cache': AssetCache(root), 'log_mode': log_mode})
+    return _Server((host, port), handler)
+
+
+def start_server(root=DEFAULT_ROOT, host='127.0.0.1', port=0, log_mode='off'):
+    """Serve root from a background thread; returns (server, base url)"""
+    server = make_server(root, host, port, log_mode)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def page_assets(html):
+    """Local script, stylesheet and image URLs referenced by an HTML page, in page order"""
+    urls = re.findall(r'''<(?:script|link|img)\b[^>]*?\b(?:src|href)=["']([^"'#?]+)''', html, re.I)
+    return [url for url in dict.fromkeys(urls) if '://' not in url and not url.startswith('//')]
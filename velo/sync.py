@@ -0,0 +1,535 @@
+"""
+State sync
+
+A local stand-in for the Supabase PostgREST endpoints modules/storage.js
+uses (upsert and select on user_training_data), simulated users that replay
+the saveState() sequence of the app, and a replay client with four sync
+modes:
+
+    full              every saveState() upserts the whole app_state (storage.js today)
+    debounced         saves within the debounce window collapse into one upsert
+    delta             only the top-level app_state keys that changed are sent
+    delta+debounced   both
+
+Delta mode calls rpc/merge_app_state, the function a delta sync needs on the
+Supabase side (MERGE_FUNCTION_SQL); the stand-in implements it.
+"""
+
+import copy
+import http.client
+import json
+import math
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .adapter import WEEK_TEMPLATES, adapt_schedule
+from .schedule import ALL_DAYS, COMMITMENTS, WEEKS, generate_schedule
+from .workout_parser import resolved_workout
+
+TABLE = 'user_training_data'
+MODES = ('full', 'debounced', 'delta', 'delta+debounced')
+
+MERGE_FUNCTION_SQL = '''
+CREATE OR REPLACE FUNCTION merge_app_state(p_user_id UUID, p_patch JSONB, p_remove TEXT[] DEFAULT '{}')
+RETURNS VOID AS $$
+    INSERT INTO user_training_data (user_id, app_state, updated_at)
+    VALUES (p_user_id, p_patch, NOW())
+    ON CONFLICT (user_id) DO UPDATE
+    SET app_state = (user_training_data.app_state || p_patch) - p_remove, updated_at = NOW();
+$$ LANGUAGE sql SECURITY INVOKER;
+'''
+
+_SINGLE = 'application/vnd.pgrst.object+json'
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """PostgREST subset: POST upsert, GET select, DELETE and rpc/merge_app_state on one table"""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40 ms per response
+    disable_nagle_algorithm = True
+    rows = {}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        data = b'' if body is None else _dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, code, message):
+        self._reply(status, {'code': code, 'message': message, 'details': None, 'hint': None})
+
+    def _route(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return url.path.rstrip('/'), query
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            return None
+
+    def _user_filter(self, query):
+        value = query.get('user_id', '')
+        return value[3:] if value.startswith('eq.') else None
+
+    def do_GET(self):
+        path, query = self._route()
+        if path != f'/rest/v1/{TABLE}':
+            return self._error(404, 'PGRST205', f'Could not find the table {path}')
+        user_id = self._user_filter(query)
+        with self.lock:
+            rows = [row for key, row in self.rows.items() if user_id is None or key == user_id]
+            body = copy.deepcopy(rows)
+        if _SINGLE in (self.headers.get('Accept') or ''):
+            if len(body) != 1:
+                return self._error(406, 'PGRST116', 'JSON object requested, multiple (or no) rows returned')
+            return self._reply(200, body[0])
+        return self._reply(200, body)
+
+    def do_POST(self):
+        path, query = self._route()
+        body = self._body()
+        now = datetime.now(timezone.utc).isoformat()
+
+        if path == '/rest/v1/rpc/merge_app_state':
+            if not isinstance(body, dict) or not body.get('p_user_id') or not isinstance(body.get('p_patch'), dict):
+                return self._error(400, 'PGRST102', 'p_user_id and p_patch are required')
+            with self.lock:
+                row = self.rows.setdefault(body['p_user_id'], {'user_id': body['p_user_id'], 'app_state': {}})
+                row['app_state'].update(body['p_patch'])
+                for key in body.get('p_remove') or ():
+                    row['app_state'].pop(key, None)
+                row['updated_at'] = now
+            return self._reply(204)
+
+        if path != f'/rest/v1/{TABLE}':
+            return self._error(404, 'PGRST205', f'Could not find the table {path}')
+        records = body if isinstance(body, list) else [body]
+        if not all(isinstance(r, dict) and r.get('user_id') for r in records):
+            return self._error(400, 'PGRST102', 'Every row needs a user_id')
+        merge = 'resolution=merge-duplicates' in (self.headers.get('Prefer') or '')
+        with self.lock:
+            for record in records:
+                if record['user_id'] in self.rows and not merge:
+                    return self._error(409, '23505', 'duplicate key value violates unique constraint')
+                self.rows[record['user_id']] = {**self.rows.get(record['user_id'], {}), **record}
+                self.rows[record['user_id']].setdefault('updated_at', now)
+        return self._reply(201)
+
+    def do_DELETE(self):
+        path, query = self._route()
+        if path != f'/rest/v1/{TABLE}':
+            return self._error(404, 'PGRST205', f'Could not find the table {path}')
+        user_id = self._user_filter(query)
+        with self.lock:
+            for key in [key for key in self.rows if user_id is None or key == user_id]:
+                del self.rows[key]
+        return self._reply(204)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for many clients connecting at once; the default of 5 drops SYNs
+    request_queue_size = 128
+
+
+def make_server(host='127.0.0.1', port=0):
+    """A ThreadingHTTPServer with the stand-in endpoints and an empty table"""
+    handler = type('Handler', (_Handler,), {'rows': {}, 'lock': threading.Lock()})
+    return _Server((host, port), handler)
+
+
+def _serve(host, port, ready):
+    server = make_server(host, port)
+    ready.send(server.server_address[1])
+    ready.close()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def start_stand_in(host='127.0.0.1', port=0):
+    """Run the stand-in in a child process; returns (process, base url)"""
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_serve, args=(host, port, sender), daemon=True)
+    process.start()
+    port = receiver.recv()
+    return process, f'http://{host}:{port}'
+
+
+def default_state():
+    """getDefaultState() with the APP_CONFIG defaults"""
+    return {
+        'goal': None,
+        'timeCommitment': None,
+        'userName': 'Rebel',
+        'ftp': 200,
+        'weight': 70,
+        'currentWeek': 1,
+        'schedule': {},
+        'history': {},
+        'intakeCompleted': False,
+        'preferredDays': ['Tue', 'Thu', 'Sat'],
+        'weekAdjustment': {},
+        'originalSchedule': {},
+        'rpeHistory': [],
+        'weeklyAdaptations': {},
+        'wkg': None
+    }
+
+
+def _iso(seconds, epoch=datetime(2025, 1, 6, tzinfo=timezone.utc)):
+    return (epoch + timedelta(seconds=seconds)).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def simulated_user(db, rng):
+    """Yield (seconds since signup, event, state) for one user over the 6-week program
+
+    Events are 'open' (app start, which syncs from Supabase), 'save' (a
+    saveState() call) and 'close'. state is the user's app state, updated in
+    place between events.
+    """
+    state = default_state()
+    t = 0.0
+    yield t, 'open', state
+
+    # Intake: profile and preferences, then the generated schedule
+    goal = rng.choice(list(db.goals))
+    commitment = rng.choice(COMMITMENTS)
+    preferred_days = sorted(rng.sample(ALL_DAYS, rng.randint(3, 5)), key=ALL_DAYS.index)
+    ftp = rng.randrange(150, 331, 5)
+    weight = rng.randrange(55, 96)
+    state.update(goal=goal, timeCommitment=commitment, preferredDays=preferred_days,
+                 userName=f'Rider {rng.randrange(10000)}', ftp=ftp, weight=weight, wkg=round(ftp / weight, 2))
+    t += rng.uniform(20, 120)
+    yield t, 'save', state
+
+    schedule = generate_schedule(db, goal, commitment, preferred_days, rng)
+    state['schedule'] = {str(week): days for week, days in schedule.items()}
+    state.update(intakeCompleted=True, currentWeek=1, programStartDate=_iso(t), programStartDay='Mon')
+    t += rng.uniform(2, 10)
+    yield t, 'save', state
+    yield t, 'close', state
+
+    for week in range(1, WEEKS + 1):
+        week_key = str(week)
+        week_start = (week - 1) * 7 * 86400
+        first_session = True
+
+        if rng.random() < 0.15:
+            t = week_start + rng.uniform(6, 9) * 3600
+            yield t, 'open', state
+            template = rng.choice(list(WEEK_TEMPLATES.values()))
+            state['originalSchedule'].setdefault(week_key, copy.deepcopy(state['schedule'][week_key]))
+            result = adapt_schedule(state['originalSchedule'], week_key, template,
+                                    {'preferredDays': state['preferredDays']})
+            state['weeklyAdaptations'][week_key] = {
+                'timeSlots': template,
+                'adaptedSchedule': result['schedule'],
+                'summary': result['summary'],
+                'appliedAt': _iso(t)
+            }
+            state['schedule'][week_key] = result['schedule']
+            t += rng.uniform(20, 90)
+            yield t, 'save', state
+            yield t, 'close', state
+
+        for day_index, day in enumerate(ALL_DAYS):
+            workout = state['schedule'][week_key].get(day)
+            if not workout or rng.random() > 0.85:
+                continue
+            t = week_start + day_index * 86400 + rng.uniform(6, 21) * 3600
+            yield t, 'open', state
+            if first_session and week > 1:
+                state['currentWeek'] = week
+                t += rng.uniform(0.5, 2)
+                yield t, 'save', state
+            first_session = False
+
+            # Looking around: next week and back
+            if rng.random() < 0.3:
+                for direction in (1, -1):
+                    state['currentWeek'] = min(WEEKS, max(1, state['currentWeek'] + direction))
+                    t += rng.uniform(1, 4)
+                    yield t, 'save', state
+
+            if rng.random() < 0.1:
+                alternatives = db.goals[state['goal']].intensities.get(workout['intensity'], [])
+                if alternatives:
+                    base = rng.choice(alternatives)
+                    variant = base.variants.get(workout.get('variantType')) or next(iter(base.variants.values()), None)
+                    if variant is not None:
+                        swapped = resolved_workout(base, variant)
+                        swapped['intensity'] = workout['intensity']
+                        state['schedule'][week_key][day] = workout = swapped
+                        t += rng.uniform(2, 20)
+                        yield t, 'save', state
+
+            key = f'{week}-{day_index}'
+            t += (workout.get('duration') or 60) * 60 + rng.uniform(60, 600)
+            state['history'][key] = True
+            yield t, 'save', state
+
+            if rng.random() < 0.7:
+                t += rng.uniform(5, 40)
+                state['rpeHistory'].append({'workoutKey': key, 'rpe': rng.randint(3, 9), 'notes': '', 'date': _iso(t)})
+                yield t, 'save', state
+
+            if rng.random() < 0.3:
+                t += rng.uniform(60, 1800)
+                state.setdefault('workoutScores', {})[key] = {
+                    'total': round(rng.uniform(5, 10), 1),
+                    'duration': round(rng.uniform(5, 10), 1),
+                    'powerZones': round(rng.uniform(4, 10), 1),
+                    'completion': round(rng.uniform(6, 10), 1),
+                    'activityId': rng.randrange(10 ** 10, 10 ** 11),
+                    'syncedAt': _iso(t)
+                }
+                yield t, 'save', state
+            yield t, 'close', state
+
+        if rng.random() < 0.05:
+            t = week_start + 6 * 86400 + rng.uniform(18, 22) * 3600
+            yield t, 'open', state
+            state['ftp'] += rng.choice((-5, 5, 10))
+            state['wkg'] = round(state['ftp'] / state['weight'], 2)
+            t += rng.uniform(10, 60)
+            yield t, 'save', state
+            yield t, 'close', state
+
+
+@dataclass
+class SyncMetrics:
+    mode: str
+    users: int = 0
+    saves: int = 0
+    # Upserts / rpc calls, and saves delta mode did not send because nothing changed
+    writes: int = 0
+    unchanged: int = 0
+    reads: int = 0
+    errors: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    write_latency: list = field(default_factory=list)
+    read_latency: list = field(default_factory=list)
+    # Simulated days of use, to turn counts into rates per active user
+    days: float = 0.0
+    # Users whose stored app_state differs from their local state at the end
+    inconsistent: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other):
+        for name in ('users', 'saves', 'writes', 'unchanged', 'reads', 'errors', 'request_bytes',
+                     'response_bytes', 'days', 'inconsistent'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.write_latency.extend(other.write_latency)
+        self.read_latency.extend(other.read_latency)
+        return self
+
+    def as_dict(self):
+        return {
+            'mode': self.mode,
+            'users': self.users,
+            'saves': self.saves,
+            'writes': self.writes,
+            'unchanged': self.unchanged,
+            'reads': self.reads,
+            'errors': self.errors,
+            'requestBytes': self.request_bytes,
+            'responseBytes': self.response_bytes,
+            'bytesPerSave': round(self.request_bytes / self.saves, 1) if self.saves else 0,
+            'writesPerUserDay': round(self.writes / self.days, 3) if self.days else 0,
+            'writeLatencyMs': latency_summary(self.write_latency),
+            'readLatencyMs': latency_summary(self.read_latency),
+            'requestsPerSecond': round((self.writes + self.reads) / self.seconds, 1) if self.seconds else 0,
+            'inconsistentUsers': self.inconsistent,
+            'seconds': round(self.seconds, 3)
+        }
+
+
+def latency_summary(latencies):
+    """p50 / p99 / max of latencies in seconds, as milliseconds"""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def rank(q):
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)] * 1000
+
+    return {'p50': round(rank(0.5), 3), 'p99': round(rank(0.99), 3), 'max': round(ordered[-1] * 1000, 3),
+            'mean': round(statistics.fmean(ordered) * 1000, 3)}
+
+
+class SyncClient:
+    """Replays one user's events against a PostgREST endpoint the way a sync mode would"""
+
+    def __init__(self, connection, headers, user_id, mode, debounce, metrics):
+        self.connection = connection
+        self.headers = headers
+        self.user_id = user_id
+        self.delta = mode.startswith('delta')
+        self.debounce = debounce if mode.endswith('debounced') else 0
+        self.metrics = metrics
+        self.synced = {}
+        self.snapshot = None
+        self.due = None
+
+    def _request(self, method, path, body=None, headers=None):
+        data = None if body is None else body.encode('utf-8')
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=data, headers={**self.headers, **(headers or {})})
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.metrics.errors += 1
+            return None, b''
+        elapsed = time.perf_counter() - started
+        self.metrics.request_bytes += len(data or b'')
+        self.metrics.response_bytes += len(payload)
+        if response.status >= 400 and not (response.status == 406 and method == 'GET'):
+            self.metrics.errors += 1
+        return elapsed, payload
+
+    def read(self, record=True):
+        """syncFromSupabase(): the stored app_state, or None"""
+        elapsed, payload = self._request('GET', f'/rest/v1/{TABLE}?select=*&user_id=eq.{self.user_id}',
+                                         headers={'Accept': _SINGLE})
+        if record and elapsed is not None:
+            self.metrics.reads += 1
+            self.metrics.read_latency.append(elapsed)
+        try:
+            return json.loads(payload).get('app_state')
+        except (ValueError, AttributeError):
+            return None
+
+    def save(self, t, state):
+        """A saveState() call at simulated time t"""
+        self.metrics.saves += 1
+        if self.due is not None and t >= self.due:
+            self.flush()
+        # Serialized per top-level key, like the JSON.stringify for localStorage
+        self.snapshot = ({key: _dumps(value) for key, value in state.items()}, t)
+        if self.debounce:
+            self.due = t + self.debounce
+        else:
+            self.flush()
+
+    def flush(self):
+        """Send the last saved state, if it was not sent yet"""
+        self.due = None
+        if self.snapshot is None:
+            return
+        parts, t = self.snapshot
+        self.snapshot = None
+        now = _dumps(_iso(t))
+
+        if self.delta:
+            changed = {key: value for key, value in parts.items() if self.synced.get(key) != value}
+            removed = [key for key in self.synced if key not in parts]
+            if not changed and not removed:
+                self.metrics.unchanged += 1
+                return
+            patch = ','.join(f'{_dumps(key)}:{value}' for key, value in changed.items())
+            body = (f'{{"p_user_id":{_dumps(self.user_id)},"p_patch":{{{patch},"lastSynced":{now}}},'
+                    f'"p_remove":{_dumps(removed)}}}')
+            elapsed, _ = self._request('POST', '/rest/v1/rpc/merge_app_state', body)
+        else:
+            app_state = ','.join(f'{_dumps(key)}:{value}' for key, value in parts.items())
+            body = (f'{{"user_id":{_dumps(self.user_id)},"app_state":{{{app_state},"lastSynced":{now}}},'
+                    f'"updated_at":{now}}}')
+            elapsed, _ = self._request('POST', f'/rest/v1/{TABLE}?on_conflict=user_id', body,
+                                       {'Prefer': 'resolution=merge-duplicates,return=minimal'})
+        if elapsed is not None:
+            self.metrics.writes += 1
+            self.metrics.write_latency.append(elapsed)
+            self.synced = parts
+
+    def replay(self, events):
+        """Replay simulated_user() events; returns the final local state"""
+        state = None
+        t = 0.0
+        for t, event, state in events:
+            if self.due is not None and t >= self.due:
+                self.flush()
+            if event == 'open':
+                self.read()
+            elif event == 'save':
+                self.save(t, state)
+            else:
+                # Page hide: a debounced client sends what is pending
+                self.flush()
+        self.flush()
+        self.metrics.days += t / 86400
+        return state
+
+
+def _connection(base_url):
+    url = urlsplit(base_url)
+    cls = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    return cls(url.hostname, url.port, timeout=30)
+
+
+def run_mode(db, base_url, mode, users, seed=0, debounce=3.0, concurrency=8, api_key=''):
+    """Replay users simulated users in one sync mode with concurrency threads; returns SyncMetrics"""
+    headers = {'Content-Type': 'application/json', 'apikey': api_key, 'Authorization': f'Bearer {api_key}'}
+    next_user = iter(range(users))
+    lock = threading.Lock()
+    results = []
+
+    def worker():
+        metrics = SyncMetrics(mode)
+        connection = _connection(base_url)
+        while True:
+            with lock:
+                index = next(next_user, None)
+            if index is None:
+                break
+            rng = random.Random(f'{seed}:sync:{index}')
+            user_id = str(uuid.UUID(int=random.Random(f'{seed}:{mode}:{index}').getrandbits(128), version=4))
+            client = SyncClient(connection, headers, user_id, mode, debounce, metrics)
+            final = client.replay(simulated_user(db, rng))
+            metrics.users += 1
+
+            # The stored state must end up equal to the local one
+            stored = client.read(record=False)
+            if stored is None or {k: v for k, v in stored.items() if k != 'lastSynced'} != json.loads(_dumps(final)):
+                metrics.inconsistent += 1
+        connection.close()
+        with lock:
+            results.append(metrics)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = SyncMetrics(mode)
+    for metrics in results:
+        total.merge(metrics)
+    total.seconds = time.perf_counter() - started
+    return total
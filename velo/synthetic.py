@@ -0,0 +1,132 @@
+"""
+Synthetic WORKOUTS_DB generator
+
+Writes workouts-db.js sources of arbitrary size in the same layout as the
+shipped database, for benchmarks and scaling checks. Size (goals, workouts
+per intensity), the complexity of the details strings and the share of
+repeated workout names are configurable; scaled_db() sizes a database
+relative to the shipped one.
+"""
+
+import random
+
+from .workouts_db import GOALS, INTENSITIES, VARIANTS
+
+_VARIANT_DURATIONS = {'short': 45, 'medium': 75, 'long': 105}
+_VARIANT_SUFFIX = {'short': ' (Quick)', 'medium': '', 'long': ' (Extended)'}
+
+# 'simple': one interval pattern; 'mixed': the patterns of the shipped database,
+# including main sets the phase parser does not understand; 'complex': mixed, with
+# longer multi-sentence details, escaped quotes and non-ASCII text
+COMPLEXITIES = ('simple', 'mixed', 'complex')
+
+# Workouts in the shipped database, the 1× of scaled_db()
+SHIPPED_WORKOUTS = 29
+
+
+def goal_names(goals):
+    """Goal keys for a count (the shipped goals first, then goal4, goal5, ...) or a sequence of keys"""
+    if isinstance(goals, int):
+        return tuple(GOALS[:goals]) + tuple(f'goal{n + 1}' for n in range(len(GOALS), goals))
+    return tuple(goals)
+
+
+def _variant_details(duration, index):
+    warmup = 10
+    cooldown = 5
+    main = duration - warmup - cooldown
+    reps = 3 + index % 4
+    return (f'Warm-up: {warmup} min easy. '
+            f'Main: {main} min with {reps}x5 min @ {95 + index % 20}% FTP. '
+            f'Cool-down: {cooldown} min spin.')
+
+
+def _main_set(main, index, intensity_index):
+    """Main: text of about main minutes in one of the patterns of the shipped database"""
+    pattern = index % 6
+    percent = 60 + 15 * intensity_index + index % 10
+    if pattern == 0:
+        return f'{main} min steady Zone {1 + intensity_index}'
+    if pattern == 1:
+        reps = max(1, main // 8)
+        return f'{reps}x{main // reps - 3} min @ {percent}-{percent + 5}% FTP, 3 min easy'
+    if pattern == 2:
+        return f'1-2-3-2-1 min @ {percent + 20}% FTP pyramid, then {max(1, main - 9)} min steady'
+    if pattern == 3:
+        return f'8x30 seconds @ {percent + 60}% FTP, 30 seconds recovery, then {max(1, main - 8)} min steady'
+    if pattern == 4:
+        return f'Alternating 5 min @ {percent + 10}% FTP, 10 min @ {percent}% FTP. Repeat {max(1, main // 15)}x'
+    return f'{main} min race simulation (varied efforts: climbs, descents, tempo blocks)'
+
+
+def _details(duration, index, intensity_index, complexity):
+    if complexity == 'simple':
+        return _variant_details(duration, index)
+    warmup = 10 + 5 * (index % 2)
+    cooldown = 5 + 5 * (index % 2)
+    main = _main_set(duration - warmup - cooldown, index, intensity_index)
+    if complexity == 'mixed':
+        return f'Warm-up: {warmup} min easy spin. Main: {main}. Cool-down: {cooldown} min spin.'
+    return (f'Warm-up: {warmup} min with 3x1 min builds to 100% FTP. Main: {main}. '
+            'Focus on \\"smooth\\" pedalling – stay seated, cadence 85–95 rpm, fuel every 20 min '
+            f'(≈{30 + index % 40} g carbs/hour). Cool-down: {cooldown} min spin.')
+
+
+def generate_db(workouts_per_intensity, goals=GOALS, unique_names=True, complexity='simple',
+                duplicates=0.0, seed=0):
+    """JS source of a WORKOUTS_DB with the given number of workouts per intensity
+
+    goals is a count or a sequence of goal keys. With unique_names=False every
+    intensity reuses the same few names, which is what copy-pasted catalogues
+    tend to look like; duplicates instead repeats an earlier name of the same
+    intensity for that share (0-1) of the workouts.
+    """
+    if complexity not in COMPLEXITIES:
+        raise ValueError(f'unknown complexity {complexity!r}, expected one of {", ".join(COMPLEXITIES)}')
+    rng = random.Random(seed)
+    goals = goal_names(goals)
+    out = ['// Synthetic workout database\nconst WORKOUTS_DB = {\n']
+    for g, goal in enumerate(goals):
+        out.append(f'    {goal}: {{\n')
+        for i, intensity in enumerate(INTENSITIES):
+            out.append(f'        {intensity}: [\n')
+            for n in range(workouts_per_intensity):
+                number = n + 1 if unique_names else n % 3 + 1
+                if n and rng.random() < duplicates:
+                    number = rng.randrange(n) + 1
+                name = f'{goal.title()} {intensity.title()} {number}'
+                if complexity == 'complex':
+                    description = (f'Synthetic {intensity} workout. Builds \\"{goal}\\" fitness with '
+                                   'structured efforts, long enough to look like the real thing.')
+                else:
+                    description = f'Synthetic {intensity} workout.'
+                out.append('            {\n'
+                           f'                name: "{name}",\n'
+                           f'                description: "{description}",\n'
+                           f'                intensity: "{60 + 15 * i}% FTP",\n'
+                           '                tips: "Generated for benchmarks.",\n'
+                           '                variants: {\n')
+                for v, variant in enumerate(VARIANTS):
+                    duration = _VARIANT_DURATIONS[variant] + n % 5 * 5
+                    out.append(f'                    {variant}: {{\n'
+                               f'                        duration: {duration},\n'
+                               f'                        displayName: "{name}{_VARIANT_SUFFIX[variant]}",\n'
+                               f'                        details: "{_details(duration, n, i, complexity)}"\n'
+                               f'                    }}{"," if v < len(VARIANTS) - 1 else ""}\n')
+                out.append('                }\n'
+                           f'            }}{"," if n < workouts_per_intensity - 1 else ""}\n')
+            out.append(f'        ]{"," if i < len(INTENSITIES) - 1 else ""}\n')
+        out.append(f'    }}{"," if g < len(goals) - 1 else ""}\n')
+    out.append('};\n')
+    return ''.join(out)
+
+
+def scaled_workouts(scale, goals=GOALS):
+    """Workouts per intensity for scale × the size of the shipped database"""
+    return max(1, round(SHIPPED_WORKOUTS * scale / (len(goal_names(goals)) * len(INTENSITIES))))
+
+
+def scaled_db(scale, goals=GOALS, complexity='mixed', duplicates=0.0, seed=0):
+    """JS source of a WORKOUTS_DB about scale × the size of the shipped database"""
+    return generate_db(scaled_workouts(scale, goals), goals, complexity=complexity,
+                       duplicates=duplicates, seed=seed)
@@ -0,0 +1,123 @@
+"""
+Batch variant validation
+
+Runs the variant checks of run-comprehensive-tests.py (details, Main:,
+duration, displayName) plus a Warm-up/Main/Cool-down minute-sum check over
+every variant of the database at once. An explicit `Main: N min` must add up
+exactly; any other main set is taken from velo.workout_parser and must add
+up within its tolerance. Checks are applied column by column with patterns
+compiled once, and the outcome is kept per goal so every tester of a goal
+reuses it.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from .workout_parser import TOLERANCE_MINUTES, parse_workout, resolved_workout
+from .workouts_db import VARIANTS
+
+_WARMUP_RE = re.compile(r'Warm-up:\s*(\d+)\s*min', re.I)
+_COOLDOWN_RE = re.compile(r'Cool-down:\s*(\d+)\s*min', re.I)
+_MAIN_TOTAL_RE = re.compile(r'Main:\s*(\d+)\s*min\b', re.I)
+
+
+@dataclass
+class GoalValidation:
+    workouts: int = 0
+    tests: int = 0
+    passed: int = 0
+    failed: int = 0
+    warnings: int = 0
+    # (workout name, variant key, message), failures and warnings in file order
+    failures: list = field(default_factory=list)
+    warning_list: list = field(default_factory=list)
+
+
+def _minutes(pattern, text):
+    m = pattern.search(text)
+    return int(m.group(1)) if m else None
+
+
+def _parsed_main_minutes(workout, variant):
+    """Main-set minutes of the phases velo.workout_parser finds, None when it finds none"""
+    main = parse_workout(resolved_workout(workout, variant))['phases']['main']
+    return sum(phase['duration'] for phase in main) if main else None
+
+
+def check_workouts(workouts):
+    """Check every variant slot of the given workouts
+
+    Returns one (workout, variant key, errors, warnings) row per slot, in order.
+    """
+    # Flatten once: one row per expected variant slot
+    rows = [(w, key, w.variants.get(key)) for w in workouts for key in VARIANTS]
+    present = [v is not None for _, _, v in rows]
+    details = [v.details if v else '' for _, _, v in rows]
+    durations = [v.duration if v else 0 for _, _, v in rows]
+
+    # Column-wise checks
+    has_details = [bool(d) for d in details]
+    has_main = ['Main:' in d for d in details]
+    has_duration = [d > 0 for d in durations]
+    has_display_name = [bool(v.display_name) if v else False for _, _, v in rows]
+    warmup = [_minutes(_WARMUP_RE, d) for d in details]
+    cooldown = [_minutes(_COOLDOWN_RE, d) for d in details]
+    main_total = [_minutes(_MAIN_TOTAL_RE, d) for d in details]
+    main_derived = [_parsed_main_minutes(w, v) if t is None and m else None
+                    for (w, _, v), t, m in zip(rows, main_total, has_main)]
+
+    checked = []
+    for i, (workout, key, variant) in enumerate(rows):
+        if not present[i]:
+            checked.append((workout, key, ['missing'], []))
+            continue
+
+        errors = []
+        warnings = []
+        if not has_details[i]:
+            errors.append('no details')
+        if not has_main[i]:
+            errors.append('no Main section')
+        if not has_duration[i]:
+            errors.append('no duration')
+        if not has_display_name[i]:
+            errors.append('no display name')
+
+        if has_main[i] and warmup[i] is not None and cooldown[i] is not None:
+            if main_total[i] is not None:
+                total = warmup[i] + main_total[i] + cooldown[i]
+                if total != durations[i]:
+                    errors.append(f'phases sum to {total} min, duration is {durations[i]} min')
+            elif main_derived[i] is not None:
+                total = warmup[i] + main_derived[i] + cooldown[i]
+                if abs(total - durations[i]) > TOLERANCE_MINUTES:
+                    warnings.append(f'phases sum to {total:g} min (derived), duration is {durations[i]} min')
+            else:
+                warnings.append('main set minutes could not be determined')
+        elif has_details[i]:
+            errors.append('no Warm-up/Cool-down minutes')
+
+        checked.append((workout, key, errors, warnings))
+
+    return checked
+
+
+def validate_db(db):
+    """Validate every variant of every goal, returns {goal: GoalValidation}"""
+    results = {}
+    for goal in db.goals.values():
+        results[goal.key] = GoalValidation(workouts=len(goal.workouts()))
+
+    for workout, key, errors, warnings in check_workouts(db.workouts()):
+        result = results[workout.goal]
+        result.tests += 1
+        for warning in warnings:
+            result.warnings += 1
+            result.warning_list.append((workout.name, key, warning))
+        if errors:
+            result.failed += 1
+            result.failures.append((workout.name, key, ', '.join(errors)))
+        else:
+            result.passed += 1
+
+    return results
@@ -0,0 +1,217 @@
+"""
+Watch mode
+
+Keeps a parsed WORKOUTS_DB in memory and follows edits to workouts-db.js.
+An edit is located by comparing the old and new source from both ends; only
+the workout objects it touches are parsed again. Check results are cached per workout under
+a hash of the workout's source block, so only changed workouts are checked.
+"""
+
+import hashlib
+import os
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+
+from .validation import check_workouts
+from .workouts_db import WorkoutsDBError, parse, parse_run, read_source
+
+
+def _block_hash(content, workout):
+    return hashlib.blake2b(content[workout.pos:workout.end].encode('utf-8'), digest_size=16).digest()
+
+
+def _common_prefix(a, b, limit):
+    """Length of the common prefix of a and b, at most limit; binary search over C-level slice compares"""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+@dataclass
+class Change:
+    """Outcome of one update()"""
+    # 'none', 'workouts' (only the edited workouts were parsed again) or 'full'
+    scope: str = 'none'
+    changed: list = field(default_factory=list)
+    removed: int = 0
+    # (workout, variant key, errors, warnings) rows of the changed workouts
+    rows: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+class IncrementalDB:
+    """A parsed database that follows edits of its source"""
+
+    def __init__(self, path, db=None):
+        self.path = path
+        if db is None:
+            db = parse(read_source(path), path)
+        self.db = db
+        self.content = db.content
+        self._hashes = {id(w): _block_hash(self.content, w) for w in self.db.workouts()}
+        self._checks = {}
+        self._check(self.db.workouts())
+
+    def _check(self, workouts):
+        """Check the workouts whose block hash has no cached result yet"""
+        todo = {}
+        for workout in workouts:
+            block = self._hashes[id(workout)]
+            if block not in self._checks:
+                todo.setdefault(block, workout)
+        for workout, key, errors, warnings in check_workouts(list(todo.values())):
+            self._checks.setdefault(self._hashes[id(workout)], []).append((key, errors, warnings))
+
+    def totals(self):
+        """(tests, passed, failed, warnings) over the whole database, from the cached results"""
+        tests = passed = failed = warnings = 0
+        for workout in self.db.workouts():
+            for _, errors, warning_list in self._checks[self._hashes[id(workout)]]:
+                tests += 1
+                warnings += len(warning_list)
+                if errors:
+                    failed += 1
+                else:
+                    passed += 1
+        return tests, passed, failed, warnings
+
+    def update(self, content):
+        """Apply a new source text; raises WorkoutsDBError when it does not parse"""
+        started = time.perf_counter()
+        change = Change()
+        if content == self.content:
+            return change
+
+        old = self.content
+        limit = min(len(old), len(content))
+        prefix = _common_prefix(old, content, limit)
+        suffix = _common_suffix(old, content, limit - prefix)
+        old_end = len(old) - suffix
+        delta = len(content) - len(old)
+
+        replaced = self._replace_run(content, prefix, old_end, delta)
+        change.scope = 'workouts'
+        if replaced is None:
+            old_workouts = self.db.workouts()
+            self.db = parse(content, self.path)
+            replaced = old_workouts, self.db.workouts()
+            change.scope = 'full'
+        old_workouts, new_workouts = replaced
+
+        self.content = content
+        self.db.content = content
+        for attr in ('_newlines', '_details_owner'):
+            self.db.__dict__.pop(attr, None)
+
+        old_hashes = {self._hashes.pop(id(w)) for w in old_workouts}
+        for w in new_workouts:
+            self._hashes[id(w)] = _block_hash(content, w)
+        change.changed = [w for w in new_workouts if self._hashes[id(w)] not in old_hashes]
+        change.removed = max(0, len(old_workouts) - len(new_workouts))
+
+        self._check(change.changed)
+        change.rows = [(w, key, errors, warnings)
+                       for w in change.changed for key, errors, warnings in self._checks[self._hashes[id(w)]]]
+        change.seconds = time.perf_counter() - started
+        return change
+
+    def _replace_run(self, content, start, end, delta):
+        """Parse the workouts touched by an edit of [start, end) again
+
+        Returns (old workouts, new workouts), or None when the edit is not
+        inside a single workout array.
+        """
+        for goal in self.db.goals.values():
+            for intensity, (array_start, array_end) in goal.spans.items():
+                if array_start < start and end < array_end:
+                    break
+            else:
+                continue
+            break
+        else:
+            return None
+
+        # Workouts before the edit keep their offsets, those after it move by delta
+        workouts = goal.intensities[intensity]
+        first = bisect_right([w.end for w in workouts], start)
+        last = bisect_left([w.pos for w in workouts], end, lo=first)
+        run_start = workouts[first - 1].end if first else array_start + 1
+        stop = (workouts[last].pos if last < len(workouts) else array_end - 1) + delta
+
+        new_run = parse_run(content, run_start, stop, goal.key, intensity, first, after_workout=first > 0)
+        if new_run is None:
+            return None
+
+        old_run = workouts[first:last]
+        if delta:
+            self._shift(workouts[last - 1].end if last > first else run_start, delta)
+        for workout in workouts[last:]:
+            workout.index += len(new_run) - len(old_run)
+        workouts[first:last] = new_run
+        return old_run, new_run
+
+    def _shift(self, boundary, delta):
+        """Move every offset at or after boundary (an offset in the old source) by delta"""
+        for goal in self.db.goals.values():
+            if goal.pos >= boundary:
+                goal.pos += delta
+            for intensity, (start, end) in goal.spans.items():
+                goal.spans[intensity] = (start + delta if start >= boundary else start,
+                                         end + delta if end >= boundary else end)
+            for workout in goal.workouts():
+                if workout.pos < boundary:
+                    continue
+                workout.pos += delta
+                workout.end += delta
+                for variant in workout.variants.values():
+                    variant.pos += delta
+                    if variant.details_pos >= 0:
+                        variant.details_pos += delta
+
+
+def watch(path, on_change, interval=0.2, db=None):
+    """Poll path every interval seconds and call on_change(incremental_db, change or error) on edits
+
+    db is an already parsed tree of path to start from. Runs until
+    interrupted with Ctrl+C and returns the IncrementalDB.
+    """
+    incremental = IncrementalDB(path, db)
+    stat = os.stat(path)
+    last = (stat.st_mtime_ns, stat.st_size)
+    try:
+        while True:
+            time.sleep(interval)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == last:
+                continue
+            last = (stat.st_mtime_ns, stat.st_size)
+            try:
+                change = incremental.update(read_source(path))
+            except (WorkoutsDBError, OSError, UnicodeDecodeError) as e:
+                on_change(incremental, e)
+                continue
+            if change.scope != 'none':
+                on_change(incremental, change)
+    except KeyboardInterrupt:
+        pass
+    return incremental
@@ -0,0 +1,337 @@
+"""
+Workout parser
+
+Python port of modules/workout-parser.js: turns a workout's `details` string
+into timed warm-up / main / cool-down phases with the same rules as the
+browser. All patterns are compiled once. build_phase_table() parses every
+variant of the database in one batch into a compact, array-backed phase table.
+"""
+
+import re
+from array import array
+from dataclasses import dataclass, field
+
+INTENSITY_ZONES = {
+    'recovery': {'min': 0, 'max': 0.60, 'category': 'easy', 'label': 'Recovery'},
+    'zone1': {'min': 0.60, 'max': 0.75, 'category': 'easy', 'label': 'Zone 1 (Aerobic)'},
+    'zone2': {'min': 0.75, 'max': 0.85, 'category': 'moderate', 'label': 'Zone 2 (Tempo)'},
+    'zone3': {'min': 0.85, 'max': 0.95, 'category': 'moderate', 'label': 'Zone 3 (Threshold)'},
+    'zone4': {'min': 0.95, 'max': 1.05, 'category': 'hard', 'label': 'Zone 4 (VO2max)'},
+    'zone5': {'min': 1.05, 'max': 1.20, 'category': 'hard', 'label': 'Zone 5 (Anaerobic)'},
+    'zone6': {'min': 1.20, 'max': 2.00, 'category': 'hard', 'label': 'Zone 6 (Neuromuscular)'}
+}
+
+# Default durations for warmup/cooldown when not specified (seconds)
+DEFAULT_DURATIONS = {
+    'warmup': {'easy': 300, 'moderate': 600, 'hard': 600},
+    'cooldown': {'easy': 300, 'moderate': 600, 'hard': 600}
+}
+
+_CATEGORY_MAP = {
+    'rest': {'value': 0.50, 'min': 0, 'max': 0.55, 'category': 'easy'},
+    'recovery': {'value': 0.55, 'min': 0.50, 'max': 0.60, 'category': 'easy'},
+    'easy': {'value': 0.65, 'min': 0.60, 'max': 0.70, 'category': 'easy'},
+    'moderate': {'value': 0.82, 'min': 0.75, 'max': 0.90, 'category': 'moderate'},
+    'hard': {'value': 1.00, 'min': 0.95, 'max': 1.10, 'category': 'hard'}
+}
+
+_PERCENT_RE = re.compile(r'(\d+)\s*(-|to)?\s*(\d+)?\s*%?\s*\+?', re.I)
+_WARMUP_RE = re.compile(r'Warm-up:\s*(\d+)\s*min', re.I)
+_COOLDOWN_RE = re.compile(r'Cool-down:\s*(\d+)\s*min', re.I)
+_MAIN_RE = re.compile(r'Main:\s*([^.]+(?:\.|$))', re.I)
+_INTERVAL_RE = re.compile(
+    r'(\d+)\s*x\s*(\d+(?:\.\d+)?)\s*(s(?:ec)?(?:ond)?s?|min(?:ute)?s?)'
+    r'(?:\s+@\s+(\d+(?:-\d+)?)%?\s*FTP)?'
+    r'(?:,\s*(\d+(?:\.\d+)?)\s*(s(?:ec)?(?:ond)?s?)\s*(?:recovery|easy|rest))?',
+    re.I
+)
+_PYRAMID_RE = re.compile(r'(\d+)-(\d+)-(\d+)-(\d+)-(\d+)\s*min', re.I)
+_STEADY_RE = re.compile(r'(\d+)\s*min\s+steady', re.I)
+_OVERRIDE_RE = re.compile(r'(\d+)(?:-(\d+))?')
+_SECONDS_RE = re.compile(r'^s', re.I)
+
+# Duration mismatch tolerance of validateWorkout (minutes)
+TOLERANCE_MINUTES = 2
+
+
+def determine_category(intensity):
+    """Polarized category ('easy', 'moderate', 'hard') of an intensity as decimal FTP"""
+    if intensity < 0.75:
+        return 'easy'
+    if intensity < 0.90:
+        return 'moderate'
+    return 'hard'
+
+
+def parse_intensity(intensity_str):
+    """Parse '65% FTP', '80-85% FTP', '150%+ FTP', 'Variable' or a category label"""
+    if not intensity_str or not isinstance(intensity_str, str):
+        return {'value': 0.65, 'min': 0.60, 'max': 0.70, 'category': 'easy', 'raw': intensity_str}
+
+    text = intensity_str.strip()
+
+    percent = _PERCENT_RE.search(text)
+    if percent:
+        low = int(percent.group(1))
+        high = int(percent.group(3)) if percent.group(3) else low
+        value = (low + high) / 2 / 100
+        return {
+            'value': value,
+            'min': low / 100,
+            'max': high / 100,
+            'category': determine_category(value),
+            'raw': intensity_str
+        }
+
+    if 'variable' in text.lower():
+        return {'value': 1.0, 'min': 0.60, 'max': 1.20, 'category': 'hard', 'raw': intensity_str, 'isVariable': True}
+
+    lower = text.lower()
+    for key, value in _CATEGORY_MAP.items():
+        if key in lower:
+            return {**value, 'raw': intensity_str}
+
+    return {'value': 0.65, 'min': 0.60, 'max': 0.70, 'category': 'easy', 'raw': intensity_str}
+
+
+def _minutes(value, unit):
+    return value / 60 if unit and _SECONDS_RE.match(unit) else value
+
+
+def parse_intervals(match, intensity):
+    """Work/recovery phases of an NxM interval match"""
+    reps = int(match.group(1))
+    work_minutes = _minutes(float(match.group(2)), match.group(3))
+    if match.group(5):
+        recovery_minutes = _minutes(float(match.group(5)), match.group(6))
+    else:
+        recovery_minutes = max(3, work_minutes * 0.5)
+
+    work_intensity = intensity['value']
+    if match.group(4):
+        override = _OVERRIDE_RE.search(match.group(4))
+        if override:
+            low = int(override.group(1)) / 100
+            high = int(override.group(2)) / 100 if override.group(2) else low
+            work_intensity = (low + high) / 2
+
+    phases = []
+    for i in range(reps):
+        phases.append({'duration': work_minutes, 'intensity': work_intensity, 'type': 'work', 'intervalNumber': i + 1})
+        if i < reps - 1:
+            phases.append({'duration': recovery_minutes, 'intensity': 0.55, 'type': 'recovery'})
+    return phases
+
+
+def parse_pyramid(match, intensity):
+    """Work/recovery phases of a five-step pyramid match"""
+    durations = [int(match.group(i)) for i in range(1, 6)]
+    phases = []
+    for index, duration in enumerate(durations):
+        phases.append({'duration': duration, 'intensity': intensity['value'], 'type': 'work', 'pyramidStep': index + 1})
+        if index < len(durations) - 1:
+            phases.append({'duration': 3, 'intensity': 0.55, 'type': 'recovery'})
+    return phases
+
+
+def parse_main_set(details, intensity):
+    """Main phases from intervals, a pyramid or a steady block; [] when none matches"""
+    main = _MAIN_RE.search(details)
+    section = main.group(1) if main else details
+
+    interval = _INTERVAL_RE.search(section)
+    if interval:
+        return parse_intervals(interval, intensity)
+
+    pyramid = _PYRAMID_RE.search(section)
+    if pyramid:
+        return parse_pyramid(pyramid, intensity)
+
+    steady = _STEADY_RE.search(section)
+    if steady:
+        return [{'duration': int(steady.group(1)), 'intensity': intensity['value'], 'type': 'steady'}]
+
+    return []
+
+
+def generate_default_structure(total_duration, intensity):
+    """Warm-up / steady main / cool-down for workouts without details"""
+    warmup = DEFAULT_DURATIONS['warmup'][intensity['category']] / 60
+    cooldown = DEFAULT_DURATIONS['cooldown'][intensity['category']] / 60
+    return {
+        'warmup': {'duration': warmup, 'intensity': 0.55, 'type': 'warmup'},
+        'main': [{'duration': max(10, total_duration - warmup - cooldown), 'intensity': intensity['value'], 'type': 'steady'}],
+        'cooldown': {'duration': cooldown, 'intensity': 0.50, 'type': 'cooldown'}
+    }
+
+
+def calculate_total_duration(phases):
+    total = 0
+    if phases['warmup']:
+        total += phases['warmup']['duration']
+    if phases['cooldown']:
+        total += phases['cooldown']['duration']
+    return total + sum(phase['duration'] for phase in phases['main'])
+
+
+def validate_and_adjust(phases, total_duration):
+    """The browser only logs duration mismatches and trusts the parsed details"""
+    return phases
+
+
+def parse_details(details, total_duration, intensity):
+    """Structured phases of a details string"""
+    if not details:
+        return generate_default_structure(total_duration, intensity)
+
+    phases = {'warmup': None, 'main': [], 'cooldown': None}
+
+    warmup = _WARMUP_RE.search(details)
+    if warmup:
+        phases['warmup'] = {'duration': int(warmup.group(1)), 'intensity': 0.55, 'type': 'warmup'}
+
+    cooldown = _COOLDOWN_RE.search(details)
+    if cooldown:
+        phases['cooldown'] = {'duration': int(cooldown.group(1)), 'intensity': 0.50, 'type': 'cooldown'}
+
+    phases['main'] = parse_main_set(details, intensity)
+
+    if not phases['warmup']:
+        phases['warmup'] = {'duration': DEFAULT_DURATIONS['warmup'][intensity['category']] / 60,
+                            'intensity': 0.55, 'type': 'warmup'}
+    if not phases['cooldown']:
+        phases['cooldown'] = {'duration': DEFAULT_DURATIONS['cooldown'][intensity['category']] / 60,
+                              'intensity': 0.50, 'type': 'cooldown'}
+
+    return validate_and_adjust(phases, total_duration)
+
+
+def parse_workout(workout):
+    """Canonical structure of a workout dict (name, intensity, duration, details)"""
+    if not workout:
+        raise ValueError('Workout object is required')
+
+    intensity = parse_intensity(workout.get('intensity'))
+    duration = workout.get('duration') or 60
+    phases = parse_details(workout.get('details'), duration, intensity)
+
+    return {
+        'name': workout.get('name') or 'Unnamed Workout',
+        'description': workout.get('description') or '',
+        'duration': duration,
+        'intensity': intensity,
+        'phases': phases,
+        'totalDuration': calculate_total_duration(phases),
+        'polarizedCategory': intensity['category'],
+        'hasIntervals': any(phase['type'] == 'work' for phase in phases['main']),
+        'isPyramid': any('pyramidStep' in phase for phase in phases['main'])
+    }
+
+
+def validate_workout(workout):
+    """{'valid', 'errors', 'warnings'} like WorkoutParser.validateWorkout"""
+    errors = []
+    warnings = []
+
+    if not workout.get('name'):
+        errors.append('Missing workout name')
+    if not workout.get('intensity'):
+        errors.append('Missing intensity')
+    if not workout.get('duration') or workout['duration'] <= 0:
+        errors.append('Invalid duration')
+
+    try:
+        parsed = parse_workout(workout)
+        diff = abs(parsed['totalDuration'] - parsed['duration'])
+        if diff > TOLERANCE_MINUTES:
+            warnings.append(f"Duration mismatch: {parsed['duration']} min specified, "
+                            f"{parsed['totalDuration']:.1f} min calculated")
+        if parsed['intensity']['value'] < 0.3 or parsed['intensity']['value'] > 2.0:
+            warnings.append(f"Unusual intensity value: {parsed['intensity']['value'] * 100:.0f}% FTP")
+    except (ValueError, TypeError) as e:
+        errors.append(f'Parse error: {e}')
+
+    return {'valid': not errors, 'errors': errors, 'warnings': warnings}
+
+
+def resolved_workout(workout, variant):
+    """The workout dict schedule.js builds (buildResolvedWorkout) and the browser parses"""
+    return {
+        'name': variant.display_name or workout.name,
+        'baseName': workout.name,
+        'intensity': workout.intensity,
+        'description': workout.description,
+        'tips': workout.tips,
+        'powerZone': workout.power_zone,
+        'duration': variant.duration,
+        'details': variant.details,
+        'variantType': variant.key
+    }
+
+
+# Phase type codes of the phase table
+PHASE_TYPES = ('warmup', 'work', 'recovery', 'steady', 'cooldown')
+_PHASE_CODES = {name: code for code, name in enumerate(PHASE_TYPES)}
+
+
+@dataclass
+class PhaseTable:
+    """Phases of many variants in flat columns
+
+    Rows offsets[i]:offsets[i + 1] belong to variants[i]. start and duration are
+    minutes from the start of the workout, power is % FTP.
+    """
+    variants: list = field(default_factory=list)
+    offsets: array = field(default_factory=lambda: array('I', [0]))
+    start: array = field(default_factory=lambda: array('d'))
+    duration: array = field(default_factory=lambda: array('d'))
+    power: array = field(default_factory=lambda: array('d'))
+    kind: array = field(default_factory=lambda: array('B'))
+    declared: array = field(default_factory=lambda: array('d'))
+    total: array = field(default_factory=lambda: array('d'))
+    main_parsed: array = field(default_factory=lambda: array('B'))
+
+    def __len__(self):
+        return len(self.variants)
+
+    def phases(self, i):
+        """(type, start, duration, power%) rows of variant i"""
+        return [(PHASE_TYPES[self.kind[r]], self.start[r], self.duration[r], self.power[r])
+                for r in range(self.offsets[i], self.offsets[i + 1])]
+
+    def unparsed(self):
+        """Indices of variants whose main set matched no interval, pyramid or steady pattern"""
+        return [i for i, ok in enumerate(self.main_parsed) if not ok]
+
+    def mis_summed(self, tolerance=TOLERANCE_MINUTES):
+        """Indices of variants whose phases do not add up to their duration"""
+        return [i for i in range(len(self.variants)) if abs(self.total[i] - self.declared[i]) > tolerance]
+
+
+def build_phase_table(db):
+    """Parse every variant of the database into one PhaseTable"""
+    table = PhaseTable()
+    append_start = table.start.append
+    append_duration = table.duration.append
+    append_power = table.power.append
+    append_kind = table.kind.append
+
+    for workout, variant in db.variants():
+        parsed = parse_workout(resolved_workout(workout, variant))
+        phases = parsed['phases']
+
+        clock = 0.0
+        for phase in [phases['warmup'], *phases['main'], phases['cooldown']]:
+            append_start(clock)
+            append_duration(phase['duration'])
+            append_power(phase['intensity'] * 100)
+            append_kind(_PHASE_CODES[phase['type']])
+            clock += phase['duration']
+
+        table.variants.append((workout, variant))
+        table.offsets.append(len(table.kind))
+        table.declared.append(parsed['duration'])
+        table.total.append(parsed['totalDuration'])
+        table.main_parsed.append(1 if phases['main'] else 0)
+
+    return table
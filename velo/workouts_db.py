@@ -0,0 +1,404 @@
+"""
+WORKOUTS_DB parser
+
+Tokenizes the `const WORKOUTS_DB = {...}` literal from workouts-db.js in a
+single linear pass and builds a typed tree: goal → intensity → workout → variant.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = Path(os.environ.get('VELO_DB_PATH',
+                                      REPO_ROOT / 'public_html' / 'app' / 'assets' / 'js' / 'config' / 'workouts-db.js'))
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('VELO_CACHE_DIR', REPO_ROOT / '.cache' / 'velo'))
+
+# Bump when the tree layout changes so stale on-disk caches are ignored
+CACHE_VERSION = 2
+
+GOALS = ('ftp', 'climbing', 'granfondo')
+INTENSITIES = ('easy', 'moderate', 'hard')
+VARIANTS = ('short', 'medium', 'long')
+
+# Whitespace and comments are consumed as the prefix of each token match, one
+# whitespace character per repeat: \s+ inside the * would backtrack
+# exponentially over indentation when the token after it does not match
+_SKIP_RE = re.compile(r'(?:\s|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+_TOKEN_RE = re.compile(r'''
+    (?:\s|//[^\n]*|/\*.*?\*/)*
+    (?:
+          (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)
+        | (?P<number>-?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+        | (?P<ident>[A-Za-z_$][\w$]*)
+        | (?P<punct>[{}\[\]:,;=()])
+        | (?P<eof>\Z)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_ESCAPE_RE = re.compile(r'\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+_LITERALS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+
+class WorkoutsDBError(ValueError):
+    """Raised when workouts-db.js cannot be parsed"""
+
+
+@dataclass
+class Variant:
+    key: str
+    duration: int = 0
+    display_name: str = ''
+    details: str = ''
+    pos: int = 0
+    details_pos: int = -1
+
+
+@dataclass
+class Workout:
+    name: str
+    goal: str
+    intensity: str
+    index: int
+    description: str = ''
+    power_zone: str = ''
+    tips: str = ''
+    variants: dict = field(default_factory=dict)
+    pos: int = 0
+    end: int = 0
+
+
+@dataclass
+class Goal:
+    key: str
+    intensities: dict = field(default_factory=dict)
+    pos: int = 0
+    # intensity -> (start, end) offsets of its workout array, brackets included
+    spans: dict = field(default_factory=dict)
+
+    def workouts(self):
+        """All workouts of this goal in file order"""
+        return [w for intensity in self.intensities.values() for w in intensity]
+
+
+@dataclass
+class WorkoutsDB:
+    goals: dict
+    duplicate_goals: list
+    content: str
+    path: str = ''
+
+    def workouts(self):
+        """All workouts of all goals in file order"""
+        return [w for goal in self.goals.values() for w in goal.workouts()]
+
+    def variants(self):
+        """(workout, variant) pairs of all goals in file order"""
+        return [(w, v) for w in self.workouts() for v in w.variants.values()]
+
+    def line_of(self, offset):
+        """1-based line number of a character offset in the source"""
+        if not hasattr(self, '_newlines'):
+            self._newlines = [m.start() for m in re.finditer('\n', self.content)]
+        return bisect_right(self._newlines, offset - 1) + 1
+
+    def owner_at(self, details_pos):
+        """(workout, variant) owning the `details:` key at an offset, or None"""
+        if not hasattr(self, '_details_owner'):
+            self._details_owner = {v.details_pos: (w, v) for w, v in self.variants() if v.details_pos >= 0}
+        return self._details_owner.get(details_pos)
+
+    def goal_workouts(self, goal_name):
+        """Workouts of a goal in the dict shape the test scripts report on"""
+        goal = self.goals.get(goal_name)
+        if goal is None:
+            return None
+        return {
+            intensity: [
+                {
+                    'name': w.name,
+                    'variants': {
+                        key: {'duration': v.duration, 'displayName': v.display_name, 'details': v.details}
+                        for key, v in w.variants.items()
+                    }
+                }
+                for w in workouts
+            ]
+            for intensity, workouts in goal.intensities.items()
+        }
+
+
+class _Obj(dict):
+    """Parsed JS object that remembers where it and its keys start, and where it ends"""
+
+    def __init__(self, pos):
+        super().__init__()
+        self.pos = pos
+        self.end = pos
+        self.key_pos = {}
+        self.duplicates = []
+
+
+class _List(list):
+    """Parsed JS array that remembers its span"""
+
+    def __init__(self, pos):
+        super().__init__()
+        self.pos = pos
+        self.end = pos
+
+
+def _unescape(raw):
+    def repl(m):
+        esc = m.group(1)
+        if esc[0] in 'ux' and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        if esc == '\n':
+            return ''
+        return _ESCAPES.get(esc, esc)
+    return _ESCAPE_RE.sub(repl, raw) if '\\' in raw else raw
+
+
+class _Parser:
+    """Recursive descent over the token stream, one token of lookahead"""
+
+    def __init__(self, content, pos=0):
+        self.content = content
+        self.pos = pos
+        self.tok = None
+        self._advance()
+
+    def _advance(self):
+        m = _TOKEN_RE.match(self.content, self.pos)
+        if m is None:
+            pos = _SKIP_RE.match(self.content, self.pos).end()
+            self._error(f'unexpected character {self.content[pos]!r}', pos)
+        self.pos = m.end()
+        kind = m.lastgroup
+        self.tok = (kind, m.group(kind), m.start(kind))
+
+    def _error(self, message, pos):
+        line = self.content.count('\n', 0, pos) + 1
+        col = pos - self.content.rfind('\n', 0, pos)
+        raise WorkoutsDBError(f'{message} at line {line}, column {col}')
+
+    def _expect(self, value):
+        kind, text, pos = self.tok
+        if text != value or kind not in ('punct', 'ident'):
+            self._error(f'expected {value!r}, got {text or "end of file"!r}', pos)
+        self._advance()
+
+    def find_declaration(self, name):
+        """Skip tokens until `<name> =` and leave the lookahead on the value"""
+        while self.tok[0] != 'eof':
+            kind, text, _ = self.tok
+            self._advance()
+            if kind == 'ident' and text == name and self.tok[1] == '=':
+                self._advance()
+                return
+        raise WorkoutsDBError(f'{name} declaration not found')
+
+    def value(self):
+        kind, text, pos = self.tok
+        if kind == 'punct' and text == '{':
+            return self._object()
+        if kind == 'punct' and text == '[':
+            return self._array()
+        self._advance()
+        if kind == 'string':
+            return _unescape(text[1:-1])
+        if kind == 'number':
+            number = float(text)
+            return int(number) if number.is_integer() and 'e' not in text.lower() else number
+        if kind == 'ident' and text in _LITERALS:
+            return _LITERALS[text]
+        self._error(f'unexpected token {text or "end of file"!r}', pos)
+
+    def _object(self):
+        obj = _Obj(self.tok[2])
+        self._advance()
+        while self.tok[1] != '}':
+            kind, text, pos = self.tok
+            if kind == 'string':
+                key = _unescape(text[1:-1])
+            elif kind in ('ident', 'number'):
+                key = text
+            else:
+                self._error(f'expected property name, got {text or "end of file"!r}', pos)
+            self._advance()
+            self._expect(':')
+            if key in obj:
+                obj.duplicates.append((key, pos))
+            obj.key_pos[key] = pos
+            obj[key] = self.value()
+            if self.tok[1] != ',':
+                break
+            self._advance()
+        obj.end = self.tok[2] + 1
+        self._expect('}')
+        return obj
+
+    def _array(self):
+        items = _List(self.tok[2])
+        self._advance()
+        while self.tok[1] != ']':
+            items.append(self.value())
+            if self.tok[1] != ',':
+                break
+            self._advance()
+        items.end = self.tok[2] + 1
+        self._expect(']')
+        return items
+
+
+def _text(value):
+    return value if isinstance(value, str) else ''
+
+
+def _build_variant(key, raw, pos):
+    variant = Variant(key=key, pos=pos)
+    if not isinstance(raw, _Obj):
+        return variant
+    duration = raw.get('duration')
+    variant.duration = int(duration) if isinstance(duration, (int, float)) and not isinstance(duration, bool) else 0
+    variant.display_name = _text(raw.get('displayName'))
+    variant.details = _text(raw.get('details'))
+    variant.details_pos = raw.key_pos.get('details', -1)
+    return variant
+
+
+def _build_workout(raw, goal, intensity, index):
+    workout = Workout(
+        name=_text(raw.get('name')) if isinstance(raw, dict) else '',
+        goal=goal,
+        intensity=intensity,
+        index=index,
+        pos=getattr(raw, 'pos', 0),
+        end=getattr(raw, 'end', 0)
+    )
+    if not isinstance(raw, _Obj):
+        return workout
+    workout.description = _text(raw.get('description'))
+    workout.power_zone = _text(raw.get('intensity'))
+    workout.tips = _text(raw.get('tips'))
+    variants = raw.get('variants')
+    if isinstance(variants, _Obj):
+        for key, value in variants.items():
+            workout.variants[key] = _build_variant(key, value, variants.key_pos[key])
+    return workout
+
+
+def _build_workouts(raw, goal, intensity):
+    return [_build_workout(w, goal, intensity, i) for i, w in enumerate(raw)]
+
+
+def parse_run(content, start, stop, goal, intensity, first_index=0, after_workout=False):
+    """Parse the workout objects of an array between two offsets
+
+    start is just past the array's '[' or, with after_workout, just past a
+    workout's closing '}'; stop is the offset of the next workout's '{' or of
+    the closing ']'. Used to parse the edited part of a file again instead of
+    the whole file. Returns the workouts, or None when the source between the
+    offsets is not a run of workout objects.
+    """
+    parser = _Parser(content, start)
+    raw = []
+    expect_comma = after_workout
+    try:
+        while True:
+            kind, text, pos = parser.tok
+            if pos >= stop:
+                if pos != stop or (expect_comma and content[stop] != ']'):
+                    return None
+                break
+            if expect_comma:
+                if text != ',':
+                    return None
+                parser._advance()
+                expect_comma = False
+            elif kind == 'punct' and text == '{':
+                raw.append(parser.value())
+                expect_comma = True
+            else:
+                return None
+    except WorkoutsDBError:
+        return None
+    return [_build_workout(w, goal, intensity, first_index + i) for i, w in enumerate(raw)]
+
+
+def parse(content, path=''):
+    """Parse the source of workouts-db.js into a WorkoutsDB tree"""
+    parser = _Parser(content)
+    parser.find_declaration('WORKOUTS_DB')
+    if parser.tok[1] != '{':
+        parser._error('WORKOUTS_DB is not an object literal', parser.tok[2])
+    raw = parser.value()
+
+    goals = {}
+    for goal_key, goal_raw in raw.items():
+        goal = Goal(key=goal_key, pos=raw.key_pos[goal_key])
+        if isinstance(goal_raw, dict):
+            for intensity, workouts in goal_raw.items():
+                if isinstance(workouts, list):
+                    goal.intensities[intensity] = _build_workouts(workouts, goal_key, intensity)
+                    goal.spans[intensity] = (workouts.pos, workouts.end)
+        goals[goal_key] = goal
+
+    return WorkoutsDB(
+        goals=goals,
+        duplicate_goals=[key for key, _ in raw.duplicates],
+        content=content,
+        path=str(path)
+    )
+
+
+def content_hash(content):
+    """Cache key for a workouts-db.js source"""
+    return hashlib.sha256(f'{CACHE_VERSION}:{content}'.encode('utf-8')).hexdigest()
+
+
+def read_source(path=DEFAULT_DB_PATH):
+    """Source text of a workouts-db.js file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_cached(content, path='', cache_dir=None):
+    """parse() with an optional on-disk cache
+
+    With a cache_dir the parsed tree is pickled under the content hash of the
+    source, so unchanged databases are not parsed again on the next run.
+    """
+    if cache_dir is None:
+        return parse(content, path)
+
+    cache_file = Path(cache_dir) / f'workouts-db-{content_hash(content)}.pickle'
+    try:
+        with open(cache_file, 'rb') as f:
+            db = pickle.load(f)
+        db.path = str(path)
+        return db
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    db = parse(content, path)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(db, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return db
+
+
+def load(path=DEFAULT_DB_PATH, cache_dir=None):
+    """Read and parse a workouts-db.js file, see parse_cached() for cache_dir"""
+    return parse_cached(read_source(path), path, cache_dir)
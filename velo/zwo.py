@@ -0,0 +1,319 @@
+"""
+Zwift .zwo export
+
+Python port of modules/zwift-export.js (generateZwoXML, generateWorkoutSegments,
+generateIntervalsSegments) on top of velo.workout_parser. Files are produced
+as a stream of XML chunks, so the bulk exporter writes them straight to disk
+or into a zip member and checks well-formedness and segment durations on the
+same chunks, without building or re-reading whole documents.
+"""
+
+import math
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .workout_parser import parse_workout, resolved_workout
+
+AUTHOR = 'Polarized.cc'
+
+# Allowed distance (minutes) between the exported segments and the variant duration
+TOLERANCE_MINUTES = 2
+
+_STRUCTURED_WARMUP = (
+    '        <SteadyState Duration="120" Power="0.50" pace="0"/>\n'
+    '        <SteadyState Duration="120" Power="0.60" pace="0"/>\n'
+    '        <SteadyState Duration="120" Power="0.70" pace="0"/>\n'
+    '        <SteadyState Duration="60" Power="0.80" pace="0"/>\n'
+    '        <SteadyState Duration="60" Power="0.50" pace="0"/>\n'
+    '        <SteadyState Duration="120" Power="0.75" pace="0"/>\n'
+)
+
+
+def _round(value):
+    """Math.round: halves go up"""
+    return math.floor(value + 0.5)
+
+
+def _fixed(value, digits=2):
+    """Number.prototype.toFixed"""
+    return f'{value:.{digits}f}'
+
+
+def escape_xml(text):
+    if not text:
+        return ''
+    return (text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            .replace('"', '&quot;').replace("'", '&apos;'))
+
+
+def _intervals_t(interval):
+    return (f'        <IntervalsT Repeat="{interval["repeat"]}" OnDuration="{interval["onDuration"]}" '
+            f'OffDuration="{interval["offDuration"]}" OnPower="{interval["onPower"]}" '
+            f'OffPower="{interval["offPower"]}" pace="0"/>\n')
+
+
+def _steady_state(phase):
+    return f'        <SteadyState Duration="{_round(phase["duration"] * 60)}" Power="{_fixed(phase["intensity"])}" pace="0"/>\n'
+
+
+def generate_intervals_segments(main_phases):
+    """IntervalsT / SteadyState lines of an interval main set, like generateIntervalsSegments"""
+    current = None
+    count = 0
+
+    for index, phase in enumerate(main_phases):
+        if phase['type'] == 'work':
+            if current is None:
+                current = {
+                    'onDuration': _round(phase['duration'] * 60),
+                    'onPower': _fixed(phase['intensity']),
+                    'offDuration': 0,
+                    'offPower': 0.55,
+                    'repeat': 1
+                }
+                count = 1
+        elif phase['type'] == 'recovery' and current is not None:
+            current['offDuration'] = _round(phase['duration'] * 60)
+            current['offPower'] = _fixed(phase['intensity'])
+
+            # Same lookahead as the browser: two phases past the recovery
+            following = main_phases[index + 2] if index + 2 < len(main_phases) else None
+            if (following and following['type'] == 'work'
+                    and abs(following['duration'] - current['onDuration'] / 60) < 0.1
+                    and abs(following['intensity'] - float(current['onPower'])) < 0.01):
+                count += 1
+            else:
+                current['repeat'] = count
+                yield _intervals_t(current)
+                current = None
+                count = 0
+        else:
+            if current is not None:
+                current['repeat'] = count
+                yield _intervals_t(current)
+                current = None
+                count = 0
+            yield _steady_state(phase)
+
+    if current is not None:
+        current['repeat'] = count
+        yield _intervals_t(current)
+
+
+def generate_workout_segments(parsed):
+    """Segment lines of a parse_workout() result, like generateWorkoutSegments"""
+    phases = parsed['phases']
+
+    if phases['warmup']:
+        warmup_seconds = _round(phases['warmup']['duration'] * 60)
+        if parsed['intensity']['category'] == 'hard' and warmup_seconds >= 600:
+            yield f'        <!-- Structured Warmup: {_fixed(phases["warmup"]["duration"], 0)} minutes -->\n'
+            yield _STRUCTURED_WARMUP
+        else:
+            yield f'        <Warmup Duration="{warmup_seconds}" PowerLow="0.50" PowerHigh="0.70" pace="0"/>\n'
+
+    if parsed['hasIntervals']:
+        yield from generate_intervals_segments(phases['main'])
+    else:
+        for phase in phases['main']:
+            yield _steady_state(phase)
+
+    if phases['cooldown']:
+        cooldown_seconds = _round(phases['cooldown']['duration'] * 60)
+        yield f'        <Cooldown Duration="{cooldown_seconds}" PowerLow="0.50" PowerHigh="0.40" pace="0"/>\n'
+
+
+def iter_zwo_xml(workout, name, parsed=None, tags=()):
+    """Chunks of the .zwo document for a resolved workout dict, like generateZwoXML
+
+    tags are extra tag names after the intensity tags, e.g. 'Week1'.
+    """
+    if parsed is None:
+        parsed = parse_workout(workout)
+
+    category = parsed['intensity']['category']
+    raw = parsed['intensity']['raw']
+    tag_names = ['Polarized', category[:1].upper() + category[1:]]
+    if raw and '%' in raw:
+        tag_names.append(raw)
+    tag_names.extend(tags)
+
+    yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+           '<workout_file>\n'
+           f'    <author>{AUTHOR}</author>\n'
+           f'    <name>{name}</name>\n'
+           f'    <description>{escape_xml(workout.get("description") or "Polarized training workout")}</description>\n'
+           '    <sportType>bike</sportType>\n'
+           '    <tags>\n'
+           + ''.join(f'        <tag name="{tag}"/>\n' for tag in tag_names) +
+           '    </tags>\n'
+           '    <workout>\n')
+    yield from generate_workout_segments(parsed)
+    yield '    </workout>\n</workout_file>'
+
+
+def generate_zwo_xml(workout, day, week):
+    """Complete .zwo document of a scheduled workout, as the browser downloads it"""
+    name = f"Polarized_W{week}_{day}_{'_'.join(workout['name'].split())}"
+    return ''.join(iter_zwo_xml(workout, name, tags=(f'Week{week}',)))
+
+
+def _segment_seconds(element):
+    attrs = element.attrib
+    try:
+        if element.tag == 'IntervalsT':
+            return int(attrs['Repeat']) * (float(attrs['OnDuration']) + float(attrs['OffDuration']))
+        if element.tag in ('SteadyState', 'Warmup', 'Cooldown', 'Ramp', 'FreeRide'):
+            return float(attrs['Duration'])
+    except (KeyError, ValueError):
+        return None
+    return 0
+
+
+class ZwoChecker:
+    """Incremental well-formedness and segment-duration check, fed the same chunks as the writer"""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('end',))
+        self.seconds = 0.0
+        self.segments = 0
+        self.errors = []
+
+    def feed(self, chunk):
+        if self.errors:
+            return
+        try:
+            self._parser.feed(chunk)
+            self._drain()
+        except ET.ParseError as e:
+            self.errors.append(f'not well-formed: {e}')
+
+    def close(self):
+        if not self.errors:
+            try:
+                self._parser.close()
+                self._drain()
+            except ET.ParseError as e:
+                self.errors.append(f'not well-formed: {e}')
+        return self.errors
+
+    def _drain(self):
+        for _, element in self._parser.read_events():
+            if element.tag in ('workout_file', 'workout', 'tags', 'tag'):
+                continue
+            seconds = _segment_seconds(element)
+            if seconds is None:
+                self.errors.append(f'<{element.tag}> has an invalid duration')
+            elif seconds:
+                self.segments += 1
+                self.seconds += seconds
+            element.clear()
+
+
+@dataclass
+class ExportResult:
+    goal: str
+    intensity: str
+    workout: str
+    variant: str
+    path: str
+    bytes: int = 0
+    seconds: float = 0.0
+    expected_seconds: float = 0.0
+    errors: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+
+
+def catalogue_name(workout, variant):
+    """Workout name inside a catalogue .zwo file"""
+    return f"Polarized_{workout.goal}_{'_'.join(workout.name.split())}_{variant.key}"
+
+
+def catalogue_path(workout, variant):
+    """Relative path of a variant in the export catalogue
+
+    The workout's position in its intensity list comes first, so workouts
+    whose names are equal or sanitize to the same text get their own file.
+    """
+    safe = ''.join(c if c.isalnum() else '_' for c in workout.name)
+    return f'{workout.goal}/{workout.intensity}/{workout.index + 1:03d}_{safe}_{variant.key}.zwo'
+
+
+def _export_one(workout, variant, sink):
+    resolved = resolved_workout(workout, variant)
+    parsed = parse_workout(resolved)
+    result = ExportResult(workout.goal, workout.intensity, workout.name, variant.key, catalogue_path(workout, variant))
+
+    checker = ZwoChecker()
+    for chunk in iter_zwo_xml(resolved, catalogue_name(workout, variant), parsed):
+        data = chunk.encode('utf-8')
+        result.bytes += len(data)
+        checker.feed(data)
+        if sink is not None:
+            sink.write(data)
+    result.errors = checker.close()
+    result.seconds = checker.seconds
+
+    # The segments must reproduce the parsed phases; one second of rounding per segment
+    result.expected_seconds = parsed['totalDuration'] * 60
+    if not result.errors and abs(result.seconds - result.expected_seconds) > max(1, checker.segments):
+        result.warnings.append(f'segments last {result.seconds / 60:.1f} min, '
+                             f'parsed phases {parsed["totalDuration"]:.1f} min')
+    if not result.errors and abs(result.seconds / 60 - variant.duration) > TOLERANCE_MINUTES:
+        result.warnings.append(f'segments last {result.seconds / 60:.1f} min, duration is {variant.duration} min')
+    return result
+
+
+def export_catalogue(db, out_dir=None, zip_path=None, variants=None):
+    """Yield an ExportResult per exported variant, in file order
+
+    Each .zwo file is streamed to out_dir, into the zip archive at zip_path,
+    or, with neither, only generated and checked. variants limits the export
+    to those variant keys.
+    """
+    pairs = ((w, v) for w, v in db.variants() if variants is None or v.key in variants)
+
+    # Paths taken so far, case-folded for case-insensitive file systems; a
+    # variant whose path is taken is reported as an error and not written
+    taken = {}
+
+    def collision(workout, variant):
+        path = catalogue_path(workout, variant)
+        other = taken.get(path.casefold())
+        if other is None:
+            taken[path.casefold()] = (workout, variant)
+            return None
+        result = ExportResult(workout.goal, workout.intensity, workout.name, variant.key, path)
+        result.errors.append(f'{path} is already the file of {other[0].name} ({other[1].key})')
+        return result
+
+    if zip_path is not None:
+        Path(zip_path).parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for workout, variant in pairs:
+                clash = collision(workout, variant)
+                if clash:
+                    yield clash
+                    continue
+                with archive.open(catalogue_path(workout, variant), 'w') as member:
+                    yield _export_one(workout, variant, member)
+        return
+
+    for workout, variant in pairs:
+        if out_dir is None:
+            yield collision(workout, variant) or _export_one(workout, variant, None)
+            continue
+        clash = collision(workout, variant)
+        if clash:
+            yield clash
+            continue
+        target = Path(out_dir) / catalogue_path(workout, variant)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            result = _export_one(workout, variant, f)
+        os.replace(tmp, target)
+        yield result